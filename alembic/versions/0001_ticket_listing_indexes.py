@@ -0,0 +1,49 @@
+"""Composite indexes for ticket listing hot paths
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Tables are created by init_db(); this revision only adds indexes, so it is
+safe on both fresh databases and databases created before migrations existed.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COMPOSITE_INDEXES = [
+    ("ix_tickets_status_created_at", ["status", "created_at"]),
+    ("ix_tickets_submitter_email_created_at", ["submitter_email", "created_at"]),
+    ("ix_tickets_predicted_queue_created_at", ["predicted_queue", "created_at"]),
+    ("ix_tickets_is_critical_created_at", ["is_critical", "created_at"]),
+]
+
+PENDING_APPROVAL = sa.text("status = 'PENDING_APPROVAL'")
+
+
+def upgrade() -> None:
+    for name, columns in COMPOSITE_INDEXES:
+        op.create_index(name, "tickets", columns, if_not_exists=True)
+
+    # Partial index for the approval queue (SQLite and Postgres support WHERE on indexes)
+    op.create_index(
+        "ix_tickets_pending_approval_created_at", "tickets", ["created_at"],
+        sqlite_where=PENDING_APPROVAL,
+        postgresql_where=PENDING_APPROVAL,
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tickets_pending_approval_created_at", table_name="tickets")
+    for name, _ in reversed(COMPOSITE_INDEXES):
+        op.drop_index(name, table_name="tickets")
@@ -0,0 +1,36 @@
+"""Ticket change counter for response caching and ETags
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("change_counters"):
+        op.create_table(
+            "change_counters",
+            sa.Column("name", sa.String(50), primary_key=True),
+            sa.Column("value", sa.Integer(), nullable=False, server_default="0"),
+        )
+
+    # Seed the counter so the first write only has to UPDATE
+    exists = bind.execute(sa.text("SELECT 1 FROM change_counters WHERE name = 'tickets'")).first()
+    if not exists:
+        bind.execute(sa.text("INSERT INTO change_counters (name, value) VALUES ('tickets', 0)"))
+
+
+def downgrade() -> None:
+    op.drop_table("change_counters")
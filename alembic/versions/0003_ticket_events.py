@@ -0,0 +1,41 @@
+"""Ticket lifecycle event outbox for WebSocket/SSE push
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("ticket_events"):
+        return
+    op.create_table(
+        "ticket_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ticket_id", sa.Integer(), sa.ForeignKey("tickets.id"), nullable=False),
+        sa.Column("event_type", sa.String(50), nullable=False),
+        sa.Column("status", sa.String(50), nullable=False),
+        sa.Column("predicted_queue", sa.String(100), nullable=True),
+        sa.Column("submitter_email", sa.String(200), nullable=True),
+        sa.Column("is_critical", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ticket_events_ticket_id", "ticket_events", ["ticket_id"])
+    op.create_index("ix_ticket_events_created_at", "ticket_events", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ticket_events_created_at", table_name="ticket_events")
+    op.drop_index("ix_ticket_events_ticket_id", table_name="ticket_events")
+    op.drop_table("ticket_events")
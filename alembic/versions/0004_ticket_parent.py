@@ -0,0 +1,34 @@
+"""Near-duplicate ticket parent link
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("tickets")}
+    if "parent_id" in columns:
+        return
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.add_column(sa.Column("parent_id", sa.Integer(), nullable=True))
+        batch_op.create_foreign_key("fk_tickets_parent_id", "tickets", ["parent_id"], ["id"])
+        batch_op.create_index("ix_tickets_parent_id", ["parent_id"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("tickets") as batch_op:
+        batch_op.drop_index("ix_tickets_parent_id")
+        batch_op.drop_constraint("fk_tickets_parent_id", type_="foreignkey")
+        batch_op.drop_column("parent_id")
@@ -0,0 +1,29 @@
+"""Full-text search index over tickets and responses
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+SQLite: FTS5 table; Postgres: GIN-indexed tsvector. Both are kept in sync
+by triggers and backfilled here (see backend/search.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend.search import install_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    install_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
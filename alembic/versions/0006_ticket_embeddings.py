@@ -0,0 +1,38 @@
+"""Ticket embeddings persisted at triage
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("ticket_embeddings"):
+        return
+    op.create_table(
+        "ticket_embeddings",
+        sa.Column("ticket_id", sa.Integer(), sa.ForeignKey("tickets.id"), primary_key=True),
+        sa.Column("model_version", sa.String(200), nullable=False),
+        sa.Column("dim", sa.Integer(), nullable=False),
+        sa.Column("vector", sa.LargeBinary(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index(
+        "ix_ticket_embeddings_model_version_ticket_id", "ticket_embeddings", ["model_version", "ticket_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ticket_embeddings_model_version_ticket_id", table_name="ticket_embeddings")
+    op.drop_table("ticket_embeddings")
@@ -10,14 +10,21 @@ def auto_send_drafted():
     print("  AUTO-SENDING DRAFTED TICKETS")
     print("="*70)
     
-    # Get all drafted tickets
-    response = requests.get(f"{BACKEND_URL}/tickets", params={"status": "DRAFTED"})
-    
-    if response.status_code != 200:
-        print("[ERROR] Failed to get tickets")
-        return
-    
-    tickets = response.json()
+    # Get all drafted tickets (follow cursor pages)
+    tickets = []
+    params = {"status": "DRAFTED", "fields": "id,subject", "limit": 500}
+    while True:
+        response = requests.get(f"{BACKEND_URL}/tickets", params=params)
+        
+        if response.status_code != 200:
+            print("[ERROR] Failed to get tickets")
+            return
+        
+        page = response.json()
+        tickets.extend(page["items"])
+        if not page["next_cursor"]:
+            break
+        params["cursor"] = page["next_cursor"]
     
     if not tickets:
         print("\n[INFO] No drafted tickets found")
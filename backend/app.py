@@ -1,27 +1,46 @@
 """
 FastAPI backend for IT Ticket Triage System.
 """
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, selectinload, noload
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select, text
+from typing import List, Optional, Union, Literal
 import os
 import shutil
+import json
+import asyncio
 from pathlib import Path
 from datetime import datetime, timedelta
 import logging
 
-from backend.db import get_db, init_db
+# Thread environment must be set before NumPy, torch and FAISS are imported
+from backend.ml.runtime import configure_threads, apply_thread_budget, get_runtime_info, estimator_jobs
+configure_threads()
+
+from backend.db import get_db, init_db, SessionLocal, WriteLockTimeout
+from backend.db_async import get_async_db, async_engine
 from backend.models import Ticket, Response, Approval, TicketStatus, AuditLog
+from backend.cache import cached_json_response, get_response_cache
+from backend.events import EVENT_TYPES, record_event, get_event_broker
+from backend.queries import ticket_list_query, ticket_summary_columns, encode_cursor
+from backend.search import ticket_search_query
 from backend.schemas import (
-    TicketCreate, TicketResponse, TicketDetail,
+    TicketCreate, TicketResponse, TicketDetail, TicketPage, TicketSummaryPage, TicketSearchHit,
     TriageRequest, TriageResponse,
     ApprovalCreate,
-    DashboardSummary, TicketTimeSeriesPoint, PendingApprovalItem
+    DashboardSummary, TicketTimeSeriesPoint, PendingApprovalItem, ActiveIncident
 )
-from backend.services.triage_service import get_triage_service
+from backend.services.draft_scheduler import get_draft_scheduler
+from backend.services.triage_pipeline import get_triage_pipeline
 from backend.services.approval_service import get_approval_service
+from backend.ml.predictors import get_loaded_predictor
+from backend.ml.retrieval import get_loaded_retriever
+from backend.ml.dedup import DEDUP_ENABLED, get_duplicate_detector, same_submitter
+from backend.ml.incidents import INCIDENT_MIN_SIZE, get_incident_tracker
 
 # Configure logging
 logging.basicConfig(
@@ -50,14 +69,51 @@ app.add_middleware(
 UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", "./uploads"))
 UPLOAD_DIR.mkdir(exist_ok=True)
 
+# Ticket list representation
+SUMMARY_BODY_CHARS = int(os.getenv("SUMMARY_BODY_CHARS", "200"))
+TICKET_FIELDS = list(TicketResponse.model_fields)
+TICKET_RELATIONS = {"responses": Ticket.responses, "approvals": Ticket.approvals}
+
+
+@app.exception_handler(WriteLockTimeout)
+async def write_lock_timeout_handler(request: Request, exc: WriteLockTimeout):
+    """Writers queued behind the SQLite write lock for too long: ask the client to retry"""
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+def parse_csv_param(value: Optional[str], allowed, name: str) -> List[str]:
+    """Split a comma-separated query parameter and reject unknown names"""
+    if not value:
+        return []
+    items = list(dict.fromkeys(v.strip() for v in value.split(",") if v.strip()))
+    unknown = [v for v in items if v not in allowed]
+    if unknown:
+        raise HTTPException(400, f"Unknown {name}: {', '.join(unknown)} (allowed: {', '.join(allowed)})")
+    return items
+
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize database on startup"""
     init_db()
+    apply_thread_budget()
+    if DEDUP_ENABLED:
+        get_duplicate_detector().warm(SessionLocal)
+    get_incident_tracker().sync(SessionLocal, force=True)
+    await get_event_broker().start()
+    get_triage_pipeline().start()
     logger.info("✓ FastAPI backend started")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the event relay and triage workers, close pooled async database connections"""
+    await get_event_broker().stop()
+    # Joins the draft workers (up to 5 s each): keep it off the event loop
+    await asyncio.to_thread(get_triage_pipeline().stop)
+    await async_engine.dispose()
+
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
@@ -73,7 +129,7 @@ async def root():
 # ============================================================================
 
 @app.post("/tickets", response_model=TicketResponse, status_code=201)
-async def create_ticket(
+def create_ticket(
     subject: str = Form(...),
     body: str = Form(...),
     submitter_name: str = Form(...),
@@ -84,6 +140,9 @@ async def create_ticket(
     """
     Create a new ticket.
     Optionally upload an attachment.
+    
+    Plain def: the write may wait for the database write lock, which must
+    not block the event loop (FastAPI runs it on its thread pool).
     """
     # Handle attachment
     attachment_path = None
@@ -99,6 +158,14 @@ async def create_ticket(
             shutil.copyfileobj(attachment.file, f)
         attachment_path = str(file_path)
     
+    # Link near-duplicates of a recent ticket to it (storm coalescing)
+    signature = None
+    match = None
+    if DEDUP_ENABLED:
+        detector = get_duplicate_detector()
+        signature = detector.signature(subject, body)
+        match = detector.find_parent(signature)
+    
     # Create ticket
     ticket = Ticket(
         subject=subject,
@@ -106,87 +173,181 @@ async def create_ticket(
         submitter_name=submitter_name,
         submitter_email=submitter_email,
         attachment_path=attachment_path,
-        status=TicketStatus.NEW
+        status=TicketStatus.NEW,
+        parent_id=match[0] if match else None
     )
     db.add(ticket)
+    record_event(db, ticket, "ticket.created")
+    if match:
+        db.flush()
+        db.add(AuditLog(
+            ticket_id=ticket.id,
+            action="DUPLICATE_LINKED",
+            actor="system",
+            details=json.dumps({"parent_id": match[0], "similarity": round(match[1], 3)})
+        ))
     db.commit()
     db.refresh(ticket)
     
-    logger.info(f"✓ Created ticket #{ticket.id}: {subject}")
+    if match:
+        logger.info(f"✓ Created ticket #{ticket.id}: {subject} (duplicate of #{match[0]}, sim={match[1]:.2f})")
+    else:
+        if signature is not None:
+            get_duplicate_detector().add(ticket.id, signature, ticket.created_at)
+        logger.info(f"✓ Created ticket #{ticket.id}: {subject}")
+    
+    pipeline = get_triage_pipeline()
+    if pipeline.triage_on_create:
+        pipeline.submit(ticket.id, claim=True)
     return ticket
 
 
+@app.get("/tickets/search", response_model=List[TicketSearchHit])
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=500),
+    status: Optional[TicketStatus] = None,
+    queue: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Full-text search over ticket subject, body and response text, best match first.
+    All words must match; use "quoted phrases" and word* prefixes.
+    """
+    try:
+        built = ticket_search_query(
+            db.bind.dialect.name, q,
+            status=status.name if status else None,
+            queue=queue,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(501, str(e))
+    if built is None:
+        return []
+    
+    sql, params = built
+    result = await db.execute(text(sql), params)
+    return [TicketSearchHit(**row._mapping) for row in result.all()]
+
+
 @app.get("/tickets/{ticket_id}", response_model=TicketDetail)
-async def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
-    """Get ticket details including responses and approvals"""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+async def get_ticket(
+    ticket_id: int,
+    include: str = "responses,approvals",
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get ticket details.
+    `include` selects which relationships to load (responses, approvals);
+    omitted ones are returned as empty lists without being queried.
+    """
+    relations = parse_csv_param(include, TICKET_RELATIONS, "include")
+    options = [
+        selectinload(attr) if name in relations else noload(attr)
+        for name, attr in TICKET_RELATIONS.items()
+    ]
+    
+    result = await db.execute(
+        select(Ticket)
+        .options(*options)
+        .where(Ticket.id == ticket_id)
+    )
+    ticket = result.scalar_one_or_none()
     if not ticket:
         raise HTTPException(404, f"Ticket {ticket_id} not found")
     return ticket
 
 
-@app.get("/tickets", response_model=List[TicketResponse])
+@app.get("/tickets", response_model=Union[TicketPage, TicketSummaryPage])
 async def list_tickets(
     status: Optional[TicketStatus] = None,
     queue: Optional[str] = None,
     is_critical: Optional[bool] = None,
     submitter_email: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    view: Literal["full", "summary"] = "full",
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    List tickets with optional filters.
+    List tickets with optional filters, newest first.
+    Pass the returned next_cursor back as `cursor` to fetch the next page.
+    
+    - view=summary: compact rows with body truncated to body_preview
+    - fields=id,subject,...: only the listed columns are selected and returned
     """
-    query = db.query(Ticket)
+    requested = parse_csv_param(fields, TICKET_FIELDS, "fields")
+    if requested:
+        # id and created_at are always selected to build the cursor
+        columns = [getattr(Ticket, name) for name in dict.fromkeys(requested + ["id", "created_at"])]
+    elif view == "summary":
+        columns = ticket_summary_columns(SUMMARY_BODY_CHARS)
+    else:
+        columns = None
+    
+    try:
+        query = ticket_list_query(status, queue, is_critical, submitter_email, cursor, columns)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     
-    # Apply filters
-    if status:
-        query = query.filter(Ticket.status == status)
-    if queue:
-        query = query.filter(Ticket.predicted_queue == queue)
-    if is_critical is not None:
-        query = query.filter(Ticket.is_critical == is_critical)
-    if submitter_email:
-        query = query.filter(Ticket.submitter_email == submitter_email)
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(query.limit(limit + 1))
+    rows = result.all() if columns else result.scalars().all()
     
-    # Order by created_at desc
-    query = query.order_by(desc(Ticket.created_at))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
     
-    tickets = query.offset(skip).limit(limit).all()
-    return tickets
+    if requested:
+        items = [{name: row._mapping[name] for name in requested} for row in rows]
+        return JSONResponse(jsonable_encoder({"items": items, "next_cursor": next_cursor}))
+    if view == "summary":
+        return TicketSummaryPage(items=rows, next_cursor=next_cursor)
+    return TicketPage(items=rows, next_cursor=next_cursor)
 
 
 @app.post("/tickets/{ticket_id}/triage", response_model=TriageResponse)
 async def triage_ticket(
     ticket_id: int,
-    request: TriageRequest,
-    db: Session = Depends(get_db)
+    request: TriageRequest
 ):
     """
     Run triage on a ticket:
     1. ML prediction (department + criticality)
     2. Retrieval (similar tickets)
-    3. Gemini draft generation (optional)
+    3. Gemini draft generation (optional; queued by priority when the
+       draft scheduler is running, see draft_scheduled)
+    
+    Steps 1-2 run on the classification worker pool; the request returns
+    as soon as the TRIAGED routing result is committed.
     """
     try:
-        triage_service = get_triage_service()
-        result = triage_service.triage_ticket(
-            ticket_id=ticket_id,
-            db=db,
-            run_draft=request.run_draft
-        )
+        future = get_triage_pipeline().submit(ticket_id, run_draft=request.run_draft)
+        result = await asyncio.wrap_future(future)
         
         return TriageResponse(
             success=result["success"],
-            message="Triage completed successfully",
+            message=(
+                f"Triage completed as duplicate of #{result['parent_id']}" if result["parent_id"]
+                else "Triage completed, draft queued" if result["draft_scheduled"]
+                else "Triage completed successfully"
+            ),
             predicted_queue=result["predicted_queue"],
             queue_confidence=result["queue_confidence"],
             critical_prob=result["critical_prob"],
             is_critical=result["is_critical"],
             draft_generated=result["draft_generated"],
-            needs_approval=result["needs_approval"]
+            draft_scheduled=result["draft_scheduled"],
+            needs_approval=result["needs_approval"],
+            parent_id=result["parent_id"]
         )
+    except ValueError as e:
+        raise HTTPException(404, str(e))
+    except WriteLockTimeout:
+        raise
     except Exception as e:
         logger.error(f"Triage failed for ticket {ticket_id}: {e}")
         raise HTTPException(500, f"Triage failed: {str(e)}")
@@ -197,31 +358,62 @@ async def triage_ticket(
 # ============================================================================
 
 @app.get("/approvals/pending", response_model=List[PendingApprovalItem])
-async def get_pending_approvals(db: Session = Depends(get_db)):
-    """Get list of tickets pending approval"""
-    tickets = db.query(Ticket).filter(
-        Ticket.status == TicketStatus.PENDING_APPROVAL
-    ).order_by(desc(Ticket.created_at)).all()
+async def get_pending_approvals(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get list of tickets pending approval (cached, supports If-None-Match)"""
     
-    results = []
-    for ticket in tickets:
-        response = db.query(Response).filter(Response.ticket_id == ticket.id).first()
-        results.append(PendingApprovalItem(
-            ticket_id=ticket.id,
-            subject=ticket.subject,
-            submitter_email=ticket.submitter_email,
-            predicted_queue=ticket.predicted_queue or "Unknown",
-            critical_prob=ticket.critical_prob or 0.0,
-            created_at=ticket.created_at,
-            draft_subject=response.draft_subject if response else None,
-            draft_body=response.draft_body if response else None
-        ))
+    async def compute() -> List[PendingApprovalItem]:
+        result = await db.execute(
+            select(Ticket).where(
+                Ticket.status == TicketStatus.PENDING_APPROVAL
+            ).order_by(desc(Ticket.created_at))
+        )
+        tickets = result.scalars().all()
+        
+        # Same-submitter duplicates of a pending ticket are approved with it: list the parent once
+        pending = {t.id: t for t in tickets}
+        covered = {
+            t.id for t in tickets
+            if t.parent_id in pending and same_submitter(t, pending[t.parent_id])
+        }
+        duplicate_counts = {}
+        for t in tickets:
+            if t.id in covered:
+                duplicate_counts[t.parent_id] = duplicate_counts.get(t.parent_id, 0) + 1
+        tickets = [t for t in tickets if t.id not in covered]
+        
+        # Load first response per ticket in one query instead of one per ticket
+        responses = {}
+        if tickets:
+            result = await db.execute(
+                select(Response)
+                .where(Response.ticket_id.in_([t.id for t in tickets]))
+                .order_by(Response.id)
+            )
+            for response in result.scalars():
+                responses.setdefault(response.ticket_id, response)
+        
+        results = []
+        for ticket in tickets:
+            response = responses.get(ticket.id)
+            results.append(PendingApprovalItem(
+                ticket_id=ticket.id,
+                subject=ticket.subject,
+                submitter_email=ticket.submitter_email,
+                predicted_queue=ticket.predicted_queue or "Unknown",
+                critical_prob=ticket.critical_prob or 0.0,
+                created_at=ticket.created_at,
+                draft_subject=response.draft_subject if response else None,
+                draft_body=response.draft_body if response else None,
+                duplicate_count=duplicate_counts.get(ticket.id, 0)
+            ))
+        
+        return results
     
-    return results
+    return await cached_json_response(request, db, "approvals:pending", compute)
 
 
 @app.post("/tickets/{ticket_id}/approve")
-async def approve_ticket(
+def approve_ticket(
     ticket_id: int,
     approval: ApprovalCreate,
     db: Session = Depends(get_db)
@@ -229,6 +421,7 @@ async def approve_ticket(
     """
     Approve a ticket and send response.
     Optionally edit the response before sending.
+    (Plain def, run on the thread pool like create_ticket.)
     """
     try:
         approval_service = get_approval_service()
@@ -242,19 +435,22 @@ async def approve_ticket(
             decision_notes=approval.decision_notes
         )
         return result
+    except WriteLockTimeout:
+        raise
     except Exception as e:
         logger.error(f"Approval failed for ticket {ticket_id}: {e}")
         raise HTTPException(500, f"Approval failed: {str(e)}")
 
 
 @app.post("/tickets/{ticket_id}/reject")
-async def reject_ticket(
+def reject_ticket(
     ticket_id: int,
     approval: ApprovalCreate,
     db: Session = Depends(get_db)
 ):
     """
     Reject a ticket (request more info or changes).
+    (Plain def, run on the thread pool like create_ticket.)
     """
     try:
         approval_service = get_approval_service()
@@ -266,6 +462,8 @@ async def reject_ticket(
             decision_notes=approval.decision_notes
         )
         return result
+    except WriteLockTimeout:
+        raise
     except Exception as e:
         logger.error(f"Rejection failed for ticket {ticket_id}: {e}")
         raise HTTPException(500, f"Rejection failed: {str(e)}")
@@ -276,107 +474,276 @@ async def reject_ticket(
 # ============================================================================
 
 @app.get("/dashboard/summary", response_model=DashboardSummary)
-async def get_dashboard_summary(db: Session = Depends(get_db)):
-    """Get dashboard KPI summary"""
-    
-    # Total tickets
-    total_tickets = db.query(func.count(Ticket.id)).scalar()
-    
-    # Open tickets (not sent)
-    open_tickets = db.query(func.count(Ticket.id)).filter(
-        Ticket.status != TicketStatus.SENT
-    ).scalar()
+async def get_dashboard_summary(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Get dashboard KPI summary (cached, supports If-None-Match)"""
     
-    # Critical count
-    critical_count = db.query(func.count(Ticket.id)).filter(
-        Ticket.is_critical == True
-    ).scalar()
-    
-    # Pending approval count
-    pending_approval_count = db.query(func.count(Ticket.id)).filter(
-        Ticket.status == TicketStatus.PENDING_APPROVAL
-    ).scalar()
+    async def compute() -> DashboardSummary:
+        async def count(*conditions) -> int:
+            return (await db.execute(select(func.count(Ticket.id)).where(*conditions))).scalar()
+        
+        # Total tickets
+        total_tickets = await count()
+        
+        # Open tickets (not sent)
+        open_tickets = await count(Ticket.status != TicketStatus.SENT)
+        
+        # Critical count
+        critical_count = await count(Ticket.is_critical == True)
+        
+        # Pending approval count
+        pending_approval_count = await count(Ticket.status == TicketStatus.PENDING_APPROVAL)
+        
+        # Average response time (hours) for sent tickets
+        result = await db.execute(
+            select(Ticket.sent_at, Ticket.created_at).where(
+                Ticket.sent_at.isnot(None),
+                Ticket.created_at.isnot(None)
+            )
+        )
+        sent_times = result.all()
+        
+        if sent_times:
+            response_times = [
+                (sent_at - created_at).total_seconds() / 3600
+                for sent_at, created_at in sent_times
+            ]
+            avg_response_time = sum(response_times) / len(response_times)
+        else:
+            avg_response_time = None
+        
+        # Tickets by queue
+        result = await db.execute(
+            select(Ticket.predicted_queue, func.count(Ticket.id))
+            .where(Ticket.predicted_queue.isnot(None))
+            .group_by(Ticket.predicted_queue)
+        )
+        tickets_by_queue = {queue: count for queue, count in result.all()}
+        
+        # Tickets by priority (using critical flag)
+        tickets_by_priority = {
+            "high": await count(Ticket.is_critical == True),
+            "medium": await count(Ticket.is_critical == False)
+        }
+        
+        # Tickets by status
+        result = await db.execute(
+            select(Ticket.status, func.count(Ticket.id)).group_by(Ticket.status)
+        )
+        tickets_by_status = {status.value: count for status, count in result.all()}
+        
+        return DashboardSummary(
+            total_tickets=total_tickets,
+            open_tickets=open_tickets,
+            critical_count=critical_count,
+            pending_approval_count=pending_approval_count,
+            avg_response_time_hours=avg_response_time,
+            tickets_by_queue=tickets_by_queue,
+            tickets_by_priority=tickets_by_priority,
+            tickets_by_status=tickets_by_status
+        )
     
-    # Average response time (hours) for sent tickets
-    sent_tickets = db.query(Ticket).filter(
-        Ticket.sent_at.isnot(None),
-        Ticket.created_at.isnot(None)
-    ).all()
+    return await cached_json_response(request, db, "dashboard:summary", compute)
+
+
+@app.get("/dashboard/timeseries", response_model=List[TicketTimeSeriesPoint])
+async def get_ticket_timeseries(request: Request, days: int = 30, db: AsyncSession = Depends(get_async_db)):
+    """Get ticket counts over time (cached, supports If-None-Match)"""
     
-    if sent_tickets:
-        response_times = [
-            (t.sent_at - t.created_at).total_seconds() / 3600
-            for t in sent_tickets
+    async def compute() -> List[TicketTimeSeriesPoint]:
+        # Get tickets from last N days
+        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        result = await db.execute(
+            select(Ticket.created_at, Ticket.is_critical).where(
+                Ticket.created_at >= cutoff_date
+            )
+        )
+        
+        # Group by date
+        date_counts = {}
+        for created_at, is_critical in result.all():
+            date_str = created_at.strftime("%Y-%m-%d")
+            if date_str not in date_counts:
+                date_counts[date_str] = {"total": 0, "critical": 0}
+            date_counts[date_str]["total"] += 1
+            if is_critical:
+                date_counts[date_str]["critical"] += 1
+        
+        # Convert to list
+        results = [
+            TicketTimeSeriesPoint(
+                date=date_str,
+                count=counts["total"],
+                critical_count=counts["critical"]
+            )
+            for date_str, counts in sorted(date_counts.items())
         ]
-        avg_response_time = sum(response_times) / len(response_times)
-    else:
-        avg_response_time = None
-    
-    # Tickets by queue
-    queue_counts = db.query(
-        Ticket.predicted_queue,
-        func.count(Ticket.id)
-    ).filter(
-        Ticket.predicted_queue.isnot(None)
-    ).group_by(Ticket.predicted_queue).all()
-    tickets_by_queue = {queue: count for queue, count in queue_counts}
-    
-    # Tickets by priority (using critical flag)
-    tickets_by_priority = {
-        "high": db.query(func.count(Ticket.id)).filter(Ticket.is_critical == True).scalar(),
-        "medium": db.query(func.count(Ticket.id)).filter(Ticket.is_critical == False).scalar()
-    }
-    
-    # Tickets by status
-    status_counts = db.query(
-        Ticket.status,
-        func.count(Ticket.id)
-    ).group_by(Ticket.status).all()
-    tickets_by_status = {status.value: count for status, count in status_counts}
+        
+        return results
     
-    return DashboardSummary(
-        total_tickets=total_tickets,
-        open_tickets=open_tickets,
-        critical_count=critical_count,
-        pending_approval_count=pending_approval_count,
-        avg_response_time_hours=avg_response_time,
-        tickets_by_queue=tickets_by_queue,
-        tickets_by_priority=tickets_by_priority,
-        tickets_by_status=tickets_by_status
-    )
+    # The window moves with the date, so the day is part of the key
+    key = f"dashboard:timeseries:{days}:{datetime.utcnow().date()}"
+    return await cached_json_response(request, db, key, compute)
 
 
-@app.get("/dashboard/timeseries", response_model=List[TicketTimeSeriesPoint])
-async def get_ticket_timeseries(days: int = 30, db: Session = Depends(get_db)):
-    """Get ticket counts over time"""
+@app.get("/incidents/active", response_model=List[ActiveIncident])
+async def get_active_incidents(
+    min_size: int = Query(INCIDENT_MIN_SIZE, ge=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Clusters of similar tickets in the sliding window, largest first (maintained incrementally at triage)"""
+    tracker = get_incident_tracker()
+    # Tickets classified by other workers since the last sync (at most every INCIDENT_SYNC_S)
+    await asyncio.to_thread(tracker.sync, SessionLocal)
+    return tracker.active_incidents(min_size=min_size, limit=limit)
+
+
+# ============================================================================
+# EVENT STREAM ENDPOINTS
+# ============================================================================
+
+@app.websocket("/ws/events")
+async def events_websocket(
+    websocket: WebSocket,
+    queue: Optional[str] = None,
+    submitter_email: Optional[str] = None,
+    types: Optional[str] = None,
+    since: Optional[int] = None
+):
+    """
+    Push ticket lifecycle events as JSON messages.
+    Filter by queue, submitter_email and comma-separated event types; pass
+    since=<last event id> when reconnecting to replay missed events.
+    """
+    try:
+        event_types = parse_csv_param(types, EVENT_TYPES, "types")
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
     
-    # Get tickets from last N days
-    cutoff_date = datetime.utcnow() - timedelta(days=days)
-    tickets = db.query(Ticket).filter(
-        Ticket.created_at >= cutoff_date
-    ).all()
+    await websocket.accept()
+    broker = get_event_broker()
+    subscription = broker.subscribe(queue, submitter_email, event_types)
+    try:
+        async for event in broker.stream(subscription, since):
+            await websocket.send_json(event or {"type": "heartbeat"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@app.get("/events/stream")
+async def events_sse(
+    request: Request,
+    queue: Optional[str] = None,
+    submitter_email: Optional[str] = None,
+    types: Optional[str] = None,
+    since: Optional[int] = None
+):
+    """Server-Sent Events equivalent of /ws/events (honours Last-Event-ID)"""
+    event_types = parse_csv_param(types, EVENT_TYPES, "types")
+    last_event_id = request.headers.get("last-event-id")
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
     
-    # Group by date
-    date_counts = {}
-    for ticket in tickets:
-        date_str = ticket.created_at.strftime("%Y-%m-%d")
-        if date_str not in date_counts:
-            date_counts[date_str] = {"total": 0, "critical": 0}
-        date_counts[date_str]["total"] += 1
-        if ticket.is_critical:
-            date_counts[date_str]["critical"] += 1
+    broker = get_event_broker()
+    subscription = broker.subscribe(queue, submitter_email, event_types)
     
-    # Convert to list
-    results = [
-        TicketTimeSeriesPoint(
-            date=date_str,
-            count=counts["total"],
-            critical_count=counts["critical"]
-        )
-        for date_str, counts in sorted(date_counts.items())
-    ]
+    async def generate():
+        try:
+            async for event in broker.stream(subscription, since):
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
     
-    return results
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ============================================================================
+# MONITORING ENDPOINTS
+# ============================================================================
+
+@app.get("/ml/shadow/stats")
+async def get_shadow_stats():
+    """Agreement and confidence-shift statistics for the shadow/canary candidate model"""
+    # Stats never load the models on the event loop: no predictor yet, nothing compared yet
+    predictor = get_loaded_predictor()
+    if predictor is None:
+        return {"mode": "off", "loaded": False}
+    if predictor.shadow is None:
+        return {"mode": "off"}
+    return predictor.shadow.get_stats()
+
+
+@app.get("/retrieval/stats")
+async def get_retrieval_stats():
+    """Retrieval mode, search counts and latency per component (embed, dense, BM25, fusion)"""
+    # Stats never load the embedder and indexes on the event loop
+    retriever = get_loaded_retriever()
+    if retriever is None:
+        return {"indexed": False, "loaded": False}
+    return retriever.get_stats()
+
+
+@app.get("/triage/pipeline/stats")
+async def get_triage_pipeline_stats():
+    """Queue depth, concurrency and latency of the classification and drafting stages"""
+    return get_triage_pipeline().get_stats()
+
+
+@app.get("/triage/scheduler/stats")
+async def get_draft_scheduler_stats():
+    """Draft queue depth and wait times per priority class"""
+    return get_draft_scheduler().get_stats()
+
+
+@app.get("/dedup/stats")
+async def get_dedup_stats():
+    """Near-duplicate detector counters (checked, linked, indexed recent tickets)"""
+    return get_duplicate_detector().get_stats()
+
+
+@app.get("/incidents/stats")
+async def get_incident_stats():
+    """Live cluster counters of the incident tracker"""
+    return get_incident_tracker().get_stats()
+
+
+@app.get("/runtime/threads")
+async def get_runtime_threads():
+    """CPU thread budget of this worker and the thread limits of torch, FAISS, BLAS and the loaded estimators"""
+    info = get_runtime_info()
+    # Diagnostics must not load the models on the event loop
+    predictor = get_loaded_predictor()
+    if predictor is None:
+        info["estimators"] = "not loaded"
+    else:
+        info["estimators"] = {
+            "department": estimator_jobs(predictor.dept_classifier),
+            "criticality": estimator_jobs(predictor.critical_classifier)
+        }
+    return info
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss/304 counters of the read-endpoint response cache"""
+    return get_response_cache().get_stats()
+
+
+@app.get("/events/stats")
+async def get_event_stats():
+    """Subscriber and delivery counters of this worker's event broker"""
+    return get_event_broker().get_stats()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""
+Per-process response cache with ETags for read-heavy endpoints.
+
+Cached bodies are tagged with the ticket change counter (backend.db), which is
+bumped by every ticket, response or approval write (on SQLite in the same
+transaction, elsewhere right after the commit).
+A request first checks the counter (one primary-key lookup, itself cached for
+CACHE_VERSION_TTL_S): an unchanged counter answers If-None-Match with 304 or
+serves the cached body without recomputing the aggregates.
+"""
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from sqlalchemy import select, event
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import hashlib
+import json
+import os
+import threading
+import time
+import logging
+from dotenv import load_dotenv
+
+from backend.db import TICKET_COUNTER
+from backend.models import ChangeCounter
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Maximum age of a cached body, even if the counter has not moved
+CACHE_TTL_S = float(os.getenv("CACHE_TTL_S", "30"))
+# How long the change counter itself is trusted before re-reading it
+CACHE_VERSION_TTL_S = float(os.getenv("CACHE_VERSION_TTL_S", "1"))
+
+
+class ResponseCache:
+    """
+    TTL cache of serialized JSON bodies keyed by endpoint + parameters,
+    valid only for the change-counter version they were computed at.
+    """
+
+    def __init__(self, ttl_s: float = CACHE_TTL_S, version_ttl_s: float = CACHE_VERSION_TTL_S):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl_s: Maximum age of a cached body in seconds
+            version_ttl_s: How long a counter read is reused (0 = every request)
+        """
+        self.ttl_s = ttl_s
+        self.version_ttl_s = version_ttl_s
+
+        self._entries: Dict[str, Tuple[int, float, bytes]] = {}
+        self._version: Optional[int] = None
+        self._version_read_at = 0.0
+        self._lock = threading.Lock()
+
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "version_reads": 0}
+
+    async def current_version(self, db: AsyncSession) -> int:
+        """Return the ticket change counter (re-read at most every version_ttl_s)"""
+        now = time.monotonic()
+        with self._lock:
+            if self._version is not None and now - self._version_read_at < self.version_ttl_s:
+                return self._version
+
+        result = await db.execute(
+            select(ChangeCounter.value).where(ChangeCounter.name == TICKET_COUNTER)
+        )
+        version = result.scalar() or 0
+
+        with self._lock:
+            self._version = version
+            self._version_read_at = now
+            self.stats["version_reads"] += 1
+        return version
+
+    def get(self, key: str, version: int) -> Optional[bytes]:
+        """Return the cached body for key if it was computed at version and is fresh"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == version and entry[1] > time.monotonic():
+                self.stats["hits"] += 1
+                return entry[2]
+            self.stats["misses"] += 1
+            return None
+
+    def set(self, key: str, version: int, body: bytes):
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_s, body)
+
+    def invalidate(self):
+        """Drop all entries and force a counter re-read (called after local writes)"""
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, "entries": len(self._entries), "version": self._version}
+
+
+def make_etag(key: str, version: int) -> str:
+    """Weak ETag for a cache key at a counter version"""
+    digest = hashlib.sha1(f"{key}@{version}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header against etag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates or etag.removeprefix("W/") in candidates
+
+
+async def cached_json_response(
+    request: Request,
+    db: AsyncSession,
+    key: str,
+    compute: Callable[[], Awaitable[Any]]
+) -> Response:
+    """
+    Serve compute() as JSON through the response cache.
+
+    Args:
+        request: Incoming request (for If-None-Match)
+        db: Async session used to read the change counter
+        key: Cache key (endpoint + parameters)
+        compute: Coroutine function producing the response data
+
+    Returns:
+        304 if the client's ETag is current, otherwise a JSON response with ETag
+    """
+    cache = get_response_cache()
+    version = await cache.current_version(db)
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request, etag):
+        cache.stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    body = cache.get(key, version)
+    if body is None:
+        body = json.dumps(jsonable_encoder(await compute())).encode()
+        cache.set(key, version, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    """Local writes are visible immediately, without waiting for version_ttl_s"""
+    if session.info.pop("tickets_changed", False):
+        get_response_cache().invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_flag_after_rollback(session):
+    session.info.pop("tickets_changed", None)
+
+
+# Global response cache instance
+_response_cache = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get global response cache instance (singleton pattern).
+    
+    Returns:
+        ResponseCache instance
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -1,26 +1,193 @@
 """
 Database connection and session management.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, update, insert
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
-from backend.models import Base
+from backend.models import Base, Ticket, Response, Approval, ChangeCounter
+from backend.search import SEARCH_DIALECTS, install_search_index, drop_search_index
 import os
+import threading
+import logging
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database URL from environment
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./tickets.db")
 
+# SQLite profile: "production" (WAL + tuned pragmas + serialized writes) or "legacy"
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024)))
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Set production pragmas on every new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.close()
+
+
+def create_db_engine(database_url: str = DATABASE_URL, sqlite_profile: str = SQLITE_PROFILE) -> Engine:
+    """
+    Create a SQLAlchemy engine.
+
+    Args:
+        database_url: Database URL
+        sqlite_profile: "production" or "legacy" (ignored for non-SQLite databases)
+
+    Returns:
+        Engine instance
+    """
+    is_sqlite = database_url.startswith("sqlite")
+    db_engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        echo=False
+    )
+    if is_sqlite and sqlite_profile == "production":
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+class WriteLockTimeout(TimeoutError):
+    """The process-wide SQLite write lock was not free within SQLITE_BUSY_TIMEOUT_MS"""
+
+
+class SerializedWriteSession(Session):
+    """
+    Session that takes a process-wide write lock at its first write (flush
+    or UPDATE/DELETE/INSERT statement) and holds it until the transaction ends.
+
+    SQLite allows one writer at a time; serializing writers in-process means
+    they wait in line instead of failing with "database is locked", while
+    readers (WAL) still run in parallel.
+    """
+
+    write_lock = threading.Lock()
+
+    def acquire_write_lock(self):
+        if self.info.get("holds_write_lock"):
+            return
+        if not self.write_lock.acquire(timeout=SQLITE_BUSY_TIMEOUT_MS / 1000):
+            raise WriteLockTimeout("Timed out waiting for database write lock")
+        self.info["holds_write_lock"] = True
+
+    def release_write_lock(self):
+        if self.info.pop("holds_write_lock", False):
+            self.write_lock.release()
+
+
+@event.listens_for(SerializedWriteSession, "before_flush")
+def _before_flush(session, flush_context, instances):
+    session.acquire_write_lock()
+
+
+@event.listens_for(SerializedWriteSession, "do_orm_execute")
+def _before_dml(orm_execute_state):
+    # Bulk statements (Query.update, session.execute(delete(...))) bypass
+    # flush; lock before SQLite's write lock, in the same order as flushes
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        orm_execute_state.session.acquire_write_lock()
+
+
+@event.listens_for(SerializedWriteSession, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    if transaction.parent is None:
+        session.release_write_lock()
+
+
+# Writes to these tables bump the "tickets" change counter
+TICKET_COUNTER = "tickets"
+TRACKED_MODELS = (Ticket, Response, Approval)
+
+
+def _bump_counter(conn):
+    result = conn.execute(
+        update(ChangeCounter)
+        .where(ChangeCounter.name == TICKET_COUNTER)
+        .values(value=ChangeCounter.value + 1)
+    )
+    if result.rowcount == 0:
+        conn.execute(insert(ChangeCounter).values(name=TICKET_COUNTER, value=1))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_change_counter(session, flush_context):
+    """
+    Increment the ticket change counter for a write.
+
+    Read caches (backend.cache) compare this counter instead of recomputing
+    aggregates, so every process sees a change as soon as it commits.
+    SQLite has a single writer anyway, so the counter is bumped in the same
+    transaction. Elsewhere the row lock would serialize every writer until
+    commit, so it is bumped after the commit in its own short transaction.
+    """
+    changed = any(
+        isinstance(obj, TRACKED_MODELS)
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    )
+    if not changed:
+        return
+    
+    conn = session.connection()
+    if conn.dialect.name == "sqlite":
+        _bump_counter(conn)
+    else:
+        session.info["counter_pending"] = True
+    session.info["tickets_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_change_counter_after_commit(session):
+    if not session.info.pop("counter_pending", False):
+        return
+    try:
+        with session.get_bind().begin() as conn:
+            _bump_counter(conn)
+    except Exception as e:
+        # Other workers' caches catch up after CACHE_TTL_S
+        logger.warning(f"Could not bump the ticket change counter: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_counter_after_rollback(session):
+    session.info.pop("counter_pending", None)
+
+
+def create_session_factory(db_engine: Engine, sqlite_profile: str = SQLITE_PROFILE) -> sessionmaker:
+    """
+    Create a session factory for an engine.
+
+    Args:
+        db_engine: Engine to bind
+        sqlite_profile: "production" serializes SQLite writes
+
+    Returns:
+        sessionmaker instance
+    """
+    serialize = db_engine.dialect.name == "sqlite" and sqlite_profile == "production"
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        bind=db_engine,
+        class_=SerializedWriteSession if serialize else Session
+    )
+
+
 # Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
-    echo=False
-)
+engine = create_db_engine()
 
 # Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = create_session_factory(engine)
 
 
 def get_db():
@@ -38,11 +205,17 @@ def get_db():
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    if engine.dialect.name in SEARCH_DIALECTS:
+        install_search_index(engine)
     print("[OK] Database initialized successfully")
 
 
 def reset_db():
     """Drop and recreate all tables (USE WITH CAUTION!)"""
+    if engine.dialect.name in SEARCH_DIALECTS:
+        drop_search_index(engine)
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    if engine.dialect.name in SEARCH_DIALECTS:
+        install_search_index(engine)
     print("[OK] Database reset successfully")
@@ -0,0 +1,79 @@
+"""
+Async database engine and session management for FastAPI read endpoints.
+Uses aiosqlite for SQLite and asyncpg for Postgres. The sync engine in
+backend.db remains the path for writes, services and scripts.
+"""
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy import event
+import os
+from dotenv import load_dotenv
+
+from backend.db import DATABASE_URL, SQLITE_PROFILE, _apply_sqlite_pragmas
+
+load_dotenv()
+
+# Pool sizing (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Map a sync database URL to its async driver.
+
+    sqlite:///...      -> sqlite+aiosqlite:///...
+    postgresql://...   -> postgresql+asyncpg://...
+    """
+    if database_url.startswith("sqlite+aiosqlite") or "+asyncpg" in database_url:
+        return database_url
+    if database_url.startswith("sqlite"):
+        return "sqlite+aiosqlite" + database_url[len("sqlite"):]
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if database_url.startswith(prefix):
+            return "postgresql+asyncpg://" + database_url[len(prefix):]
+    return database_url
+
+
+def create_async_db_engine(database_url: str = DATABASE_URL, sqlite_profile: str = SQLITE_PROFILE) -> AsyncEngine:
+    """
+    Create an async SQLAlchemy engine.
+
+    Args:
+        database_url: Sync or async database URL
+        sqlite_profile: "production" applies the same pragmas as the sync engine
+
+    Returns:
+        AsyncEngine instance
+    """
+    url = to_async_url(database_url)
+    is_sqlite = url.startswith("sqlite")
+
+    kwargs = {"echo": False, "pool_pre_ping": True}
+    if not is_sqlite:
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE_S
+        )
+
+    db_engine = create_async_engine(url, **kwargs)
+    if is_sqlite and sqlite_profile == "production":
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return db_engine
+
+
+# Create async engine
+async_engine = create_async_db_engine()
+
+# Create async session factory
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def get_async_db():
+    """
+    Dependency for getting async database session.
+    Usage: db: AsyncSession = Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,141 @@
+"""
+Persisted ticket embeddings (ticket_embeddings table).
+
+Triage stores each ticket's full embedding as float16 bytes together with
+the embedding model name, so re-triage, index rebuilds, duplicate and
+drift analysis and retraining on production tickets can reuse it instead
+of re-encoding. Bulk reads return contiguous (n, dim) float16 arrays in
+ticket id order; only vectors of the requested model version are returned.
+"""
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Iterator, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from backend.models import TicketEmbedding
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DTYPE = np.float16
+
+
+def save_ticket_embedding(db: Session, ticket_id: int, embedding: np.ndarray, model_version: str):
+    """
+    Add or replace a ticket's embedding; written when the session commits.
+
+    Args:
+        db: Database session of the triage transaction
+        ticket_id: Ticket ID
+        embedding: Full (unreduced) embedding vector
+        model_version: Embedding model name
+    """
+    vector = np.ascontiguousarray(np.asarray(embedding).ravel(), dtype=EMBEDDING_DTYPE)
+    db.merge(TicketEmbedding(
+        ticket_id=ticket_id,
+        model_version=model_version,
+        dim=vector.shape[0],
+        vector=vector.tobytes()
+    ))
+
+
+def get_ticket_embedding(db: Session, ticket_id: int, model_version: str) -> Optional[np.ndarray]:
+    """Stored float32 embedding of one ticket, or None if missing or from another model"""
+    row = db.execute(
+        select(TicketEmbedding.vector)
+        .where(TicketEmbedding.ticket_id == ticket_id, TicketEmbedding.model_version == model_version)
+    ).first()
+    if row is None:
+        return None
+    return np.frombuffer(row[0], dtype=EMBEDDING_DTYPE).astype(np.float32)
+
+
+def _to_arrays(rows: Sequence[Tuple[int, int, bytes]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(ticket_id, dim, vector) rows -> (int64 ids, float16 (n, dim) matrix)"""
+    if not rows:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=EMBEDDING_DTYPE)
+    dims = {dim for _, dim, _ in rows}
+    if len(dims) > 1:
+        raise ValueError(f"Stored embeddings have mixed dimensions: {sorted(dims)}")
+    ids = np.fromiter((ticket_id for ticket_id, _, _ in rows), dtype=np.int64, count=len(rows))
+    vectors = np.frombuffer(b"".join(vector for _, _, vector in rows), dtype=EMBEDDING_DTYPE)
+    return ids, vectors.reshape(len(rows), dims.pop())
+
+
+def load_embedding_range(
+    db: Session,
+    model_version: str,
+    start_id: Optional[int] = None,
+    end_id: Optional[int] = None,
+    limit: Optional[int] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embeddings of tickets with start_id <= id < end_id.
+
+    Args:
+        db: Database session
+        model_version: Embedding model name
+        start_id: First ticket id (inclusive, optional)
+        end_id: Last ticket id (exclusive, optional)
+        limit: Maximum rows (optional)
+
+    Returns:
+        (ticket ids, float16 matrix of shape (n, dim)), ascending by id
+    """
+    query = (
+        select(TicketEmbedding.ticket_id, TicketEmbedding.dim, TicketEmbedding.vector)
+        .where(TicketEmbedding.model_version == model_version)
+        .order_by(TicketEmbedding.ticket_id)
+    )
+    if start_id is not None:
+        query = query.where(TicketEmbedding.ticket_id >= start_id)
+    if end_id is not None:
+        query = query.where(TicketEmbedding.ticket_id < end_id)
+    if limit is not None:
+        query = query.limit(limit)
+    return _to_arrays(db.execute(query).all())
+
+
+def load_embeddings_by_ids(
+    db: Session,
+    ticket_ids: Sequence[int],
+    model_version: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embeddings of the given tickets (missing ones are left out).
+
+    Returns:
+        (ticket ids, float16 matrix of shape (n, dim)), ascending by id
+    """
+    if not len(ticket_ids):
+        return _to_arrays([])
+    query = (
+        select(TicketEmbedding.ticket_id, TicketEmbedding.dim, TicketEmbedding.vector)
+        .where(TicketEmbedding.model_version == model_version, TicketEmbedding.ticket_id.in_(list(map(int, ticket_ids))))
+        .order_by(TicketEmbedding.ticket_id)
+    )
+    return _to_arrays(db.execute(query).all())
+
+
+def iter_embedding_batches(
+    db: Session,
+    model_version: str,
+    batch_size: int = 10000,
+    start_id: Optional[int] = None,
+    end_id: Optional[int] = None
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Stream embeddings in id order with keyset pagination (bounded memory).
+
+    Yields:
+        (ticket ids, float16 matrix) per batch of at most batch_size rows
+    """
+    while True:
+        ids, vectors = load_embedding_range(db, model_version, start_id, end_id, limit=batch_size)
+        if not len(ids):
+            return
+        yield ids, vectors
+        if len(ids) < batch_size:
+            return
+        start_id = int(ids[-1]) + 1
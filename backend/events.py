@@ -0,0 +1,359 @@
+"""
+Ticket lifecycle events for push updates (WebSocket / SSE).
+
+Services record events in the ticket_events table in the same transaction as
+the state change (transactional outbox), so an event is published only if the
+change commits. Every API worker runs an EventBroker that relays new rows to
+its own subscribers: the table is the pub/sub channel shared by all workers,
+and local commits wake the relay immediately instead of waiting for the next
+poll.
+
+Event ids are not committed in order everywhere: SQLite has a single writer,
+but on Postgres a transaction can commit after one holding a higher sequence
+id. Ids the relay skips over are kept as gaps and fetched again on every
+poll until they commit or EVENT_GAP_TIMEOUT_S passes (rolled-back
+transactions leave permanent gaps).
+"""
+from sqlalchemy import select, delete, func, event, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from datetime import datetime, timedelta
+import asyncio
+import os
+import time
+import logging
+from dotenv import load_dotenv
+
+from backend.models import Ticket, TicketEvent, TicketStatus
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Relay settings
+EVENT_POLL_INTERVAL_S = float(os.getenv("EVENT_POLL_INTERVAL_S", "0.5"))
+EVENT_RETENTION_S = float(os.getenv("EVENT_RETENTION_S", "3600"))
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "256"))
+EVENT_HEARTBEAT_S = float(os.getenv("EVENT_HEARTBEAT_S", "25"))
+EVENT_GAP_TIMEOUT_S = float(os.getenv("EVENT_GAP_TIMEOUT_S", "30"))
+
+# Most skipped ids tracked at once (older ones are given up first)
+MAX_GAPS = 1000
+
+EVENT_TYPES = [
+    "ticket.created",
+    "ticket.triaged",
+    "ticket.drafted",
+    "ticket.pending_approval",
+    "ticket.approved",
+    "ticket.sent",
+    "ticket.rejected",
+]
+
+
+def status_event_type(status: TicketStatus) -> str:
+    """Event type announcing that a ticket entered status"""
+    return "ticket.created" if status == TicketStatus.NEW else f"ticket.{status.value.lower()}"
+
+
+def record_event(db: Session, ticket: Ticket, event_type: str):
+    """
+    Add a lifecycle event to the session; it is published when the session commits.
+
+    Args:
+        db: Database session holding the state change
+        ticket: Ticket the event is about (may not have an id yet)
+        event_type: One of EVENT_TYPES
+    """
+    status = ticket.status or TicketStatus.NEW
+    db.add(TicketEvent(
+        ticket=ticket,
+        event_type=event_type,
+        status=status.value,
+        predicted_queue=ticket.predicted_queue,
+        submitter_email=ticket.submitter_email,
+        is_critical=bool(ticket.is_critical)
+    ))
+    db.info["events_recorded"] = True
+
+
+def event_to_dict(row: TicketEvent) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "type": row.event_type,
+        "ticket_id": row.ticket_id,
+        "status": row.status,
+        "queue": row.predicted_queue,
+        "submitter_email": row.submitter_email,
+        "is_critical": row.is_critical,
+        "created_at": row.created_at.isoformat() if row.created_at else None
+    }
+
+
+class Subscription:
+    """One connected client: its filters and a bounded queue of pending events"""
+
+    def __init__(
+        self,
+        queue: Optional[str] = None,
+        submitter_email: Optional[str] = None,
+        event_types: Optional[Sequence[str]] = None,
+        maxsize: int = EVENT_QUEUE_SIZE
+    ):
+        self.queue_filter = queue
+        self.submitter_email = submitter_email
+        self.event_types = set(event_types) if event_types else None
+        self.events: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.event_types and event["type"] not in self.event_types:
+            return False
+        if self.queue_filter and event["queue"] != self.queue_filter:
+            return False
+        if self.submitter_email and event["submitter_email"] != self.submitter_email:
+            return False
+        return True
+
+    def offer(self, event: Dict[str, Any]):
+        """Enqueue without blocking the relay; a slow client loses its oldest events"""
+        if self.events.full():
+            self.events.get_nowait()
+            self.dropped += 1
+        self.events.put_nowait(event)
+
+
+class EventBroker:
+    """
+    Relays committed ticket events from the database to local subscribers.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[async_sessionmaker] = None,
+        poll_interval_s: float = EVENT_POLL_INTERVAL_S,
+        retention_s: float = EVENT_RETENTION_S
+    ):
+        """
+        Initialize the broker.
+
+        Args:
+            session_factory: Async session factory (default: backend.db_async.AsyncSessionLocal)
+            poll_interval_s: Poll interval for events committed by other workers
+            retention_s: Age after which events are pruned from the table
+        """
+        if session_factory is None:
+            from backend.db_async import AsyncSessionLocal
+            session_factory = AsyncSessionLocal
+        self.session_factory = session_factory
+        self.poll_interval_s = poll_interval_s
+        self.retention_s = retention_s
+
+        self.subscriptions: List[Subscription] = []
+        self.last_id = 0
+        self.delivered = 0
+        self.late = 0
+        self._gaps: Dict[int, float] = {}  # skipped id -> monotonic time it was noticed
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_prune = 0.0
+
+    async def start(self):
+        """Start relaying events committed from now on"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+
+        async with self.session_factory() as db:
+            self.last_id = (await db.execute(select(func.max(TicketEvent.id)))).scalar() or 0
+
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✓ Event broker started (last event id {self.last_id})")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def notify(self):
+        """Wake the relay (thread-safe; called after a local commit recorded events)"""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def subscribe(
+        self,
+        queue: Optional[str] = None,
+        submitter_email: Optional[str] = None,
+        event_types: Optional[Sequence[str]] = None
+    ) -> Subscription:
+        subscription = Subscription(queue, submitter_email, event_types)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscriptions:
+            self.subscriptions.remove(subscription)
+
+    async def replay(self, since_id: int, subscription: Subscription, limit: int = 500) -> List[Dict[str, Any]]:
+        """Events after since_id matching the subscription (for reconnecting clients)"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(TicketEvent)
+                .where(TicketEvent.id > since_id, TicketEvent.id <= self.last_id)
+                .order_by(TicketEvent.id)
+                .limit(limit)
+            )
+            events = [event_to_dict(row) for row in result.scalars()]
+        return [e for e in events if subscription.matches(e)]
+
+    async def stream(
+        self,
+        subscription: Subscription,
+        since_id: Optional[int] = None,
+        heartbeat_s: float = EVENT_HEARTBEAT_S
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events for a subscription, replaying from since_id first.
+        Yields None every heartbeat_s without events so callers can keep the
+        connection alive (and notice disconnected clients).
+        """
+        replayed_ids = set()
+        if since_id is not None:
+            for replayed in await self.replay(since_id, subscription):
+                replayed_ids.add(replayed["id"])
+                yield replayed
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.events.get(), timeout=heartbeat_s)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            # Skip events already sent during replay (ids may arrive out of order)
+            if event["id"] not in replayed_ids:
+                yield event
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self._relay()
+                if time.monotonic() - self._last_prune > 60:
+                    await self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"  ! Event relay failed: {e}")
+
+    async def _relay(self):
+        """Fetch events committed since last_id, and skipped ids that committed late, and fan them out"""
+        while True:
+            now = time.monotonic()
+            for gap_id in [i for i, noticed in self._gaps.items() if now - noticed > EVENT_GAP_TIMEOUT_S]:
+                del self._gaps[gap_id]
+
+            condition = TicketEvent.id > self.last_id
+            if self._gaps:
+                condition = or_(condition, TicketEvent.id.in_(list(self._gaps)))
+            async with self.session_factory() as db:
+                result = await db.execute(
+                    select(TicketEvent)
+                    .where(condition)
+                    .order_by(TicketEvent.id)
+                    .limit(500)
+                )
+                events = [event_to_dict(row) for row in result.scalars()]
+
+            for event in events:
+                event_id = event["id"]
+                if event_id in self._gaps:
+                    del self._gaps[event_id]
+                    self.late += 1
+                elif event_id > self.last_id:
+                    for gap_id in range(max(self.last_id + 1, event_id - MAX_GAPS), event_id):
+                        self._gaps[gap_id] = now
+                    self.last_id = event_id
+                else:
+                    continue
+                for subscription in self.subscriptions:
+                    if subscription.matches(event):
+                        subscription.offer(event)
+                        self.delivered += 1
+
+            if len(self._gaps) > MAX_GAPS:
+                for gap_id in sorted(self._gaps)[:len(self._gaps) - MAX_GAPS]:
+                    del self._gaps[gap_id]
+
+            if len(events) < 500:
+                return
+
+    async def _prune(self):
+        """Delete events older than the retention window"""
+        self._last_prune = time.monotonic()
+        # Sync write session on a thread: an async DELETE would hold the SQLite
+        # write lock until its COMMIT is awaited, which a sync endpoint blocking
+        # the event loop would wait on forever
+        await asyncio.to_thread(self._prune_sync)
+
+    def _prune_sync(self):
+        from backend.db import SessionLocal
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_s)
+        db = SessionLocal()
+        try:
+            db.execute(delete(TicketEvent).where(TicketEvent.created_at < cutoff))
+            db.commit()
+        finally:
+            db.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscriptions),
+            "last_event_id": self.last_id,
+            "delivered": self.delivered,
+            "late": self.late,
+            "gaps": len(self._gaps),
+            "dropped": sum(s.dropped for s in self.subscriptions)
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_after_commit(session):
+    if session.info.pop("events_recorded", False):
+        get_event_broker().notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_flag_after_rollback(session):
+    session.info.pop("events_recorded", None)
+
+
+# Global event broker instance
+_broker = None
+
+
+def get_event_broker() -> EventBroker:
+    """
+    Get global event broker instance (singleton pattern).
+
+    Returns:
+        EventBroker instance
+    """
+    global _broker
+    if _broker is None:
+        _broker = EventBroker()
+    return _broker
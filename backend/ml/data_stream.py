@@ -0,0 +1,65 @@
+"""
+Chunked dataset readers for training and index builds.
+Streams CSV (pandas chunksize) or Parquet (pyarrow record batches) so peak
+memory is bounded by the chunk size instead of the file size.
+"""
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+# Columns the triage pipeline reads from the historical ticket dataset
+TICKET_COLUMNS = ['subject', 'body', 'answer', 'queue', 'priority', 'language']
+
+
+def iter_ticket_chunks(
+    dataset_path: str,
+    chunksize: int = 10000,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a ticket dataset in chunks.
+
+    Args:
+        dataset_path: Path to .csv or .parquet file
+        chunksize: Rows per chunk
+        columns: Columns to read (default: all)
+
+    Yields:
+        DataFrame chunks of at most chunksize rows
+    """
+    suffix = Path(dataset_path).suffix.lower()
+
+    if suffix in (".parquet", ".pq"):
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(dataset_path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        for chunk in pd.read_csv(dataset_path, chunksize=chunksize, usecols=columns):
+            yield chunk
+
+
+def prepare_chunk(df: pd.DataFrame, require_queue: bool = False) -> pd.DataFrame:
+    """
+    Clean a chunk and build the model input text.
+    Creates text = subject + "\n\n" + body
+    Creates is_critical = (priority == "high")
+
+    Args:
+        df: Raw chunk
+        require_queue: Drop rows without a queue label (training)
+
+    Returns:
+        Cleaned chunk with text and is_critical columns
+    """
+    df = df.copy()
+    df['text'] = df['subject'].fillna('') + "\n\n" + df['body'].fillna('')
+    df['is_critical'] = (df['priority'].str.lower() == 'high').astype(int)
+
+    mask = df['text'].notna()
+    if require_queue:
+        mask &= df['queue'].notna()
+
+    return df[mask].reset_index(drop=True)
@@ -0,0 +1,221 @@
+"""
+Near-duplicate ticket detection for storm coalescing.
+
+Incoming tickets are compared against a rolling in-memory index of recent
+tickets with MinHash LSH over normalized word shingles, before any
+embedding or classification work. A ticket whose estimated Jaccard
+similarity to a recent ticket reaches DEDUP_THRESHOLD is linked to that
+ticket as its parent and later inherits the parent's triage and draft.
+A draft written for another customer is never sent on the parent's
+approval: such duplicates wait in PENDING_APPROVAL for their own review.
+Only parents (tickets without a parent) are indexed, so every group has
+a single root.
+"""
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+import os
+import re
+import threading
+import zlib
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Detector settings
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+DEDUP_WINDOW_S = float(os.getenv("DEDUP_WINDOW_S", str(6 * 3600)))
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "50000"))
+
+# MinHash: 16 bands x 4 rows finds pairs at J=0.8 with probability > 0.999
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_SIZE = 3
+MIN_SHINGLES = 5
+_PRIME = (1 << 31) - 1
+
+_NUMBER = re.compile(r"\d+")
+_NON_WORD = re.compile(r"[^\w\s#]")
+
+
+def same_submitter(ticket: Any, parent: Any) -> bool:
+    """Whether a duplicate was filed by its parent's submitter (may share its reply)"""
+    return (ticket.submitter_email or "").strip().lower() == (parent.submitter_email or "").strip().lower()
+
+
+def normalize_text(text: str) -> List[str]:
+    """Lowercase, mask numbers (ticket ids, dates, IPs) and drop punctuation"""
+    text = _NUMBER.sub("#", text.lower())
+    return _NON_WORD.sub(" ", text).split()
+
+
+class DuplicateDetector:
+    """
+    Rolling MinHash LSH index of recent parent tickets.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEDUP_THRESHOLD,
+        window_s: float = DEDUP_WINDOW_S,
+        max_entries: int = DEDUP_MAX_ENTRIES,
+        seed: int = 42
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            threshold: Minimum estimated Jaccard similarity for a duplicate
+            window_s: How long a ticket can become a parent after creation
+            max_entries: Cap on indexed tickets (oldest are evicted first)
+            seed: Seed of the MinHash permutations
+        """
+        self.threshold = threshold
+        self.window_s = window_s
+        self.max_entries = max_entries
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+        self._rows = NUM_PERM // BANDS
+
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = {}
+        self._order: Deque[Tuple[datetime, int]] = deque()
+        self._lock = threading.Lock()
+
+        self.stats = {"checked": 0, "duplicates": 0, "indexed": 0, "evicted": 0}
+
+    def signature(self, subject: str, body: str) -> Optional[np.ndarray]:
+        """
+        MinHash signature of a ticket's normalized text.
+
+        Returns:
+            uint64 array of NUM_PERM values, or None if the text is too short
+            to compare reliably
+        """
+        words = normalize_text(f"{subject} {body}")
+        shingles = {
+            " ".join(words[i:i + SHINGLE_SIZE])
+            for i in range(max(1, len(words) - SHINGLE_SIZE + 1))
+        }
+        if len(shingles) < MIN_SHINGLES:
+            return None
+
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) & _PRIME for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+        # (a * x + b) mod p for every permutation and shingle; min over shingles
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(BANDS):
+            yield band, signature[band * self._rows:(band + 1) * self._rows].tobytes()
+
+    def find_parent(self, signature: Optional[np.ndarray]) -> Optional[Tuple[int, float]]:
+        """
+        Most similar recent parent ticket at or above the threshold.
+
+        Returns:
+            (ticket_id, estimated similarity) or None
+        """
+        if signature is None:
+            return None
+        with self._lock:
+            self._evict()
+            self.stats["checked"] += 1
+            candidates: Set[int] = set()
+            for key in self._band_keys(signature):
+                candidates.update(self._buckets.get(key, ()))
+
+            best = None
+            for ticket_id in candidates:
+                similarity = float(np.mean(self._signatures[ticket_id] == signature))
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (ticket_id, similarity)
+            if best:
+                self.stats["duplicates"] += 1
+            return best
+
+    def add(self, ticket_id: int, signature: Optional[np.ndarray], created_at: Optional[datetime] = None):
+        """Index a parent ticket"""
+        if signature is None:
+            return
+        with self._lock:
+            self._signatures[ticket_id] = signature
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, set()).add(ticket_id)
+            self._order.append((created_at or datetime.utcnow(), ticket_id))
+            self.stats["indexed"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drop tickets older than the window or beyond max_entries (caller holds the lock)"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.window_s)
+        while self._order and (self._order[0][0] < cutoff or len(self._order) > self.max_entries):
+            _, ticket_id = self._order.popleft()
+            signature = self._signatures.pop(ticket_id, None)
+            if signature is None:
+                continue
+            for key in self._band_keys(signature):
+                bucket = self._buckets.get(key)
+                if bucket is not None:
+                    bucket.discard(ticket_id)
+                    if not bucket:
+                        del self._buckets[key]
+            self.stats["evicted"] += 1
+
+    def warm(self, session_factory: Callable):
+        """Index the parent tickets created within the window (after a restart)"""
+        from backend.models import Ticket
+
+        cutoff = datetime.utcnow() - timedelta(seconds=self.window_s)
+        db = session_factory()
+        try:
+            rows = db.query(Ticket.id, Ticket.subject, Ticket.body, Ticket.created_at) \
+                .filter(Ticket.parent_id.is_(None), Ticket.created_at >= cutoff) \
+                .order_by(Ticket.created_at) \
+                .limit(self.max_entries) \
+                .all()
+        finally:
+            db.close()
+
+        for ticket_id, subject, body, created_at in rows:
+            self.add(ticket_id, self.signature(subject, body), created_at)
+        logger.info(f"✓ Duplicate index warmed with {len(rows)} recent tickets")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "enabled": DEDUP_ENABLED,
+                "threshold": self.threshold,
+                "window_s": self.window_s,
+                "entries": len(self._signatures)
+            }
+
+
+# Global detector instance
+_detector = None
+
+
+def get_duplicate_detector() -> DuplicateDetector:
+    """
+    Get global duplicate detector instance (singleton pattern).
+
+    Returns:
+        DuplicateDetector instance
+    """
+    global _detector
+    if _detector is None:
+        _detector = DuplicateDetector()
+    return _detector
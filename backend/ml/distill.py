@@ -0,0 +1,144 @@
+"""
+Compact linear head distilled from the department ensemble.
+Inference is a single NumPy matmul + softmax over the LOCAL embedding.
+"""
+import numpy as np
+from pathlib import Path
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def teacher_proba(teacher, X: np.ndarray) -> np.ndarray:
+    """
+    Soft targets of a trained classifier. Margin-only models (LinearSVC)
+    have no predict_proba; their decision_function scores go through a
+    softmax instead.
+    """
+    if hasattr(teacher, "predict_proba"):
+        return teacher.predict_proba(X)
+    scores = np.asarray(teacher.decision_function(X), dtype=np.float64)
+    if scores.ndim == 1:
+        scores = np.column_stack([-scores, scores])
+    return _softmax(scores)
+
+
+class LinearHead:
+    """
+    Softmax linear classifier: p = softmax(X @ W + b).
+
+    Exposes predict / predict_proba like a scikit-learn classifier so it can
+    replace the department classifier without changes in the caller.
+    Stored as two float32 .npy files (weights and bias).
+    """
+
+    WEIGHTS_FILE = "department_head_weights.npy"
+    BIAS_FILE = "department_head_bias.npy"
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: Optional[np.ndarray] = None):
+        self.weights = weights
+        self.bias = bias
+
+    @property
+    def classes_(self) -> np.ndarray:
+        return np.arange(self.weights.shape[1])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return _softmax(np.asarray(X, dtype=np.float32) @ self.weights + self.bias)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return np.argmax(np.asarray(X, dtype=np.float32) @ self.weights + self.bias, axis=1)
+
+    def fit_distill(
+        self,
+        X: np.ndarray,
+        teacher_probs: np.ndarray,
+        y: Optional[np.ndarray] = None,
+        alpha: float = 0.7,
+        temperature: float = 2.0,
+        epochs: int = 30,
+        batch_size: int = 256,
+        lr: float = 0.01,
+        l2: float = 1e-4,
+        random_state: int = 42
+    ) -> "LinearHead":
+        """
+        Fit the head to the teacher's soft predictions (Adam, mini-batch).
+
+        Args:
+            X: Training features (n, d)
+            teacher_probs: Teacher class probabilities (n, k)
+            y: Integer hard labels (optional, mixed in with weight 1 - alpha)
+            alpha: Weight of soft targets vs. hard labels
+            temperature: Softens teacher probabilities (> 1 = softer)
+            epochs: Passes over the training set
+            batch_size: Mini-batch size
+            lr: Adam learning rate
+            l2: L2 regularization strength
+            random_state: Random seed
+
+        Returns:
+            self
+        """
+        rng = np.random.default_rng(random_state)
+        n, d = X.shape
+        k = teacher_probs.shape[1]
+
+        # Temperature-softened soft targets, optionally mixed with one-hot labels
+        targets = _softmax(np.log(np.clip(teacher_probs, 1e-8, 1.0)) / temperature)
+        if y is not None:
+            onehot = np.eye(k, dtype=np.float32)[np.asarray(y)]
+            targets = alpha * targets + (1 - alpha) * onehot
+        targets = targets.astype(np.float32)
+
+        W = np.zeros((d, k), dtype=np.float32)
+        b = np.zeros(k, dtype=np.float32)
+        mW, vW = np.zeros_like(W), np.zeros_like(W)
+        mb, vb = np.zeros_like(b), np.zeros_like(b)
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        step = 0
+
+        for epoch in range(epochs):
+            order = rng.permutation(n)
+            for start in range(0, n, batch_size):
+                idx = np.sort(order[start:start + batch_size])
+                Xb = np.asarray(X[idx], dtype=np.float32)
+                grad = (_softmax(Xb @ W + b) - targets[idx]) / len(idx)
+                gW = Xb.T @ grad + l2 * W
+                gb = grad.sum(axis=0)
+
+                step += 1
+                mW = beta1 * mW + (1 - beta1) * gW
+                vW = beta2 * vW + (1 - beta2) * gW ** 2
+                mb = beta1 * mb + (1 - beta1) * gb
+                vb = beta2 * vb + (1 - beta2) * gb ** 2
+                correction = np.sqrt(1 - beta2 ** step) / (1 - beta1 ** step)
+                W -= lr * correction * mW / (np.sqrt(vW) + eps)
+                b -= lr * correction * mb / (np.sqrt(vb) + eps)
+
+        self.weights = W.astype(np.float32)
+        self.bias = b.astype(np.float32)
+        return self
+
+    def save(self, model_dir: Path):
+        """Save weights and bias as float32 .npy files"""
+        np.save(Path(model_dir) / self.WEIGHTS_FILE, self.weights.astype(np.float32))
+        np.save(Path(model_dir) / self.BIAS_FILE, self.bias.astype(np.float32))
+
+    @classmethod
+    def exists(cls, model_dir: Path) -> bool:
+        return (Path(model_dir) / cls.WEIGHTS_FILE).exists() and (Path(model_dir) / cls.BIAS_FILE).exists()
+
+    @classmethod
+    def load(cls, model_dir: Path) -> "LinearHead":
+        return cls(
+            weights=np.load(Path(model_dir) / cls.WEIGHTS_FILE),
+            bias=np.load(Path(model_dir) / cls.BIAS_FILE)
+        )
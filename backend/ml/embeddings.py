@@ -1,17 +1,64 @@
 """
 Local embedding generation using SentenceTransformers.
 NO GEMINI - uses multilingual local models only.
+
+embed_texts sorts texts by token length and packs them into batches under
+a padded-token budget (EMBEDDING_TOKEN_BUDGET), so one long email no
+longer pads a whole batch of short tickets; results are returned in input
+order. Texts longer than EMBEDDING_MAX_SEQ_LENGTH keep their head and tail
+(the greeting/problem statement and the latest reply or signature block).
 """
 from sentence_transformers import SentenceTransformer
 import numpy as np
 import os
 import pickle
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import logging
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+from backend.ml.projection import EmbeddingProjection
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Encoding settings (0 = the model's own sequence limit / fixed-size batches)
+EMBEDDING_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDING_MAX_SEQ_LENGTH", "0"))
+EMBEDDING_TOKEN_BUDGET = int(os.getenv("EMBEDDING_TOKEN_BUDGET", "16384"))
+
+# Share of the token limit kept from the start of a truncated text (rest from the end)
+HEAD_FRACTION = 0.25
+# Row cap for batches of very short texts
+MAX_BATCH_ROWS = 256
+
+
+def plan_batches(lengths: np.ndarray, token_budget: int, max_rows: int = MAX_BATCH_ROWS) -> List[np.ndarray]:
+    """
+    Group text indices into batches whose padded size (rows x longest) fits the budget.
+    
+    Texts are taken longest first, so memory peaks in the first batch. A
+    text longer than the budget gets a batch of its own.
+    
+    Args:
+        lengths: Token length per text
+        token_budget: Maximum rows x padded length per batch
+        max_rows: Maximum rows per batch
+        
+    Returns:
+        List of index arrays (into lengths)
+    """
+    order = np.argsort(-np.asarray(lengths), kind="stable")
+    batches = []
+    start = 0
+    while start < len(order):
+        longest = max(int(lengths[order[start]]), 1)
+        rows = max(1, min(max_rows, token_budget // longest))
+        batches.append(order[start:start + rows])
+        start += rows
+    return batches
+
 
 class LocalEmbedder:
     """
@@ -25,6 +72,7 @@ class LocalEmbedder:
     DEFAULT_MODEL = "BAAI/bge-m3"
     FALLBACK_MODEL = "intfloat/multilingual-e5-large"
     CACHE_DIR = "./embeddings_cache"
+    PROJECTION_DIR = Path("./models")
     
     def __init__(self, model_name: Optional[str] = None, cache_enabled: bool = True):
         """
@@ -51,57 +99,162 @@ class LocalEmbedder:
             self.model_name = self.FALLBACK_MODEL
             self.model = SentenceTransformer(self.model_name)
             logger.info(f"✓ Fallback model loaded: {self.model_name}")
+        
+        # Sequence limit (never above what the model supports)
+        model_limit = getattr(self.model, "max_seq_length", None) or 512
+        self.max_seq_length = min(EMBEDDING_MAX_SEQ_LENGTH, model_limit) if EMBEDDING_MAX_SEQ_LENGTH else model_limit
+        if hasattr(self.model, "max_seq_length"):
+            self.model.max_seq_length = self.max_seq_length
+        self.tokenizer = getattr(self.model, "tokenizer", None)
+        
+        # Reduced-dimension mode: projection fitted by scripts/train_models.py
+        self.projection = None
+        if EmbeddingProjection.exists(self.PROJECTION_DIR):
+            self.projection = EmbeddingProjection.load(self.PROJECTION_DIR)
+            logger.info(f"✓ Embedding projection loaded: {self.projection.source_dim} -> {self.projection.dim} dims")
+    
+    def prepare_texts(self, texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Apply head+tail truncation and measure token lengths.
+        
+        Args:
+            texts: List of text strings
+            
+        Returns:
+            (texts to encode, token length of each including special tokens)
+        """
+        if self.tokenizer is None:
+            # No tokenizer exposed: estimate ~4 characters per token
+            return list(texts), np.array([min(len(t) // 4 + 2, self.max_seq_length) for t in texts])
+        
+        special = self.tokenizer.num_special_tokens_to_add()
+        limit = self.max_seq_length - special
+        head = int(limit * HEAD_FRACTION)
+        token_ids = self.tokenizer(list(texts), add_special_tokens=False, truncation=False, verbose=False)["input_ids"]
+        
+        prepared = list(texts)
+        lengths = np.empty(len(texts), dtype=np.int64)
+        for i, ids in enumerate(token_ids):
+            if len(ids) > limit:
+                prepared[i], n_tokens = self._head_tail(ids, limit, head)
+                lengths[i] = n_tokens + special
+            else:
+                lengths[i] = len(ids) + special
+        return prepared, lengths
+    
+    def _head_tail(self, ids: List[int], limit: int, head: int) -> Tuple[str, int]:
+        """
+        Join the first head and the last limit - head tokens of a long text.
+        
+        Decoding and re-tokenizing can merge or split tokens at the join, so
+        the joined text is measured again and the head trimmed until it fits;
+        otherwise the model's right truncation would cut off the tail.
+        
+        Returns:
+            (joined text, its token count without special tokens)
+        """
+        tail = limit - head
+        while True:
+            parts = [self.tokenizer.decode(ids[:head]), self.tokenizer.decode(ids[len(ids) - tail:]) if tail else ""]
+            text = " ".join(part for part in parts if part)
+            n_tokens = len(self.tokenizer(text, add_special_tokens=False, truncation=False, verbose=False)["input_ids"])
+            overflow = n_tokens - limit
+            if overflow <= 0 or head + tail == 0:
+                return text, min(n_tokens, limit)
+            cut = min(overflow, head)
+            head -= cut
+            tail = max(0, tail - (overflow - cut))
     
     def embed_texts(
         self, 
         texts: List[str], 
         batch_size: int = 32,
         normalize: bool = True,
-        show_progress: bool = False
+        show_progress: bool = False,
+        reduce: bool = False,
+        token_budget: Optional[int] = None
     ) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of text strings
-            batch_size: Batch size for encoding
+            batch_size: Rows per batch when token batching is off (token_budget=0)
             normalize: L2 normalize embeddings
             show_progress: Show progress bar
+            reduce: Apply the trained projection (see reduce)
+            token_budget: Padded tokens per batch (default: EMBEDDING_TOKEN_BUDGET; 0 = fixed batch_size in input order)
             
         Returns:
-            numpy array of shape (len(texts), embedding_dim)
+            numpy array of shape (len(texts), embedding_dim), or (len(texts), output_dim) with reduce
         """
         if not texts:
             return np.array([])
         
-        # Generate embeddings
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            show_progress_bar=show_progress,
-            convert_to_numpy=True,
-            normalize_embeddings=normalize
-        )
+        token_budget = EMBEDDING_TOKEN_BUDGET if token_budget is None else token_budget
+        prepared, lengths = self.prepare_texts(texts)
         
-        return embeddings
+        if token_budget <= 0:
+            embeddings = self.model.encode(
+                prepared,
+                batch_size=batch_size,
+                show_progress_bar=show_progress,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize
+            )
+            return self.reduce(embeddings) if reduce else embeddings
+        
+        # Length-sorted batches under the token budget, written back in input order
+        embeddings = None
+        for batch in tqdm(plan_batches(lengths, token_budget), disable=not show_progress, desc="Batches"):
+            batch_embeddings = self.model.encode(
+                [prepared[i] for i in batch],
+                batch_size=len(batch),
+                show_progress_bar=False,
+                convert_to_numpy=True,
+                normalize_embeddings=normalize
+            )
+            if embeddings is None:
+                embeddings = np.empty((len(texts), batch_embeddings.shape[1]), dtype=batch_embeddings.dtype)
+            embeddings[batch] = batch_embeddings
+        
+        return self.reduce(embeddings) if reduce else embeddings
     
-    def embed_single(self, text: str, normalize: bool = True) -> np.ndarray:
+    def embed_single(self, text: str, normalize: bool = True, reduce: bool = False) -> np.ndarray:
         """
         Generate embedding for a single text.
         
         Args:
             text: Text string
             normalize: L2 normalize embedding
+            reduce: Apply the trained projection (see reduce)
             
         Returns:
-            numpy array of shape (embedding_dim,)
+            numpy array of shape (embedding_dim,), or (output_dim,) with reduce
         """
         embedding = self.model.encode(
-            text,
+            self.prepare_texts([text])[0][0],
             convert_to_numpy=True,
             normalize_embeddings=normalize
         )
-        return embedding
+        return self.reduce(embedding) if reduce else embedding
+    
+    def reduce(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Map full embeddings to the reduced space used by the classifiers and the FAISS index.
+        
+        Returns the input unchanged when no projection was trained. Caches
+        keep full embeddings so the projection can be refitted.
+        
+        Args:
+            embeddings: Embedding vector or rows of full dimension
+            
+        Returns:
+            Projected, L2-normalized embeddings
+        """
+        if self.projection is None:
+            return embeddings
+        return self.projection.transform(embeddings)
     
     def save_embeddings(self, embeddings: np.ndarray, filename: str):
         """
@@ -145,6 +298,11 @@ class LocalEmbedder:
     def embedding_dim(self) -> int:
         """Get embedding dimension"""
         return self.model.get_sentence_embedding_dimension()
+    
+    @property
+    def output_dim(self) -> int:
+        """Dimension of reduced embeddings (embedding_dim without a projection)"""
+        return self.projection.dim if self.projection is not None else self.embedding_dim
 
 
 # Global embedder instance
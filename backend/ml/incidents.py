@@ -0,0 +1,405 @@
+"""
+Sliding-window incident detection over the live ticket stream.
+
+Every classified ticket's embedding is assigned to the nearest online
+micro-cluster (cosine similarity >= INCIDENT_SIMILARITY) or starts a new
+one. A cluster keeps its statistics in fixed-width time buckets: each
+bucket holds the vector sum, ticket count and per-queue counts of the
+tickets that arrived in it. Buckets older than the window are subtracted
+when they expire, so nothing is re-clustered: an update costs one
+nearest-centroid search over the live clusters (O(clusters * dim)) plus
+O(1) amortized bucket upkeep. Clusters that reach INCIDENT_MIN_SIZE within
+the window are reported as active incidents.
+
+The tracker lives in each worker's memory. sync() fills it from the
+embeddings persisted at triage (ticket_embeddings): at startup it warms the
+window, and before incidents are reported it adds the tickets other workers
+classified since the last sync, so every worker counts the whole stream.
+"""
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+import os
+import threading
+import time
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Tracker settings
+INCIDENT_WINDOW_S = float(os.getenv("INCIDENT_WINDOW_S", str(2 * 3600)))
+INCIDENT_BUCKET_S = float(os.getenv("INCIDENT_BUCKET_S", "300"))
+INCIDENT_GROWTH_S = float(os.getenv("INCIDENT_GROWTH_S", "900"))
+INCIDENT_SIMILARITY = float(os.getenv("INCIDENT_SIMILARITY", "0.75"))
+INCIDENT_MIN_SIZE = int(os.getenv("INCIDENT_MIN_SIZE", "5"))
+INCIDENT_MAX_CLUSTERS = int(os.getenv("INCIDENT_MAX_CLUSTERS", "2000"))
+INCIDENT_SYNC_S = float(os.getenv("INCIDENT_SYNC_S", "10"))  # min seconds between syncs from the database
+
+# Representative tickets kept per cluster (closest to the centroid on arrival)
+REPRESENTATIVES = 3
+# Ticket -> cluster assignments remembered for duplicates of earlier tickets
+MAX_ASSIGNMENTS = 100000
+# Initial rows of the centroid matrix (doubled up to max_clusters)
+INITIAL_CAPACITY = 64
+# Re-read tickets triaged this long before the last sync (their commit may have lagged)
+SYNC_OVERLAP_S = 60
+# Embeddings loaded per query during sync
+SYNC_BATCH = 5000
+
+
+def _epoch(at: datetime) -> float:
+    """Naive UTC datetime (as stored) -> Unix timestamp"""
+    return at.replace(tzinfo=timezone.utc).timestamp()
+
+
+class MicroCluster:
+    """Window statistics of one cluster, kept per time bucket"""
+
+    def __init__(self, cluster_id: int, dim: int, now: float):
+        self.id = cluster_id
+        self.count = 0
+        self.vector_sum = np.zeros(dim, dtype=np.float32)
+        self.queues: Dict[str, int] = {}
+        self.buckets: Deque[list] = deque()  # [start, count, vector_sum, queues]
+        self.representatives: List[Dict[str, Any]] = []
+        self.first_seen = now
+        self.last_seen = now
+
+    def centroid(self) -> np.ndarray:
+        norm = np.linalg.norm(self.vector_sum)
+        return self.vector_sum / norm if norm > 0 else self.vector_sum
+
+    def _bucket(self, bucket_start: float) -> list:
+        """Bucket starting at bucket_start, kept in time order (synced tickets may arrive late)"""
+        position = len(self.buckets)
+        while position and self.buckets[position - 1][0] > bucket_start:
+            position -= 1
+        if position and self.buckets[position - 1][0] == bucket_start:
+            return self.buckets[position - 1]
+        bucket = [bucket_start, 0, np.zeros_like(self.vector_sum), {}]
+        self.buckets.insert(position, bucket)
+        return bucket
+
+    def add(self, vector: np.ndarray, queue: str, bucket_start: float, now: float):
+        bucket = self._bucket(bucket_start)
+        bucket[1] += 1
+        bucket[2] += vector
+        bucket[3][queue] = bucket[3].get(queue, 0) + 1
+
+        self.count += 1
+        self.vector_sum += vector
+        self.queues[queue] = self.queues.get(queue, 0) + 1
+        self.first_seen = min(self.first_seen, now)
+        self.last_seen = max(self.last_seen, now)
+
+    def expire(self, cutoff: float):
+        """Subtract buckets that ended before cutoff"""
+        while self.buckets and self.buckets[0][0] + INCIDENT_BUCKET_S <= cutoff:
+            _, count, vector_sum, queues = self.buckets.popleft()
+            self.count -= count
+            self.vector_sum -= vector_sum
+            for queue, n in queues.items():
+                self.queues[queue] -= n
+                if not self.queues[queue]:
+                    del self.queues[queue]
+        self.representatives = [r for r in self.representatives if r["at"] >= cutoff]
+
+    def offer_representative(self, ticket_id: int, subject: str, similarity: float, now: float):
+        self.representatives.append({"ticket_id": ticket_id, "subject": subject, "similarity": similarity, "at": now})
+        self.representatives.sort(key=lambda r: -r["similarity"])
+        del self.representatives[REPRESENTATIVES:]
+
+    def count_since(self, start: float) -> int:
+        return sum(bucket[1] for bucket in self.buckets if bucket[0] >= start)
+
+
+class IncidentTracker:
+    """
+    Online micro-clustering of ticket embeddings over a sliding window.
+    """
+
+    def __init__(
+        self,
+        window_s: float = INCIDENT_WINDOW_S,
+        similarity: float = INCIDENT_SIMILARITY,
+        max_clusters: int = INCIDENT_MAX_CLUSTERS
+    ):
+        """
+        Initialize the tracker.
+
+        Args:
+            window_s: Sliding window length in seconds
+            similarity: Minimum cosine similarity to join a cluster
+            max_clusters: Cap on live clusters (the smallest stale one is dropped)
+        """
+        self.window_s = window_s
+        self.similarity = similarity
+        self.max_clusters = max_clusters
+
+        self._clusters: Dict[int, MicroCluster] = {}
+        # Centroids of the live clusters only, in rows 0..len(_row_owner)-1
+        self._centroids: Optional[np.ndarray] = None
+        self._rows: Dict[int, int] = {}  # cluster id -> row in _centroids
+        self._row_owner: List[int] = []  # row in _centroids -> cluster id
+        self._assignments: "OrderedDict[int, int]" = OrderedDict()
+        self._next_id = 1
+        self._last_expiry = 0.0
+        self._synced_until: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+        self.stats = {"tickets": 0, "synced": 0, "clusters_created": 0, "clusters_expired": 0, "clusters_evicted": 0}
+
+    def add(self, ticket_id: int, embedding: np.ndarray, queue: Optional[str], subject: str = "",
+            at: Optional[float] = None) -> bool:
+        """
+        Assign a classified ticket to its nearest cluster.
+
+        Args:
+            ticket_id: Ticket ID
+            embedding: L2-normalized ticket embedding
+            queue: Predicted queue
+            subject: Ticket subject (kept for representative tickets)
+            at: Classification time (Unix seconds, default: now)
+
+        Returns:
+            False if the ticket was already counted or is older than the window
+        """
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        now = time.time()
+        at = now if at is None else at
+        with self._lock:
+            if ticket_id in self._assignments or at < now - self.window_s:
+                return False
+            self._maybe_expire(now)
+
+            cluster, similarity = None, 0.0
+            if self._row_owner:
+                sims = self._centroids[:len(self._row_owner)] @ vector
+                row = int(np.argmax(sims))
+                if sims[row] >= self.similarity:
+                    cluster, similarity = self._clusters[self._row_owner[row]], float(sims[row])
+            if cluster is None:
+                cluster, similarity = self._new_cluster(vector.shape[0], at), 1.0
+
+            self._assign(cluster, ticket_id, vector, queue, subject, similarity, at)
+            self._centroids[self._rows[cluster.id]] = cluster.centroid()
+            return True
+
+    def add_duplicate(self, parent_id: int, ticket_id: int, queue: Optional[str], subject: str = "",
+                      at: Optional[float] = None) -> bool:
+        """Count a near-duplicate (no embedding of its own) in its parent's cluster"""
+        now = time.time()
+        at = now if at is None else at
+        with self._lock:
+            cluster = self._clusters.get(self._assignments.get(parent_id, 0))
+            if cluster is None or ticket_id in self._assignments or at < now - self.window_s:
+                return False
+            self._assign(cluster, ticket_id, cluster.centroid(), queue, subject, None, at)
+            return True
+
+    def sync(self, session_factory: Callable, force: bool = False) -> int:
+        """
+        Add tickets triaged since the last sync (by any worker) from their
+        persisted embeddings; the first call warms the whole window.
+
+        Args:
+            session_factory: Database session factory
+            force: Sync even if the last one was less than INCIDENT_SYNC_S ago
+
+        Returns:
+            Number of tickets added
+        """
+        from backend.models import Ticket, TicketStatus
+        from backend.embedding_store import load_embeddings_by_ids
+
+        if not self._sync_lock.acquire(blocking=False):
+            return 0  # another thread is syncing
+        try:
+            if not force and time.monotonic() - self._last_sync < INCIDENT_SYNC_S:
+                return 0
+            self._last_sync = time.monotonic()
+            model_version, project = self._embedding_space()
+
+            until = datetime.utcnow()
+            since = until - timedelta(seconds=self.window_s)
+            if self._synced_until is not None:
+                since = max(since, self._synced_until - timedelta(seconds=SYNC_OVERLAP_S))
+            with self._lock:
+                known = set(self._assignments)
+
+            db = session_factory()
+            try:
+                rows = db.query(
+                    Ticket.id, Ticket.parent_id, Ticket.predicted_queue, Ticket.subject, Ticket.triaged_at
+                ).filter(
+                    Ticket.triaged_at >= since,
+                    Ticket.predicted_queue.isnot(None),
+                    Ticket.status != TicketStatus.REJECTED
+                ).order_by(Ticket.triaged_at).all()
+                rows = [row for row in rows if row.id not in known]
+
+                vectors = {}
+                ids = [row.id for row in rows if row.parent_id is None]
+                for start in range(0, len(ids), SYNC_BATCH):
+                    batch_ids, batch = load_embeddings_by_ids(db, ids[start:start + SYNC_BATCH], model_version)
+                    if len(batch_ids):
+                        vectors.update(zip(batch_ids.tolist(), project(batch.astype(np.float32))))
+            finally:
+                db.close()
+
+            added = 0
+            for row in rows:
+                at = _epoch(row.triaged_at)
+                if row.parent_id is not None:
+                    added += self.add_duplicate(row.parent_id, row.id, row.predicted_queue, row.subject, at=at)
+                elif row.id in vectors:
+                    added += self.add(row.id, vectors[row.id], row.predicted_queue, row.subject, at=at)
+            self._synced_until = until
+            with self._lock:
+                self.stats["synced"] += added
+            if added:
+                logger.info(f"✓ Incident tracker synced {added} tickets from the database")
+            return added
+        finally:
+            self._sync_lock.release()
+
+    @staticmethod
+    def _embedding_space():
+        """Embedding model name and projection of the live predictor (without loading it)"""
+        from backend.ml.predictors import get_loaded_predictor
+        from backend.ml.embeddings import LocalEmbedder
+        from backend.ml.projection import EmbeddingProjection
+
+        predictor = get_loaded_predictor()
+        if predictor is not None:
+            return predictor.embedder.model_name, predictor.embedder.reduce
+        projection = None
+        if EmbeddingProjection.exists(LocalEmbedder.PROJECTION_DIR):
+            projection = EmbeddingProjection.load(LocalEmbedder.PROJECTION_DIR)
+        return LocalEmbedder.DEFAULT_MODEL, (projection.transform if projection is not None else (lambda X: X))
+
+    def _assign(self, cluster: MicroCluster, ticket_id: int, vector: np.ndarray, queue: Optional[str],
+                subject: str, similarity: Optional[float], now: float):
+        cluster.add(vector, queue or "Unknown", now - now % INCIDENT_BUCKET_S, now)
+        if similarity is not None:
+            cluster.offer_representative(ticket_id, subject, similarity, now)
+        self._assignments[ticket_id] = cluster.id
+        if len(self._assignments) > MAX_ASSIGNMENTS:
+            self._assignments.popitem(last=False)
+        self.stats["tickets"] += 1
+
+    def _new_cluster(self, dim: int, now: float) -> MicroCluster:
+        if len(self._clusters) >= self.max_clusters:
+            # Full: give up the smallest, least recently updated cluster
+            victim = min(self._clusters.values(), key=lambda c: (c.count, c.last_seen))
+            self._drop(victim)
+            self.stats["clusters_evicted"] += 1
+
+        row = len(self._row_owner)
+        if self._centroids is None:
+            self._centroids = np.zeros((min(INITIAL_CAPACITY, self.max_clusters), dim), dtype=np.float32)
+        elif row == len(self._centroids):
+            grown = np.zeros((min(2 * row, self.max_clusters), dim), dtype=np.float32)
+            grown[:row] = self._centroids
+            self._centroids = grown
+
+        cluster = MicroCluster(self._next_id, dim, now)
+        self._next_id += 1
+        self._clusters[cluster.id] = cluster
+        self._rows[cluster.id] = row
+        self._row_owner.append(cluster.id)
+        self.stats["clusters_created"] += 1
+        return cluster
+
+    def _drop(self, cluster: MicroCluster):
+        """Remove a cluster; the last centroid row moves into its place"""
+        row = self._rows.pop(cluster.id)
+        last = len(self._row_owner) - 1
+        if row != last:
+            moved = self._row_owner[last]
+            self._centroids[row] = self._centroids[last]
+            self._row_owner[row] = moved
+            self._rows[moved] = row
+        self._row_owner.pop()
+        del self._clusters[cluster.id]
+
+    def _maybe_expire(self, now: float):
+        """Expire old buckets once per bucket width (amortized over the tickets in it)"""
+        if now - self._last_expiry < INCIDENT_BUCKET_S:
+            return
+        self._last_expiry = now
+        cutoff = now - self.window_s
+        for cluster in list(self._clusters.values()):
+            cluster.expire(cutoff)
+            if cluster.count <= 0:
+                self._drop(cluster)
+                self.stats["clusters_expired"] += 1
+            else:
+                self._centroids[self._rows[cluster.id]] = cluster.centroid()
+
+    def active_incidents(self, min_size: int = INCIDENT_MIN_SIZE, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Clusters with at least min_size tickets in the window, largest first.
+
+        Growth compares the last INCIDENT_GROWTH_S with the period before it.
+        """
+        now = time.time()
+        with self._lock:
+            self._last_expiry = 0.0
+            self._maybe_expire(now)
+            incidents = []
+            for cluster in self._clusters.values():
+                if cluster.count < min_size:
+                    continue
+                recent = cluster.count_since(now - INCIDENT_GROWTH_S)
+                previous = cluster.count_since(now - 2 * INCIDENT_GROWTH_S) - recent
+                queue, queue_count = max(cluster.queues.items(), key=lambda item: item[1])
+                incidents.append({
+                    "incident_id": cluster.id,
+                    "size": cluster.count,
+                    "growth_per_hour": round(recent * 3600 / INCIDENT_GROWTH_S, 1),
+                    "growth_ratio": round(recent / previous, 2) if previous else None,
+                    "dominant_queue": queue,
+                    "dominant_queue_share": round(queue_count / cluster.count, 3),
+                    "first_seen": datetime.utcfromtimestamp(cluster.first_seen),
+                    "last_seen": datetime.utcfromtimestamp(cluster.last_seen),
+                    "representative_tickets": [
+                        {"ticket_id": r["ticket_id"], "subject": r["subject"], "similarity": round(r["similarity"], 3)}
+                        for r in cluster.representatives
+                    ]
+                })
+        incidents.sort(key=lambda i: (-i["size"], -i["growth_per_hour"]))
+        return incidents[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "clusters": len(self._clusters),
+                "window_s": self.window_s,
+                "similarity": self.similarity
+            }
+
+
+# Global tracker instance
+_tracker = None
+
+
+def get_incident_tracker() -> IncidentTracker:
+    """
+    Get global incident tracker instance (singleton pattern).
+
+    Returns:
+        IncidentTracker instance
+    """
+    global _tracker
+    if _tracker is None:
+        _tracker = IncidentTracker()
+    return _tracker
@@ -10,6 +10,10 @@ from typing import Dict, Any, Optional
 import logging
 
 from backend.ml.embeddings import get_embedder
+from backend.ml.distill import LinearHead
+from backend.ml.projection import EmbeddingProjection
+from backend.ml.runtime import limit_estimator_jobs
+from backend.ml.shadow import ShadowEvaluator, shadow_settings
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +32,9 @@ class TicketPredictor:
         self.dept_classifier = None
         self.critical_classifier = None
         self.label_encoder = None  # For XGBoost int -> string conversion
+        self.projection = None  # EmbeddingProjection in reduced-dimension mode
         self.use_enhanced_features = False  # Whether model uses enhanced features (disabled - hurt performance)
+        self.shadow = None  # ShadowEvaluator for candidate models (optional)
         self.loaded = False
     
     def create_handcrafted_features(self, text: str) -> np.ndarray:
@@ -78,36 +84,152 @@ class TicketPredictor:
         
         return np.array(features)
     
-    def load_models(self):
-        """Load trained models from disk"""
-        dept_path = self.MODEL_DIR / "department_classifier.joblib"
-        crit_path = self.MODEL_DIR / "criticality_classifier.joblib"
-        encoder_path = self.MODEL_DIR / "label_encoder.joblib"
+    def load_bundle(self, model_dir: Path) -> Dict[str, Any]:
+        """
+        Load a set of trained models from a directory.
+        
+        Args:
+            model_dir: Directory containing the joblib artifacts
+            
+        Returns:
+            Dictionary with dept_classifier, critical_classifier, label_encoder and projection
+        """
+        dept_path = model_dir / "department_classifier.joblib"
+        crit_path = model_dir / "criticality_classifier.joblib"
+        encoder_path = model_dir / "label_encoder.joblib"
         
-        if not dept_path.exists() or not crit_path.exists():
+        has_head = LinearHead.exists(model_dir)
+        if not (dept_path.exists() or has_head) or not crit_path.exists():
             raise FileNotFoundError(
-                f"Models not found. Please train models first using scripts/train_models.py"
+                f"Models not found in {model_dir}. Please train models first using scripts/train_models.py"
             )
         
-        logger.info("Loading trained models...")
-        self.dept_classifier = joblib.load(dept_path)
-        self.critical_classifier = joblib.load(crit_path)
+        # Distilled linear head (.npy) or full classifier (.joblib)
+        if has_head:
+            dept_classifier = LinearHead.load(model_dir)
+            logger.info("✓ Distilled linear head loaded")
+        else:
+            dept_classifier = joblib.load(dept_path)
+        
+        # Pickled estimators keep the n_jobs=-1 they were trained with
+        bundle = {
+            "dept_classifier": limit_estimator_jobs(dept_classifier),
+            "critical_classifier": limit_estimator_jobs(joblib.load(crit_path)),
+            "label_encoder": None,
+            "projection": None
+        }
+        
+        # Models trained on reduced embeddings carry their projection
+        if EmbeddingProjection.exists(model_dir):
+            bundle["projection"] = EmbeddingProjection.load(model_dir)
+            logger.info(f"✓ Embedding projection loaded ({bundle['projection'].dim} dims)")
         
         # Load label encoder (for XGBoost models)
         if encoder_path.exists():
-            self.label_encoder = joblib.load(encoder_path)
+            bundle["label_encoder"] = joblib.load(encoder_path)
             logger.info("✓ Label encoder loaded")
         
+        return bundle
+    
+    def load_models(self):
+        """Load trained models from disk"""
+        logger.info("Loading trained models...")
+        bundle = self.load_bundle(self.MODEL_DIR)
+        self.dept_classifier = bundle["dept_classifier"]
+        self.critical_classifier = bundle["critical_classifier"]
+        self.label_encoder = bundle["label_encoder"]
+        self.projection = bundle["projection"]
+        
         self.loaded = True
         logger.info("✓ Models loaded successfully")
+        
+        self._load_shadow()
+    
+    def _load_shadow(self):
+        """Load candidate models for shadow/canary evaluation if enabled"""
+        settings = shadow_settings()
+        if settings["mode"] == "off":
+            return
+        
+        try:
+            candidate = self.load_bundle(settings["model_dir"])
+            self.shadow = ShadowEvaluator(
+                candidate_bundle=candidate,
+                classify=self.classify,
+                mode=settings["mode"],
+                canary_percent=settings["canary_percent"]
+            )
+            logger.info(f"✓ Candidate models loaded from {settings['model_dir']} (mode={settings['mode']})")
+        except Exception as e:
+            logger.warning(f"Shadow evaluation disabled: {e}")
+            self.shadow = None
+    
+    @property
+    def active_bundle(self) -> Dict[str, Any]:
+        """Currently active models as a bundle"""
+        return {
+            "dept_classifier": self.dept_classifier,
+            "critical_classifier": self.critical_classifier,
+            "label_encoder": self.label_encoder,
+            "projection": self.projection
+        }
+    
+    def classify(self, bundle: Dict[str, Any], features_2d: np.ndarray) -> Dict[str, Any]:
+        """
+        Predict department and criticality from a precomputed feature row.
+        
+        Features hold the full embedding; each bundle applies its own
+        projection, so active and candidate models may use different dims.
+        
+        Args:
+            bundle: Models to use (see load_bundle)
+            features_2d: Feature array of shape (1, n_features)
+            
+        Returns:
+            Dictionary with predicted_queue, queue_confidence, critical_prob, is_critical
+        """
+        dept_classifier = bundle["dept_classifier"]
+        label_encoder = bundle["label_encoder"]
+        if bundle.get("projection") is not None:
+            features_2d = bundle["projection"].transform(features_2d)
+        
+        # Predict department
+        dept_pred_raw = dept_classifier.predict(features_2d)[0]
+        
+        # Decode label if using XGBoost (label encoder)
+        if label_encoder is not None:
+            dept_pred = label_encoder.inverse_transform([dept_pred_raw])[0]
+        else:
+            dept_pred = dept_pred_raw
+        
+        # Get confidence if available
+        if hasattr(dept_classifier, 'predict_proba'):
+            dept_probs = dept_classifier.predict_proba(features_2d)[0]
+            dept_confidence = float(np.max(dept_probs))
+        else:
+            # For SVM, use decision function
+            dept_scores = dept_classifier.decision_function(features_2d)[0]
+            dept_confidence = float(np.max(dept_scores) / (np.sum(np.abs(dept_scores)) + 1e-10))
+        
+        # Predict criticality
+        critical_prob = float(bundle["critical_classifier"].predict_proba(features_2d)[0, 1])
+        is_critical = critical_prob >= 0.5
+        
+        return {
+            "predicted_queue": dept_pred,
+            "queue_confidence": dept_confidence,
+            "critical_prob": critical_prob,
+            "is_critical": is_critical
+        }
     
-    def predict_ticket(self, subject: str, body: str) -> Dict[str, Any]:
+    def predict_ticket(self, subject: str, body: str, embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
         """
         Predict department and criticality for a ticket.
         
         Args:
             subject: Ticket subject
             body: Ticket body
+            embedding: Stored full embedding of the text (skips encoding, optional)
             
         Returns:
             Dictionary with predictions:
@@ -116,7 +238,9 @@ class TicketPredictor:
                 "queue_confidence": float,
                 "critical_prob": float,
                 "is_critical": bool,
-                "embedding": np.ndarray
+                "embedding": np.ndarray,  # reduced if a projection was trained
+                "full_embedding": np.ndarray,  # as encoded, for persistence
+                "served_by": str  # "active" or "candidate"
             }
         """
         if not self.loaded:
@@ -125,8 +249,11 @@ class TicketPredictor:
         # Create combined text
         text = f"{subject}\n\n{body}"
         
-        # Generate embedding
-        embedding = self.embedder.embed_single(text, normalize=True)
+        # Generate embedding (unless re-triaging with a stored one)
+        if embedding is None:
+            embedding = self.embedder.embed_single(text, normalize=True)
+        else:
+            embedding = np.asarray(embedding, dtype=np.float32)
         
         # Add handcrafted features if model was trained with them
         if self.use_enhanced_features:
@@ -136,35 +263,28 @@ class TicketPredictor:
         else:
             embedding_2d = embedding.reshape(1, -1)
         
-        # Predict department
-        dept_pred_raw = self.dept_classifier.predict(embedding_2d)[0]
-        
-        # Decode label if using XGBoost (label encoder)
-        if self.label_encoder is not None:
-            dept_pred = self.label_encoder.inverse_transform([dept_pred_raw])[0]
+        # Canary: candidate serves a slice of traffic; shadow: active always serves
+        served_by = "active"
+        if self.shadow is not None and self.shadow.routes_to_candidate(text):
+            try:
+                result = self.shadow.predict_candidate(embedding_2d)
+                served_by = "candidate"
+            except Exception as e:
+                logger.warning(f"Canary prediction failed, using active model: {e}")
+                result = self.classify(self.active_bundle, embedding_2d)
         else:
-            dept_pred = dept_pred_raw
+            result = self.classify(self.active_bundle, embedding_2d)
         
-        # Get confidence if available
-        if hasattr(self.dept_classifier, 'predict_proba'):
-            dept_probs = self.dept_classifier.predict_proba(embedding_2d)[0]
-            dept_confidence = float(np.max(dept_probs))
-        else:
-            # For SVM, use decision function
-            dept_scores = self.dept_classifier.decision_function(embedding_2d)[0]
-            dept_confidence = float(np.max(dept_scores) / (np.sum(np.abs(dept_scores)) + 1e-10))
+        # Compare against the other model off the request path
+        if self.shadow is not None and self.shadow.enabled:
+            other_bundle = self.active_bundle if served_by == "candidate" else self.shadow.candidate_bundle
+            self.shadow.observe(text, embedding_2d, result, served_by, other_bundle)
         
-        # Predict criticality
-        critical_prob = float(self.critical_classifier.predict_proba(embedding_2d)[0, 1])
-        is_critical = critical_prob >= 0.5
-        
-        return {
-            "predicted_queue": dept_pred,
-            "queue_confidence": dept_confidence,
-            "critical_prob": critical_prob,
-            "is_critical": is_critical,
-            "embedding": embedding
-        }
+        # Retrieval, dedup and incident tracking work in the index's (reduced) space
+        result["embedding"] = self.embedder.reduce(embedding)
+        result["full_embedding"] = embedding
+        result["served_by"] = served_by
+        return result
     
     def batch_predict(self, texts: list) -> Dict[str, np.ndarray]:
         """
@@ -181,6 +301,8 @@ class TicketPredictor:
         
         # Generate embeddings
         embeddings = self.embedder.embed_texts(texts, normalize=True)
+        if self.projection is not None:
+            embeddings = self.projection.transform(embeddings)
         
         # Predict departments
         dept_preds_raw = self.dept_classifier.predict(embeddings)
@@ -216,3 +338,8 @@ def get_predictor() -> TicketPredictor:
     if _predictor is None:
         _predictor = TicketPredictor()
     return _predictor
+
+
+def get_loaded_predictor() -> Optional[TicketPredictor]:
+    """Global predictor instance if already created (never loads the models)"""
+    return _predictor
@@ -0,0 +1,183 @@
+"""
+Dimensionality reduction of LOCAL embeddings, fitted at training time.
+
+The 1024-dim bge-m3 vectors drive FAISS memory, classifier input width and
+the embedding caches. A projection fitted on the training embeddings maps
+them to EMBEDDING_DIM dimensions:
+
+    pca         - mean-centred principal components
+    pca_whiten  - principal components scaled to unit variance
+    truncate    - first EMBEDDING_DIM components (Matryoshka-trained models only;
+                  bge-m3 is not one, so prefer PCA for the default model)
+
+Projected vectors are L2-normalized again, so inner product stays cosine
+similarity. The projection is stored next to the classifiers and applied
+by LocalEmbedder.reduce, TicketPredictor and TicketRetriever alike.
+"""
+from pathlib import Path
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import os
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Training defaults (0 = keep the full embedding)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "0"))
+EMBEDDING_REDUCTION = os.getenv("EMBEDDING_REDUCTION", "pca").lower()
+
+# Rows used to estimate the covariance
+FIT_SAMPLES = 50000
+
+
+def _normalize(X: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    return X / np.maximum(norms, 1e-12)
+
+
+class EmbeddingProjection:
+    """
+    Linear map from source_dim to dim dimensions: y = normalize((x - mean) @ components).
+
+    Feature rows wider than source_dim (embeddings followed by handcrafted
+    features) keep their extra columns unchanged. Stored as one .npz
+    artifact in the model directory.
+    """
+
+    METHODS = ("pca", "pca_whiten", "truncate")
+    FILE = "embedding_projection.npz"
+
+    def __init__(
+        self,
+        method: str = "pca",
+        mean: Optional[np.ndarray] = None,
+        components: Optional[np.ndarray] = None,
+        source_dim: int = 0,
+        dim: int = 0,
+        retained_variance: float = 1.0
+    ):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown reduction method: {method}")
+        self.method = method
+        self.mean = mean
+        self.components = components
+        self.source_dim = source_dim
+        self.dim = dim
+        self.retained_variance = retained_variance
+
+    @classmethod
+    def fit(
+        cls,
+        X: np.ndarray,
+        dim: int,
+        method: str = EMBEDDING_REDUCTION,
+        random_state: int = 42
+    ) -> "EmbeddingProjection":
+        """
+        Fit a projection on training embeddings.
+
+        Args:
+            X: Training embeddings (n, source_dim)
+            dim: Output dimension
+            method: "pca", "pca_whiten" or "truncate"
+            random_state: Seed for subsampling rows beyond FIT_SAMPLES
+
+        Returns:
+            Fitted projection
+        """
+        X = np.asarray(X, dtype=np.float32)
+        source_dim = X.shape[1]
+        if not 0 < dim < source_dim:
+            raise ValueError(f"Projection dim must be between 1 and {source_dim - 1}, got {dim}")
+
+        if len(X) > FIT_SAMPLES:
+            rows = np.random.default_rng(random_state).choice(len(X), FIT_SAMPLES, replace=False)
+            X = X[np.sort(rows)]
+
+        if method == "truncate":
+            energy = np.square(X).sum(axis=0)
+            projection = cls(method, None, None, source_dim, dim, float(energy[:dim].sum() / energy.sum()))
+        else:
+            mean = X.mean(axis=0)
+            centred = X - mean
+            covariance = (centred.T @ centred) / max(len(X) - 1, 1)
+            eigenvalues, eigenvectors = np.linalg.eigh(covariance.astype(np.float64))
+            order = np.argsort(eigenvalues)[::-1][:dim]
+            components = eigenvectors[:, order]
+            if method == "pca_whiten":
+                components = components / np.sqrt(np.maximum(eigenvalues[order], 1e-12))
+            retained = float(eigenvalues[order].sum() / eigenvalues.sum())
+            projection = cls(method, mean.astype(np.float32), components.astype(np.float32),
+                             source_dim, dim, retained)
+
+        logger.info(f"✓ Embedding projection fitted: {method} {source_dim} -> {dim} dims "
+                    f"({projection.retained_variance:.1%} variance retained)")
+        return projection
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        """
+        Project embeddings (1-D vector or 2-D rows) and L2-normalize them.
+
+        Returns:
+            float32 array with dim (+ extra feature) columns, same rank as X
+        """
+        X = np.asarray(X, dtype=np.float32)
+        rows = X.reshape(1, -1) if X.ndim == 1 else X
+        embeddings, extra = rows[:, :self.source_dim], rows[:, self.source_dim:]
+
+        if self.method == "truncate":
+            reduced = embeddings[:, :self.dim]
+        else:
+            reduced = (embeddings - self.mean) @ self.components
+        reduced = _normalize(reduced)
+        if extra.shape[1]:
+            reduced = np.hstack([reduced, extra])
+        return reduced[0] if X.ndim == 1 else reduced
+
+    def fingerprint(self) -> str:
+        """Hash of the fitted map; two fits with the same dims still differ"""
+        digest = hashlib.sha1(f"{self.method}:{self.source_dim}:{self.dim}".encode())
+        for array in (self.mean, self.components):
+            if array is not None:
+                digest.update(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+        return digest.hexdigest()
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "method": self.method,
+            "source_dim": self.source_dim,
+            "dim": self.dim,
+            "retained_variance": round(self.retained_variance, 4),
+            "fingerprint": self.fingerprint()
+        }
+
+    @classmethod
+    def exists(cls, model_dir: Path) -> bool:
+        return (Path(model_dir) / cls.FILE).exists()
+
+    def save(self, model_dir: Path):
+        path = Path(model_dir) / self.FILE
+        arrays = {"meta": np.array(json.dumps(self.describe()))}
+        if self.mean is not None:
+            arrays["mean"] = self.mean
+            arrays["components"] = self.components
+        np.savez(path, **arrays)
+        logger.info(f"✓ Saved embedding projection to {path}")
+
+    @classmethod
+    def load(cls, model_dir: Path) -> "EmbeddingProjection":
+        with np.load(Path(model_dir) / cls.FILE) as data:
+            meta = json.loads(str(data["meta"]))
+            mean = data["mean"] if "mean" in data else None
+            components = data["components"] if "components" in data else None
+        return cls(meta["method"], mean, components, meta["source_dim"], meta["dim"], meta["retained_variance"])
+
+    @classmethod
+    def remove(cls, model_dir: Path):
+        (Path(model_dir) / cls.FILE).unlink(missing_ok=True)
@@ -1,19 +1,88 @@
 """
 FAISS-based retrieval system for finding similar historical tickets.
 Uses LOCAL embeddings for vector search (RAG-lite).
+
+Hybrid mode also queries a BM25 inverted index built in the same pass, so
+tickets identified by error codes, hostnames or invoice numbers still find
+their matches. Both retrievers run concurrently and their rankings are
+merged with reciprocal rank fusion.
+
+Searches can be scoped to a partition of the corpus: the predicted queue
+and language, then the queue alone, then the whole corpus when a partition
+has fewer than RETRIEVAL_MIN_PARTITION tickets. Partitions are row id sets
+over the single index (FAISS ID selectors), so they cost no extra copies
+of the vectors.
+
+The vectors can be stored compressed (INDEX_CODEC, chosen at build time):
+    flat    - float32, exact inner product (IndexFlatIP)
+    fp16    - float16 scalar quantizer, 2x smaller
+    int8    - 8-bit scalar quantizer with per-dimension ranges, 4x smaller
+    binary  - sign bits searched by Hamming distance, 32x smaller; the top
+              candidates are re-scored exactly against float16 vectors kept
+              in a memory-mapped file
 """
 import faiss
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import json
+import os
 import pickle
+import re
+import threading
+import time
 import logging
+from dotenv import load_dotenv
 
 from backend.ml.embeddings import get_embedder
+from backend.ml.sparse_index import BM25Index
+from backend.ml.sharded_embeddings import ShardedEmbeddingJob
+from backend.ml.data_stream import iter_ticket_chunks, prepare_chunk, TICKET_COLUMNS
+
+load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Retrieval settings
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid").lower()  # hybrid | dense
+RETRIEVAL_CANDIDATES = int(os.getenv("RETRIEVAL_CANDIDATES", "20"))
+RETRIEVAL_RRF_K = int(os.getenv("RETRIEVAL_RRF_K", "60"))
+RETRIEVAL_MMAP = os.getenv("RETRIEVAL_MMAP", "true").lower() == "true"
+RETRIEVAL_PARTITIONED = os.getenv("RETRIEVAL_PARTITIONED", "true").lower() == "true"
+RETRIEVAL_MIN_PARTITION = int(os.getenv("RETRIEVAL_MIN_PARTITION", "200"))
+# Binary codec: Hamming candidates per requested result that are re-scored
+RETRIEVAL_RERANK = int(os.getenv("RETRIEVAL_RERANK", "10"))
+
+# Vector storage of the FAISS index (build-time default)
+INDEX_CODECS = ("flat", "fp16", "int8", "binary")
+INDEX_CODEC = os.getenv("INDEX_CODEC", "flat").lower()
+
+# Rows used to train the int8 quantizer's per-dimension ranges
+QUANTIZER_TRAIN_SAMPLES = 20000
+
+# Searches kept for latency percentiles
+LATENCY_SAMPLES = 1000
+
+# Function words of the corpus languages, to scope a query before its
+# language has been detected by drafting
+_STOPWORDS = {
+    "en": {"the", "and", "is", "to", "of", "in", "it", "not", "my", "we", "our", "with", "for", "this", "have", "please", "can", "you"},
+    "de": {"der", "die", "das", "und", "ist", "nicht", "ich", "wir", "mit", "für", "ein", "eine", "bitte", "sie", "unser", "auf", "kann", "zu"},
+}
+_WORD = re.compile(r"\w+")
+
+
+def guess_language(text: str) -> Optional[str]:
+    """Language code by function-word votes, or None if undecided"""
+    words = _WORD.findall(text.lower())
+    votes = {lang: sum(w in stopwords for w in words) for lang, stopwords in _STOPWORDS.items()}
+    best = max(votes, key=votes.get)
+    if votes[best] == 0 or list(votes.values()).count(votes[best]) > 1:
+        return None
+    return best
+
 
 class TicketRetriever:
     """
@@ -22,6 +91,7 @@ class TicketRetriever:
     """
     
     INDEX_DIR = Path("./faiss_index")
+    METADATA_COLUMNS = ['subject', 'body', 'answer', 'queue', 'priority', 'language']
     
     def __init__(self, embedder=None):
         """
@@ -34,46 +104,146 @@ class TicketRetriever:
         self.INDEX_DIR.mkdir(exist_ok=True)
         
         self.index = None
+        self.codec = "flat"
+        self.vectors = None  # float16 vectors for re-scoring binary codes
+        self.sparse = None
         self.tickets_df = None
+        self.partitions: Dict[Tuple[str, Optional[str]], np.ndarray] = {}
         self.indexed = False
+        
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, List[float]] = {}
+        self._searches = {"dense": 0, "hybrid": 0}
+        self._scopes = {"queue_language": 0, "queue": 0, "global": 0}
+        self._search_params: Dict[Tuple[str, Optional[str]], Any] = {}
     
-    def build_index(self, dataset_path: str, embeddings: Optional[np.ndarray] = None):
+    def build_index(
+        self,
+        dataset_path: str,
+        embeddings: Optional[np.ndarray] = None,
+        num_workers: int = 1,
+        shard_size: int = 2048,
+        codec: str = INDEX_CODEC
+    ):
         """
         Build FAISS index from dataset.
         
+        The dataset is streamed chunk by chunk (clean -> text -> embed -> add
+        to index -> append metadata), so the full float32 embedding matrix is
+        never held in memory. Everything else still grows with the dataset:
+        the metadata (subject, body, answer) is kept for tickets_df, the BM25
+        postings are built in memory, and the binary codec keeps all float16
+        re-scoring vectors. CSV and Parquet inputs are supported. Vectors are
+        stored in the embedder's reduced space when a projection was trained.
+        
         Args:
-            dataset_path: Path to CSV dataset
-            embeddings: Pre-computed embeddings (optional)
+            dataset_path: Path to CSV or Parquet dataset
+            embeddings: Pre-computed full embeddings (optional)
+            num_workers: Worker processes for embedding generation (1 = in-process)
+            shard_size: Rows per chunk / embedding shard
+            codec: Vector storage: "flat", "fp16", "int8" or "binary"
         """
-        logger.info(f"Building FAISS index from {dataset_path}")
+        if codec not in INDEX_CODECS:
+            raise ValueError(f"Unknown index codec: {codec}")
+        logger.info(f"Building FAISS index from {dataset_path} (codec={codec})")
         
-        # Load dataset
-        df = pd.read_csv(dataset_path)
-        df['text'] = df['subject'].fillna('') + "\n\n" + df['body'].fillna('')
-        df = df[df['text'].notna()].copy()
+        metadata_chunks = []
+        self.sparse = BM25Index()
         
-        self.tickets_df = df[['text', 'subject', 'body', 'answer', 'queue', 'priority', 'language']].copy()
+        def text_chunks():
+            for chunk in iter_ticket_chunks(dataset_path, chunksize=shard_size, columns=TICKET_COLUMNS):
+                chunk = prepare_chunk(chunk)
+                metadata_chunks.append(chunk[self.METADATA_COLUMNS])
+                texts = chunk['text'].tolist()
+                self.sparse.add(texts)
+                yield texts
         
-        # Generate or use provided embeddings
+        # Generate embeddings as resumable shards, or slice provided embeddings
         if embeddings is None:
             logger.info("Generating embeddings for indexing...")
-            embeddings = self.embedder.embed_texts(
-                self.tickets_df['text'].tolist(),
-                batch_size=32,
-                normalize=True,
-                show_progress=True
+            job = ShardedEmbeddingJob(
+                "index_embeddings",
+                model_name=self.embedder.model_name,
+                shard_size=shard_size
             )
+            shards = job.embed_stream(text_chunks(), num_workers=num_workers, embedder=self.embedder)
+        else:
+            def slice_embeddings():
+                offset = 0
+                for texts in text_chunks():
+                    yield embeddings[offset:offset + len(texts)]
+                    offset += len(texts)
+            shards = slice_embeddings()
         
-        # Build FAISS index
-        embedding_dim = embeddings.shape[1]
-        logger.info(f"Building FAISS index with {len(embeddings)} vectors (dim={embedding_dim})")
+        # Inner product = cosine similarity (embeddings are normalized)
+        self.codec = codec
+        self.index = None
+        rescore_chunks = []
+        buffered = []
+        for shard in shards:
+            buffered.append(np.ascontiguousarray(self.embedder.reduce(shard), dtype='float32'))
+            if self.index is None and codec == "int8" and sum(map(len, buffered)) < QUANTIZER_TRAIN_SAMPLES:
+                continue  # collect a training sample for the quantizer
+            self._add_vectors(np.concatenate(buffered), rescore_chunks)
+            buffered = []
+        if buffered:
+            self._add_vectors(np.concatenate(buffered), rescore_chunks)
+        self.vectors = np.concatenate(rescore_chunks) if rescore_chunks else None
         
-        # Use IndexFlatIP for cosine similarity (embeddings are normalized)
-        self.index = faiss.IndexFlatIP(embedding_dim)
-        self.index.add(embeddings.astype('float32'))
+        self.tickets_df = pd.concat(metadata_chunks, ignore_index=True)
+        self.sparse.finalize()
+        self._build_partitions()
         
         self.indexed = True
-        logger.info(f"✓ FAISS index built: {self.index.ntotal} vectors")
+        logger.info(f"✓ FAISS index built: {self.index.ntotal} vectors (dim={self.index.d}, codec={codec}, "
+                    f"{self.index_bytes / 1e6:.1f} MB)")
+    
+    def _add_vectors(self, vectors: np.ndarray, rescore_chunks: List[np.ndarray]):
+        """Add float32 vectors in the index's codec, creating (and training) the index on first use"""
+        if self.index is None:
+            dim = vectors.shape[1]
+            if self.codec == "flat":
+                self.index = faiss.IndexFlatIP(dim)
+            elif self.codec == "binary":
+                if dim % 8:
+                    raise ValueError(f"Binary codec needs a dimension divisible by 8, got {dim}")
+                self.index = faiss.IndexBinaryFlat(dim)
+            else:
+                qtype = faiss.ScalarQuantizer.QT_fp16 if self.codec == "fp16" else faiss.ScalarQuantizer.QT_8bit
+                self.index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+                self.index.train(vectors)
+        
+        if self.codec == "binary":
+            self.index.add(np.packbits(vectors > 0, axis=1))
+            rescore_chunks.append(vectors.astype(np.float16))
+        else:
+            self.index.add(vectors)
+    
+    @property
+    def index_bytes(self) -> int:
+        """Resident size of the searched codes (excludes the binary codec's re-scoring file)"""
+        return self.index.ntotal * self.index.code_size if self.index is not None else 0
+    
+    def _check_vector_space(self, info: Dict[str, Any]):
+        """
+        Refuse an index encoded by another embedding model or projection fit.
+        Retraining with the same --embedding-dim fits a new basis of the same
+        dim, which the dim check alone cannot tell apart.
+        """
+        projection = self.embedder.projection
+        expected = projection.fingerprint() if projection is not None else None
+        stored = (info.get("projection") or {}).get("fingerprint")
+        problems = []
+        if info.get("model_name") and info["model_name"] != self.embedder.model_name:
+            problems.append(f"model {info['model_name']} (now {self.embedder.model_name})")
+        if stored != expected:
+            problems.append("a different embedding projection")
+        if problems:
+            raise RuntimeError(
+                f"FAISS index was built with {' and '.join(problems)}. "
+                f"Rebuild the index with scripts/build_index.py after training"
+            )
     
     def save_index(self):
         """Save FAISS index and metadata to disk"""
@@ -81,16 +251,35 @@ class TicketRetriever:
         metadata_path = self.INDEX_DIR / "metadata.pkl"
         
         # Save FAISS index
-        faiss.write_index(self.index, str(index_path))
+        if self.codec == "binary":
+            faiss.write_index_binary(self.index, str(index_path))
+            np.save(self.INDEX_DIR / "vectors.npy", self.vectors)
+        else:
+            faiss.write_index(self.index, str(index_path))
+            (self.INDEX_DIR / "vectors.npy").unlink(missing_ok=True)
         
         # Save metadata (tickets dataframe)
         with open(metadata_path, 'wb') as f:
             pickle.dump(self.tickets_df, f)
         
+        # Save BM25 postings next to the vectors
+        if self.sparse is not None:
+            self.sparse.save(self.INDEX_DIR / "bm25")
+        
+        # Record the vector space (model + projection fingerprint) so a mismatch is caught at load
+        projection = self.embedder.projection
+        with open(self.INDEX_DIR / "index_info.json", 'w') as f:
+            json.dump({
+                "dim": self.index.d,
+                "codec": self.codec,
+                "model_name": self.embedder.model_name,
+                "projection": projection.describe() if projection is not None else None
+            }, f, indent=2)
+        
         logger.info(f"✓ Saved FAISS index to {self.INDEX_DIR}")
     
     def load_index(self):
-        """Load FAISS index and metadata from disk"""
+        """Load FAISS index, BM25 index and metadata from disk (memory-mapped with RETRIEVAL_MMAP)"""
         index_path = self.INDEX_DIR / "tickets.index"
         metadata_path = self.INDEX_DIR / "metadata.pkl"
         
@@ -101,23 +290,120 @@ class TicketRetriever:
         
         logger.info(f"Loading FAISS index from {self.INDEX_DIR}")
         
+        # Indexes built before index_info.json are float32 flat
+        info_path = self.INDEX_DIR / "index_info.json"
+        info = {}
+        if info_path.exists():
+            with open(info_path) as f:
+                info = json.load(f)
+        self.codec = info.get("codec", "flat")
+        
         # Load FAISS index
-        self.index = faiss.read_index(str(index_path))
+        self.index = self._read_faiss(index_path, binary=self.codec == "binary")
+        if self.codec == "binary":
+            self.vectors = np.load(self.INDEX_DIR / "vectors.npy", mmap_mode="r" if RETRIEVAL_MMAP else None)
+        if self.index.d != self.embedder.output_dim:
+            raise RuntimeError(
+                f"FAISS index has dim {self.index.d} but embeddings have dim {self.embedder.output_dim}. "
+                f"Rebuild the index with scripts/build_index.py after training"
+            )
+        self._check_vector_space(info)
         
         # Load metadata
         with open(metadata_path, 'rb') as f:
             self.tickets_df = pickle.load(f)
         
+        # Load BM25 index (indexes built before hybrid retrieval have none)
+        sparse_dir = self.INDEX_DIR / "bm25"
+        if (sparse_dir / "meta.json").exists():
+            self.sparse = BM25Index.load(sparse_dir, mmap=RETRIEVAL_MMAP)
+        else:
+            self.sparse = None
+            logger.warning("! BM25 index not found, using dense retrieval only (rebuild with scripts/build_index.py)")
+        
+        self._build_partitions()
         self.indexed = True
-        logger.info(f"✓ Loaded FAISS index: {self.index.ntotal} vectors")
+        logger.info(f"✓ Loaded FAISS index: {self.index.ntotal} vectors (codec={self.codec})")
     
-    def search(self, query_text: str, k: int = 5) -> List[Dict[str, Any]]:
+    def _build_partitions(self):
+        """Row ids per (queue, language) and per (queue, None), from the metadata"""
+        self.partitions = {}
+        self._search_params = {}
+        for (queue, language), rows in self.tickets_df.groupby(['queue', 'language'], sort=False).indices.items():
+            self.partitions[(queue, language)] = np.sort(rows).astype(np.int64)
+        for queue, rows in self.tickets_df.groupby('queue', sort=False).indices.items():
+            self.partitions[(queue, None)] = np.sort(rows).astype(np.int64)
+    
+    def _scope(
+        self,
+        queue: Optional[str],
+        language: Optional[str],
+        query_text: Optional[str]
+    ) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Narrowest partition with at least RETRIEVAL_MIN_PARTITION tickets.
+        
+        Returns:
+            Partition key, or None for the whole corpus
+        """
+        if not RETRIEVAL_PARTITIONED or not queue:
+            scope = None
+        else:
+            language = language or (guess_language(query_text) if query_text else None)
+            candidates = [(queue, language), (queue, None)] if language else [(queue, None)]
+            scope = next(
+                (key for key in candidates if len(self.partitions.get(key, ())) >= RETRIEVAL_MIN_PARTITION),
+                None
+            )
+        with self._lock:
+            self._scopes["global" if scope is None else "queue" if scope[1] is None else "queue_language"] += 1
+        return scope
+    
+    def _dense_params(self, scope: Tuple[str, Optional[str]]):
+        """FAISS search parameters restricting the search to a partition (cached)"""
+        params = self._search_params.get(scope)
+        if params is None:
+            rows = self.partitions[scope]
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(len(rows), faiss.swig_ptr(rows)))
+            self._search_params[scope] = params
+        return params
+    
+    def _read_faiss(self, index_path: Path, binary: bool = False):
+        read = faiss.read_index_binary if binary else faiss.read_index
+        if RETRIEVAL_MMAP:
+            try:
+                return read(str(index_path), faiss.IO_FLAG_MMAP_IFC)
+            except RuntimeError:
+                logger.warning("! FAISS index type cannot be memory-mapped, reading it into memory")
+        return read(str(index_path))
+    
+    def _dense_search(self, query: np.ndarray, n: int, scope) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-n inner products; binary codes pre-filter by Hamming distance, then re-score exactly"""
+        params = self._dense_params(scope) if scope is not None else None
+        if self.codec != "binary":
+            return self.index.search(query, n, params=params)
+        
+        _, candidates = self.index.search(np.packbits(query > 0, axis=1), n * RETRIEVAL_RERANK, params=params)
+        rows = np.sort(candidates[0][candidates[0] >= 0])  # ascending rows read the memmap in order
+        scores = np.asarray(self.vectors[rows], dtype=np.float32) @ query[0]
+        top = np.argsort(-scores, kind="stable")[:n]
+        return scores[top][None], rows[top][None]
+    
+    def search(
+        self,
+        query_text: str,
+        k: int = 5,
+        queue: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search for similar tickets.
         
         Args:
             query_text: Query text (subject + body)
             k: Number of results to return
+            queue: Scope the search to this queue's tickets (optional)
+            language: Language code within the queue (guessed from the text if omitted)
             
         Returns:
             List of similar tickets with scores
@@ -125,37 +411,34 @@ class TicketRetriever:
         if not self.indexed:
             self.load_index()
         
-        # Generate query embedding
-        query_embedding = self.embedder.embed_single(query_text, normalize=True)
-        query_embedding = query_embedding.reshape(1, -1).astype('float32')
+        scope = self._scope(queue, language, query_text)
         
-        # Search
-        scores, indices = self.index.search(query_embedding, k)
+        # BM25 does not need the embedding: start it before encoding the query
+        sparse = self._submit_sparse(query_text, scope)
         
-        # Format results
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.tickets_df):
-                ticket = self.tickets_df.iloc[idx]
-                results.append({
-                    "score": float(score),
-                    "subject": ticket['subject'],
-                    "body": ticket['body'],
-                    "answer": ticket['answer'],
-                    "queue": ticket['queue'],
-                    "priority": ticket['priority'],
-                    "language": ticket['language']
-                })
+        start = time.perf_counter()
+        query_embedding = self.embedder.embed_single(query_text, normalize=True, reduce=True)
+        self._record("embed_ms", start)
         
-        return results
+        return self._search(query_embedding, k, sparse, scope)
     
-    def search_by_embedding(self, query_embedding: np.ndarray, k: int = 5) -> List[Dict[str, Any]]:
+    def search_by_embedding(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 5,
+        query_text: Optional[str] = None,
+        queue: Optional[str] = None,
+        language: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Search using pre-computed embedding.
         
         Args:
-            query_embedding: Query embedding vector
+            query_embedding: Query embedding vector (reduced, as returned by predict_ticket)
             k: Number of results to return
+            query_text: Query text; enables the BM25 half of hybrid search
+            queue: Scope the search to this queue's tickets (optional)
+            language: Language code within the queue (guessed from query_text if omitted)
             
         Returns:
             List of similar tickets with scores
@@ -163,29 +446,128 @@ class TicketRetriever:
         if not self.indexed:
             self.load_index()
         
+        scope = self._scope(queue, language, query_text)
+        sparse = self._submit_sparse(query_text, scope) if query_text else None
+        return self._search(query_embedding, k, sparse, scope)
+    
+    @property
+    def hybrid(self) -> bool:
+        return RETRIEVAL_MODE == "hybrid" and self.sparse is not None
+    
+    def _submit_sparse(self, query_text: str, scope: Optional[Tuple[str, Optional[str]]]):
+        """Start the BM25 search on the retrieval thread (None in dense mode)"""
+        if not self.hybrid:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bm25")
+        allowed = self.partitions[scope] if scope else None
+        return self._executor.submit(self._sparse_search, query_text, RETRIEVAL_CANDIDATES, allowed)
+    
+    def _sparse_search(self, query_text: str, n: int, allowed: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        start = time.perf_counter()
+        try:
+            return self.sparse.search(query_text, n, allowed=allowed)
+        finally:
+            self._record("sparse_ms", start)
+    
+    def _search(self, query_embedding: np.ndarray, k: int, sparse, scope=None) -> List[Dict[str, Any]]:
+        """Dense search on this thread, fused with the BM25 future if there is one"""
+        start = time.perf_counter()
+        
         # Normalize and reshape
         query_embedding = query_embedding / (np.linalg.norm(query_embedding) + 1e-10)
         query_embedding = query_embedding.reshape(1, -1).astype('float32')
         
-        # Search
-        scores, indices = self.index.search(query_embedding, k)
+        # Over-fetch only when there is a second ranking to fuse with
+        dense_start = time.perf_counter()
+        n = max(k, RETRIEVAL_CANDIDATES) if sparse else k
+        scores, indices = self._dense_search(query_embedding, n, scope)
+        self._record("dense_ms", dense_start)
+        dense = [(int(i), float(s)) for s, i in zip(scores[0], indices[0]) if 0 <= i < len(self.tickets_df)]
         
-        # Format results
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.tickets_df):
-                ticket = self.tickets_df.iloc[idx]
-                results.append({
-                    "score": float(score),
-                    "subject": ticket['subject'],
-                    "body": ticket['body'],
-                    "answer": ticket['answer'],
-                    "queue": ticket['queue'],
-                    "priority": ticket['priority'],
-                    "language": ticket['language']
-                })
+        if sparse is not None:
+            try:
+                sparse_scores, sparse_indices = sparse.result()
+            except Exception as e:
+                logger.warning(f"! BM25 search failed: {e} (using dense results)")
+                sparse = None
+        
+        if sparse is None:
+            results = [self._result(idx, score) for idx, score in dense[:k]]
+            mode = "dense"
+        else:
+            fusion_start = time.perf_counter()
+            results = self._fuse(dense, list(zip(sparse_indices.tolist(), sparse_scores.tolist())), k)
+            self._record("fusion_ms", fusion_start)
+            mode = "hybrid"
+        
+        self._record("total_ms", start)
+        with self._lock:
+            self._searches[mode] += 1
+        return results
+    
+    def _fuse(self, dense: List[Tuple[int, float]], sparse: List[Tuple[int, float]], k: int) -> List[Dict[str, Any]]:
+        """Reciprocal rank fusion: score = sum of 1 / (RETRIEVAL_RRF_K + rank) over both rankings"""
+        fused: Dict[int, float] = {}
+        for ranking in (dense, sparse):
+            for rank, (idx, _) in enumerate(ranking, 1):
+                fused[idx] = fused.get(idx, 0.0) + 1.0 / (RETRIEVAL_RRF_K + rank)
         
+        dense_scores, sparse_scores = dict(dense), dict(sparse)
+        results = []
+        for idx in sorted(fused, key=lambda i: -fused[i])[:k]:
+            result = self._result(idx, fused[idx])
+            result["dense_score"] = dense_scores.get(idx)
+            result["bm25_score"] = sparse_scores.get(idx)
+            results.append(result)
         return results
+    
+    def _result(self, idx: int, score: float) -> Dict[str, Any]:
+        ticket = self.tickets_df.iloc[idx]
+        return {
+            "score": float(score),
+            "subject": ticket['subject'],
+            "body": ticket['body'],
+            "answer": ticket['answer'],
+            "queue": ticket['queue'],
+            "priority": ticket['priority'],
+            "language": ticket['language']
+        }
+    
+    def _record(self, component: str, start: float):
+        elapsed = (time.perf_counter() - start) * 1000
+        with self._lock:
+            samples = self._latencies.setdefault(component, [])
+            samples.append(elapsed)
+            if len(samples) > LATENCY_SAMPLES:
+                del samples[0]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Search counts and per-component latency (embed, dense, sparse, fusion, total)"""
+        with self._lock:
+            latency = {}
+            for component, samples in self._latencies.items():
+                ordered = sorted(samples)
+                latency[component] = {
+                    "p50": round(ordered[len(ordered) // 2], 2),
+                    "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+                    "max": round(ordered[-1], 2)
+                }
+            return {
+                "mode": "hybrid" if self.hybrid else "dense",
+                "indexed": self.indexed,
+                "vectors": self.index.ntotal if self.index is not None else 0,
+                "dim": self.index.d if self.index is not None else None,
+                "codec": self.codec,
+                "index_mb": round(self.index_bytes / 1e6, 1),
+                "bm25_terms": len(self.sparse.vocab) if self.sparse is not None else 0,
+                "searches": dict(self._searches),
+                "scopes": dict(self._scopes),
+                "partitions": len(self.partitions),
+                "latency_ms": latency
+            }
 
 
 # Global retriever instance
@@ -203,3 +585,8 @@ def get_retriever() -> TicketRetriever:
     if _retriever is None:
         _retriever = TicketRetriever()
     return _retriever
+
+
+def get_loaded_retriever() -> Optional[TicketRetriever]:
+    """Global retriever instance if already created (never loads the embedder or indexes)"""
+    return _retriever
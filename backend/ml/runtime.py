@@ -0,0 +1,198 @@
+"""
+CPU thread budget for the ML libraries of one API worker.
+
+Every uvicorn worker loads torch (bge-m3), NumPy/scikit-learn BLAS, XGBoost
+and LightGBM estimators pickled with n_jobs=-1, and FAISS with OpenMP. Each
+library sizes its thread pool to all cores, so several workers with a
+classification pool oversubscribe the CPU many times over.
+
+The budget gives each worker CPU_BUDGET cores (default: available cores /
+WEB_CONCURRENCY) and splits them across the CLASSIFY_WORKERS threads that
+run inference concurrently:
+
+    configure_threads()     - OMP/MKL/OpenBLAS environment; call before
+                              NumPy, torch or FAISS are imported
+    apply_thread_budget()   - runtime limits of the loaded libraries
+    limit_estimator_jobs()  - n_jobs of loaded estimators
+
+Variables already set in the environment are left alone.
+"""
+from typing import Any, Dict, List, Optional
+import os
+import sys
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Thread budget settings
+THREAD_BUDGET = os.getenv("THREAD_BUDGET", "true").lower() == "true"
+CPU_BUDGET = int(os.getenv("CPU_BUDGET", "0"))  # cores per worker, 0 = available cores / WEB_CONCURRENCY
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))  # uvicorn --workers
+CLASSIFY_WORKERS = int(os.getenv("CLASSIFY_WORKERS", "2"))  # same setting as the triage pipeline
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# Attributes holding nested estimators (ensembles, calibration, pipelines)
+_NESTED_ESTIMATORS = ("estimators_", "estimator", "base_estimator", "calibrated_classifiers_", "steps")
+
+_applied = False
+
+
+def available_cores() -> int:
+    """Cores this process may run on (CPU affinity / container limits where available)"""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def thread_budget() -> Dict[str, int]:
+    """
+    Cores of this worker and the threads each concurrent inference task may use.
+
+    Returns:
+        Dictionary with cores, workers, budget, concurrency and threads_per_task
+    """
+    cores = available_cores()
+    workers = max(1, WEB_CONCURRENCY)
+    budget = CPU_BUDGET if CPU_BUDGET > 0 else max(1, cores // workers)
+    concurrency = max(1, CLASSIFY_WORKERS)
+    return {
+        "cores": cores,
+        "workers": workers,
+        "budget": budget,
+        "concurrency": concurrency,
+        "threads_per_task": max(1, budget // concurrency)
+    }
+
+
+def configure_threads():
+    """Set the OpenMP/BLAS thread environment (before the libraries read it)"""
+    if not THREAD_BUDGET:
+        return
+    threads = str(thread_budget()["threads_per_task"])
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, threads)
+
+
+def apply_thread_budget():
+    """Apply the budget to torch, FAISS and the BLAS/OpenMP pools already loaded"""
+    global _applied
+    if not THREAD_BUDGET:
+        return
+    threads = thread_budget()["threads_per_task"]
+
+    # torch reads OMP_NUM_THREADS when it is imported later
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # only settable before the first parallel operation
+
+    try:
+        import faiss
+        faiss.omp_set_num_threads(threads)
+    except ImportError:
+        pass
+
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+    except ImportError:
+        pass
+
+    _applied = True
+    logger.info(f"✓ Thread budget applied: {threads} threads per task ({thread_budget()['budget']} cores per worker)")
+
+
+def limit_estimator_jobs(estimator: Any, n_jobs: Optional[int] = None) -> Any:
+    """
+    Override n_jobs of an estimator and the estimators nested in it.
+
+    Pickled models keep the n_jobs=-1 they were trained with; XGBoost also
+    keeps nthread in its booster.
+
+    Args:
+        estimator: Loaded classifier (scikit-learn, XGBoost, LightGBM or LinearHead)
+        n_jobs: Threads (default: threads_per_task of the budget)
+
+    Returns:
+        The estimator
+    """
+    if not THREAD_BUDGET or estimator is None:
+        return estimator
+    n_jobs = n_jobs or thread_budget()["threads_per_task"]
+
+    if hasattr(estimator, "n_jobs"):
+        estimator.n_jobs = n_jobs
+    if hasattr(estimator, "get_booster"):
+        try:
+            estimator.get_booster().set_param({"nthread": n_jobs})
+        except Exception:
+            pass  # not fitted
+
+    for attr in _NESTED_ESTIMATORS:
+        nested = getattr(estimator, attr, None)
+        if isinstance(nested, (list, tuple)):
+            for item in nested:
+                limit_estimator_jobs(item[-1] if isinstance(item, tuple) else item, n_jobs)
+        elif nested is not None and not isinstance(nested, str):
+            limit_estimator_jobs(nested, n_jobs)
+    return estimator
+
+
+def estimator_jobs(estimator: Any) -> List[Dict[str, Any]]:
+    """n_jobs of an estimator and its nested estimators, for diagnostics"""
+    found = []
+    if estimator is None:
+        return found
+    if hasattr(estimator, "n_jobs"):
+        found.append({"estimator": type(estimator).__name__, "n_jobs": estimator.n_jobs})
+    for attr in _NESTED_ESTIMATORS:
+        nested = getattr(estimator, attr, None)
+        if isinstance(nested, (list, tuple)):
+            for item in nested:
+                found.extend(estimator_jobs(item[-1] if isinstance(item, tuple) else item))
+        elif nested is not None and not isinstance(nested, str):
+            found.extend(estimator_jobs(nested))
+    return found
+
+
+def get_runtime_info() -> Dict[str, Any]:
+    """Budget, thread environment and the limits each loaded library reports"""
+    info = {
+        "enabled": THREAD_BUDGET,
+        "applied": _applied,
+        **thread_budget(),
+        "env": {var: os.environ.get(var) for var in THREAD_ENV_VARS},
+        "torch": None,
+        "faiss_omp_threads": None,
+        "threadpools": []
+    }
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        info["torch"] = {
+            "intra_op_threads": torch.get_num_threads(),
+            "inter_op_threads": torch.get_num_interop_threads()
+        }
+    if "faiss" in sys.modules:
+        info["faiss_omp_threads"] = sys.modules["faiss"].omp_get_max_threads()
+    try:
+        from threadpoolctl import threadpool_info
+        info["threadpools"] = [
+            {"library": pool.get("internal_api"), "api": pool.get("user_api"), "num_threads": pool.get("num_threads")}
+            for pool in threadpool_info()
+        ]
+    except ImportError:
+        pass
+    return info
@@ -0,0 +1,226 @@
+"""
+Shadow and canary evaluation of candidate models on live triage traffic.
+The candidate reuses the embedding computed for the active model, so no extra encoding is done.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import logging
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class ShadowEvaluator:
+    """
+    Runs a candidate model next to the active one and compares their predictions.
+
+    Modes:
+        - "off":    candidate is never used
+        - "shadow": active model serves every ticket, candidate runs in the background
+        - "canary": candidate serves CANARY_PERCENT of tickets, the other model runs in the background
+
+    Background inference happens on a single worker thread so request latency is unchanged.
+    """
+
+    MODES = ("off", "shadow", "canary")
+    LOG_PATH = Path("./logs/shadow_comparisons.jsonl")
+
+    def __init__(
+        self,
+        candidate_bundle: Dict[str, Any],
+        classify: Callable[[Dict[str, Any], np.ndarray], Dict[str, Any]],
+        mode: str = "shadow",
+        canary_percent: float = 0.0,
+        log_path: Optional[Path] = None,
+        max_pending: int = 256
+    ):
+        """
+        Initialize shadow evaluator.
+
+        Args:
+            candidate_bundle: Loaded candidate models (see TicketPredictor.load_bundle)
+            classify: Function (bundle, features_2d) -> prediction dict
+            mode: "off", "shadow" or "canary"
+            canary_percent: Percentage of tickets (0-100) served by the candidate in canary mode
+            log_path: Comparison log file (JSON lines)
+            max_pending: Drop background comparisons when this many are queued
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown shadow mode: {mode}")
+
+        self.candidate_bundle = candidate_bundle
+        self.classify = classify
+        self.mode = mode
+        self.canary_percent = max(0.0, min(100.0, canary_percent))
+        self.log_path = Path(log_path) if log_path else self.LOG_PATH
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_pending = max_pending
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._dropped = 0
+        self._stats = {
+            "compared": 0,
+            "queue_agree": 0,
+            "critical_agree": 0,
+            "served_by_candidate": 0,
+            "confidence_shift_sum": 0.0,
+            "confidence_shift_abs_sum": 0.0,
+            "critical_prob_shift_sum": 0.0,
+            "critical_prob_shift_abs_sum": 0.0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def routes_to_candidate(self, text: str) -> bool:
+        """
+        Decide whether the candidate serves this ticket (canary mode only).
+        Routing is a stable hash of the text so retriage of the same ticket is consistent.
+        """
+        if self.mode != "canary" or self.canary_percent <= 0:
+            return False
+        bucket = zlib.crc32(text.encode("utf-8")) % 10000
+        return bucket < self.canary_percent * 100
+
+    def predict_candidate(self, features_2d: np.ndarray) -> Dict[str, Any]:
+        """Predict with the candidate models on the request path (canary traffic)."""
+        return self.classify(self.candidate_bundle, features_2d)
+
+    def observe(
+        self,
+        text: str,
+        features_2d: np.ndarray,
+        served: Dict[str, Any],
+        served_by: str,
+        other_bundle: Dict[str, Any]
+    ):
+        """
+        Schedule a background comparison of the served prediction with the other model.
+
+        Args:
+            text: Ticket text (only its hash is logged)
+            features_2d: Feature row already used for the served prediction
+            served: Prediction returned to the caller
+            served_by: "active" or "candidate"
+            other_bundle: Models that did NOT serve this ticket
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._dropped += 1
+                return
+            self._pending += 1
+
+        self._executor.submit(
+            self._compare, zlib.crc32(text.encode("utf-8")), features_2d.copy(), served, served_by, other_bundle
+        )
+
+    def _compare(
+        self,
+        text_hash: int,
+        features_2d: np.ndarray,
+        served: Dict[str, Any],
+        served_by: str,
+        other_bundle: Dict[str, Any]
+    ):
+        """Run the other model and record the comparison (background thread)."""
+        try:
+            other = self.classify(other_bundle, features_2d)
+            if served_by == "active":
+                active, candidate = served, other
+            else:
+                active, candidate = other, served
+
+            conf_shift = candidate["queue_confidence"] - active["queue_confidence"]
+            crit_shift = candidate["critical_prob"] - active["critical_prob"]
+            queue_agree = candidate["predicted_queue"] == active["predicted_queue"]
+            critical_agree = candidate["is_critical"] == active["is_critical"]
+
+            with self._lock:
+                s = self._stats
+                s["compared"] += 1
+                s["queue_agree"] += int(queue_agree)
+                s["critical_agree"] += int(critical_agree)
+                s["served_by_candidate"] += int(served_by == "candidate")
+                s["confidence_shift_sum"] += conf_shift
+                s["confidence_shift_abs_sum"] += abs(conf_shift)
+                s["critical_prob_shift_sum"] += crit_shift
+                s["critical_prob_shift_abs_sum"] += abs(crit_shift)
+
+            record = {
+                "ts": round(time.time(), 3),
+                "h": text_hash,
+                "by": served_by[0],
+                "aq": str(active["predicted_queue"]),
+                "ac": round(active["queue_confidence"], 4),
+                "ap": round(active["critical_prob"], 4),
+                "cq": str(candidate["predicted_queue"]),
+                "cc": round(candidate["queue_confidence"], 4),
+                "cp": round(candidate["critical_prob"], 4),
+            }
+            with self._lock:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        except Exception as e:
+            logger.warning(f"Shadow comparison failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Agreement and confidence-shift statistics (candidate minus active).
+
+        Returns:
+            Dictionary with counts, agreement rates and mean shifts
+        """
+        with self._lock:
+            s = dict(self._stats)
+            pending = self._pending
+            dropped = self._dropped
+
+        n = s["compared"]
+        return {
+            "mode": self.mode,
+            "canary_percent": self.canary_percent,
+            "compared": n,
+            "pending": pending,
+            "dropped": dropped,
+            "served_by_candidate": s["served_by_candidate"],
+            "queue_agreement": s["queue_agree"] / n if n else None,
+            "critical_agreement": s["critical_agree"] / n if n else None,
+            "mean_confidence_shift": s["confidence_shift_sum"] / n if n else None,
+            "mean_abs_confidence_shift": s["confidence_shift_abs_sum"] / n if n else None,
+            "mean_critical_prob_shift": s["critical_prob_shift_sum"] / n if n else None,
+            "mean_abs_critical_prob_shift": s["critical_prob_shift_abs_sum"] / n if n else None,
+        }
+
+    def shutdown(self):
+        """Wait for queued comparisons and stop the worker thread"""
+        self._executor.shutdown(wait=True)
+
+
+def shadow_settings() -> Dict[str, Any]:
+    """
+    Read shadow/canary settings from environment.
+
+    Returns:
+        Dictionary with mode, canary_percent and candidate model directory
+    """
+    return {
+        "mode": os.getenv("SHADOW_MODE", "off").lower(),
+        "canary_percent": float(os.getenv("CANARY_PERCENT", "0")),
+        "model_dir": Path(os.getenv("SHADOW_MODEL_DIR", "./models/candidate")),
+    }
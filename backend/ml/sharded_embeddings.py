@@ -0,0 +1,319 @@
+"""
+Sharded, resumable embedding generation for training and index builds.
+Splits a corpus into fixed-size shards, encodes them across a process pool
+(one LOCAL model per process) and writes each shard to its own .npy file.
+"""
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+from tqdm import tqdm
+
+from backend.ml.embeddings import LocalEmbedder, EMBEDDING_MAX_SEQ_LENGTH
+from backend.ml.runtime import THREAD_ENV_VARS
+
+logger = logging.getLogger(__name__)
+
+# How long spawned workers may take to start (interpreter + torch import)
+WORKER_START_TIMEOUT_S = 300
+
+
+# Per-process embedder (set by _init_worker)
+_worker_embedder = None
+
+
+def _set_environ(values: Dict[str, Optional[str]]) -> Dict[str, Optional[str]]:
+    """Set (or unset, for None) environment variables and return their previous values"""
+    previous = {var: os.environ.get(var) for var in values}
+    for var, value in values.items():
+        if value is None:
+            os.environ.pop(var, None)
+        else:
+            os.environ[var] = value
+    return previous
+
+
+def _init_worker(model_name: str, num_threads: int, started=None):
+    """
+    Process pool initializer: pin torch threads and load one model per process.
+
+    The OMP/MKL/OpenBLAS variables come from the parent's environment
+    (see embed_stream): a spawned child imports torch while unpickling the
+    task, before this initializer runs. Waiting on `started` keeps every
+    worker busy until all of them are spawned, so the parent can restore
+    its environment right away.
+    """
+    global _worker_embedder
+    if started is not None:
+        started.wait(timeout=WORKER_START_TIMEOUT_S)
+    import torch
+    torch.set_num_threads(num_threads)
+
+    _worker_embedder = LocalEmbedder(model_name=model_name, cache_enabled=False)
+
+
+def _write_shard(embedder: LocalEmbedder, texts: List[str], out_path: str, batch_size: int) -> Tuple[str, int]:
+    """
+    Encode one shard and write it atomically as a memory-mapped .npy file.
+
+    Returns:
+        (output path, number of rows)
+    """
+    embeddings = embedder.embed_texts(texts, batch_size=batch_size, normalize=True)
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+
+    tmp_path = out_path + ".tmp"
+    mm = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=embeddings.shape)
+    mm[:] = embeddings
+    mm.flush()
+    del mm
+    os.replace(tmp_path, out_path)
+    return out_path, len(embeddings)
+
+
+def _embed_shard(texts: List[str], out_path: str, batch_size: int) -> Tuple[str, int]:
+    """Process pool task: encode one shard with the per-process model"""
+    return _write_shard(_worker_embedder, texts, out_path, batch_size)
+
+
+class ShardedEmbeddingJob:
+    """
+    Resumable sharded embedding job.
+
+    Layout under ./embeddings_cache/<name>/:
+        manifest.json       - model name, shard size and shard count
+        shard_00000.npy     - float32 (rows, dim), one file per finished shard
+        shard_00000.sha1    - fingerprint of the texts in that shard
+        embeddings.npy      - optional consolidated memmap (see consolidate)
+
+    Reruns skip shards whose fingerprint still matches. Changing the model,
+    shard size or EMBEDDING_MAX_SEQ_LENGTH invalidates all shards.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model_name: str,
+        shard_size: int = 2048,
+        cache_dir: Optional[Path] = None
+    ):
+        """
+        Initialize sharded embedding job.
+
+        Args:
+            name: Job name (subdirectory of the embeddings cache)
+            model_name: SentenceTransformer model name
+            shard_size: Rows per shard
+            cache_dir: Cache root (default: LocalEmbedder.CACHE_DIR)
+        """
+        self.name = name
+        self.model_name = model_name
+        self.shard_size = shard_size
+        self.shard_dir = Path(cache_dir or LocalEmbedder.CACHE_DIR) / name
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+
+        self.num_shards = 0
+        self.num_rows = 0
+        self._check_manifest()
+
+    def _check_manifest(self):
+        """Discard existing shards if they were built with a different model, shard size or sequence limit"""
+        manifest_path = self.shard_dir / "manifest.json"
+        if manifest_path.exists():
+            with open(manifest_path, "r") as f:
+                existing = json.load(f)
+            if (existing.get("model_name") == self.model_name
+                    and existing.get("shard_size") == self.shard_size
+                    and existing.get("max_seq_length", 0) == EMBEDDING_MAX_SEQ_LENGTH):
+                return
+            logger.info(f"Model, shard size or sequence limit changed, discarding old shards in {self.shard_dir}")
+            shutil.rmtree(self.shard_dir)
+            self.shard_dir.mkdir(parents=True)
+        self._write_manifest()
+
+    def _write_manifest(self):
+        with open(self.shard_dir / "manifest.json", "w") as f:
+            json.dump({
+                "model_name": self.model_name,
+                "shard_size": self.shard_size,
+                "max_seq_length": EMBEDDING_MAX_SEQ_LENGTH,
+                "num_shards": self.num_shards,
+                "num_rows": self.num_rows
+            }, f, indent=2)
+
+    @staticmethod
+    def _fingerprint(texts: Sequence[str]) -> str:
+        """Hash of a shard's texts so stale shards are never reused"""
+        h = hashlib.sha1()
+        for text in texts:
+            h.update(text.encode("utf-8", errors="replace"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def shard_path(self, shard_idx: int) -> Path:
+        return self.shard_dir / f"shard_{shard_idx:05d}.npy"
+
+    def _is_done(self, shard_idx: int, fingerprint: str) -> bool:
+        fp_path = self.shard_path(shard_idx).with_suffix(".sha1")
+        return (
+            self.shard_path(shard_idx).exists()
+            and fp_path.exists()
+            and fp_path.read_text().strip() == fingerprint
+        )
+
+    def _mark_done(self, shard_idx: int, fingerprint: str):
+        self.shard_path(shard_idx).with_suffix(".sha1").write_text(fingerprint)
+
+    def _start_pool(self, num_workers: int, threads: int) -> ProcessPoolExecutor:
+        """
+        Spawn all workers with the child thread environment, then restore
+        the parent's. Spawned pools start a worker per submit (while none is
+        idle), so one blocked no-op per worker launches all of them.
+        """
+        ctx = mp.get_context("spawn")
+        started = ctx.Barrier(num_workers + 1)
+        child_env = {var: str(threads) for var in THREAD_ENV_VARS}
+        child_env["TOKENIZERS_PARALLELISM"] = "false"
+        parent_env = _set_environ(child_env)
+        pool = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(self.model_name, threads, started)
+        )
+        try:
+            warmup = [pool.submit(os.getpid) for _ in range(num_workers)]
+            started.wait(timeout=WORKER_START_TIMEOUT_S)
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        finally:
+            _set_environ(parent_env)
+        for future in warmup:
+            future.result()
+        return pool
+
+    def embed_stream(
+        self,
+        text_chunks: Iterable[List[str]],
+        num_workers: int = 1,
+        threads_per_worker: Optional[int] = None,
+        batch_size: int = 32,
+        embedder: Optional[LocalEmbedder] = None,
+        show_progress: bool = True
+    ) -> Iterator[np.ndarray]:
+        """
+        Embed a stream of text chunks (one chunk = one shard), yielding each
+        shard as a read-only memmap in input order.
+
+        At most 2 * num_workers chunks are in flight, so memory is bounded by
+        the chunk size rather than the corpus size.
+
+        Args:
+            text_chunks: Iterable of text lists
+            num_workers: Worker processes (1 = encode in this process)
+            threads_per_worker: Torch/OMP threads per worker (default: cpu_count // num_workers)
+            batch_size: Encoding batch size
+            embedder: Already loaded embedder for in-process mode (optional)
+            show_progress: Show progress bar
+        """
+        progress = tqdm(desc="Embedding shards", unit="shard", disable=not show_progress)
+        pool = None
+        if num_workers > 1:
+            threads = threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+            pool = self._start_pool(num_workers, threads)
+
+        window = deque()  # (shard_idx, fingerprint, future or None)
+        self.num_shards = 0
+        self.num_rows = 0
+        reused = 0
+
+        def finish(item) -> np.ndarray:
+            shard_idx, fingerprint, future = item
+            if future is not None:
+                future.result()
+                self._mark_done(shard_idx, fingerprint)
+            progress.update(1)
+            return np.load(self.shard_path(shard_idx), mmap_mode="r")
+
+        try:
+            for texts in text_chunks:
+                texts = list(texts)
+                if not texts:
+                    continue
+                shard_idx = self.num_shards
+                self.num_shards += 1
+                self.num_rows += len(texts)
+                fingerprint = self._fingerprint(texts)
+                out_path = str(self.shard_path(shard_idx))
+
+                if self._is_done(shard_idx, fingerprint):
+                    reused += 1
+                    window.append((shard_idx, fingerprint, None))
+                elif pool is None:
+                    if embedder is None:
+                        embedder = LocalEmbedder(model_name=self.model_name, cache_enabled=False)
+                    _write_shard(embedder, texts, out_path, batch_size)
+                    self._mark_done(shard_idx, fingerprint)
+                    window.append((shard_idx, fingerprint, None))
+                else:
+                    window.append((shard_idx, fingerprint, pool.submit(_embed_shard, texts, out_path, batch_size)))
+
+                while len(window) > max(0, 2 * num_workers - 1):
+                    yield finish(window.popleft())
+
+            while window:
+                yield finish(window.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True, cancel_futures=True)
+            progress.close()
+
+        self._write_manifest()
+        logger.info(f"✓ Embedded {self.num_rows} rows in {self.num_shards} shards ({reused} reused) at {self.shard_dir}")
+
+    def run(self, texts: Sequence[str], **kwargs):
+        """
+        Embed all texts, skipping shards that are already done.
+
+        Args:
+            texts: Texts to embed
+            **kwargs: Passed to embed_stream
+        """
+        chunks = (texts[i:i + self.shard_size] for i in range(0, len(texts), self.shard_size))
+        for _ in self.embed_stream(chunks, **kwargs):
+            pass
+
+    def iter_shards(self) -> Iterator[np.ndarray]:
+        """Yield each shard as a read-only memmap, in corpus order"""
+        for shard_idx in range(self.num_shards):
+            yield np.load(self.shard_path(shard_idx), mmap_mode="r")
+
+    def consolidate(self) -> np.ndarray:
+        """
+        Copy all shards into a single on-disk .npy and return it memory-mapped.
+        Rows are streamed shard by shard, so the full matrix is never held in RAM.
+        """
+        out_path = self.shard_dir / "embeddings.npy"
+        tmp_path = str(out_path) + ".tmp"
+        first = np.load(self.shard_path(0), mmap_mode="r")
+        out = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=np.float32, shape=(self.num_rows, first.shape[1])
+        )
+        offset = 0
+        for shard in self.iter_shards():
+            out[offset:offset + len(shard)] = shard
+            offset += len(shard)
+        out.flush()
+        del out
+        os.replace(tmp_path, out_path)
+
+        return np.load(out_path, mmap_mode="r")
@@ -4,7 +4,7 @@ Uses LOCAL embeddings (NOT Gemini) and scikit-learn classifiers.
 """
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LogisticRegression
 from sklearn.svm import LinearSVC
 from sklearn.preprocessing import LabelEncoder
@@ -18,11 +18,17 @@ import xgboost as xgb
 import lightgbm as lgb
 import joblib
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 import logging
+import time
 from tqdm import tqdm
 
 from backend.ml.embeddings import get_embedder
+from backend.ml.sharded_embeddings import ShardedEmbeddingJob
+from backend.ml.tuning import HyperparameterTuner
+from backend.ml.distill import LinearHead, teacher_proba
+from backend.ml.projection import EmbeddingProjection, EMBEDDING_REDUCTION
+from backend.ml.data_stream import iter_ticket_chunks, prepare_chunk, TICKET_COLUMNS
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +39,7 @@ class TicketClassifierTrainer:
     """
     
     MODEL_DIR = Path("./models")
+    LABEL_COLUMNS = ['queue', 'is_critical', 'language']
     
     def __init__(self, dataset_path: str, embedder=None):
         """
@@ -48,6 +55,8 @@ class TicketClassifierTrainer:
         
         # Models
         self.dept_classifier = None
+        self.dept_head = None  # Distilled LinearHead (optional)
+        self.projection = None  # EmbeddingProjection (reduced-dimension mode)
         self.critical_classifier = None
         self.label_encoder = LabelEncoder()  # For XGBoost string -> int conversion
         
@@ -67,23 +76,33 @@ class TicketClassifierTrainer:
         self.y_crit_val = None
         self.y_crit_test = None
     
+    def iter_prepared_chunks(self, chunksize: int = 10000):
+        """
+        Stream the dataset as cleaned chunks with text and is_critical columns.
+        
+        Args:
+            chunksize: Rows per chunk
+        """
+        for chunk in iter_ticket_chunks(self.dataset_path, chunksize=chunksize, columns=TICKET_COLUMNS):
+            yield prepare_chunk(chunk, require_queue=True)
+    
     def load_and_prepare_data(self):
         """
-        Load CSV and prepare data.
+        Load dataset (CSV or Parquet) and prepare labels.
         Creates text = subject + "\n\n" + body
         Creates is_critical = (priority == "high")
+        
+        The file is streamed in chunks and only label columns are kept in
+        memory; text is re-streamed when embeddings or features are built.
         """
         logger.info(f"Loading dataset from {self.dataset_path}")
-        self.df = pd.read_csv(self.dataset_path)
         
-        # Create combined text
-        self.df['text'] = self.df['subject'].fillna('') + "\n\n" + self.df['body'].fillna('')
-        
-        # Create is_critical label
-        self.df['is_critical'] = (self.df['priority'].str.lower() == 'high').astype(int)
-        
-        # Filter out rows with missing queue or text
-        self.df = self.df[self.df['queue'].notna() & self.df['text'].notna()].copy()
+        # Filter out rows with missing queue or text, keep labels only
+        chunks = [
+            chunk[self.LABEL_COLUMNS]
+            for chunk in self.iter_prepared_chunks()
+        ]
+        self.df = pd.concat(chunks, ignore_index=True)
         
         logger.info(f"✓ Loaded {len(self.df)} valid tickets")
         logger.info(f"  - Queues: {self.df['queue'].nunique()} unique")
@@ -92,30 +111,39 @@ class TicketClassifierTrainer:
         
         return self.df
     
-    def generate_embeddings(self):
+    def generate_embeddings(self, num_workers: int = 1, shard_size: int = 2048):
         """
         Generate embeddings for all texts using LOCAL embedder.
+        
+        Text is streamed from the dataset one shard at a time. Encoding is
+        resumable: finished shards are kept in ./embeddings_cache/dataset_embeddings/
+        and skipped on rerun.
+        
+        Args:
+            num_workers: Worker processes for encoding (1 = in-process)
+            shard_size: Rows per shard
         """
         logger.info("Generating embeddings (this may take a while)...")
         
-        # Try to load from cache
+        # Try to load from legacy pickle cache
         cached = self.embedder.load_embeddings("dataset_embeddings")
         if cached is not None and len(cached) == len(self.df):
             logger.info(f"✓ Loaded cached embeddings: {cached.shape}")
             self.embeddings = cached
             return self.embeddings
         
-        # Generate embeddings
-        self.texts = self.df['text'].tolist()
-        self.embeddings = self.embedder.embed_texts(
-            self.texts,
-            batch_size=32,
-            normalize=True,
-            show_progress=True
+        # Generate embeddings shard by shard
+        job = ShardedEmbeddingJob(
+            "dataset_embeddings",
+            model_name=self.embedder.model_name,
+            shard_size=shard_size
         )
+        text_chunks = (chunk['text'].tolist() for chunk in self.iter_prepared_chunks(chunksize=shard_size))
+        for _ in job.embed_stream(text_chunks, num_workers=num_workers, batch_size=32, embedder=self.embedder):
+            pass
         
-        # Save to cache
-        self.embedder.save_embeddings(self.embeddings, "dataset_embeddings")
+        # Memory-mapped view of all shards (not loaded into RAM)
+        self.embeddings = job.consolidate()
         
         logger.info(f"✓ Generated embeddings: {self.embeddings.shape}")
         return self.embeddings
@@ -129,15 +157,33 @@ class TicketClassifierTrainer:
         """
         logger.info("Creating handcrafted features...")
         
+        handcrafted = np.vstack([
+            self._handcrafted_chunk(chunk)
+            for chunk in self.iter_prepared_chunks()
+        ])
+        
+        logger.info(f"✓ Created {handcrafted.shape[1]} handcrafted features")
+        return handcrafted
+    
+    def _handcrafted_chunk(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Handcrafted features for one prepared chunk.
+        
+        Args:
+            df: Chunk with text and language columns
+            
+        Returns:
+            Feature matrix with shape (len(df), n_features)
+        """
         features = {}
         
         # Text statistics
-        features['text_length'] = self.df['text'].str.len()
-        features['word_count'] = self.df['text'].str.split().str.len()
+        features['text_length'] = df['text'].str.len()
+        features['word_count'] = df['text'].str.split().str.len()
         features['avg_word_length'] = features['text_length'] / (features['word_count'] + 1)
         
         # Domain-specific keyword indicators
-        text_lower = self.df['text'].str.lower()
+        text_lower = df['text'].str.lower()
         
         features['has_network_words'] = text_lower.str.contains(
             'network|vpn|wifi|connection|internet|router|ethernet', 
@@ -170,8 +216,8 @@ class TicketClassifierTrainer:
         ).astype(int)
         
         # Language indicator
-        features['is_german'] = (self.df['language'] == 'de').astype(int)
-        features['is_english'] = (self.df['language'] == 'en').astype(int)
+        features['is_german'] = (df['language'] == 'de').astype(int)
+        features['is_english'] = (df['language'] == 'en').astype(int)
         
         # Urgency indicators
         features['has_urgent_words'] = text_lower.str.contains(
@@ -180,14 +226,10 @@ class TicketClassifierTrainer:
         ).astype(int)
         
         # Question indicators
-        features['has_question'] = self.df['text'].str.contains(r'\?', regex=True, na=False).astype(int)
+        features['has_question'] = df['text'].str.contains(r'\?', regex=True, na=False).astype(int)
         
         # Convert to numpy array
-        feature_df = pd.DataFrame(features)
-        handcrafted = feature_df.values
-        
-        logger.info(f"✓ Created {handcrafted.shape[1]} handcrafted features")
-        return handcrafted
+        return pd.DataFrame(features).values
     
     def split_data(self, test_size: float = 0.15, val_size: float = 0.15, random_state: int = 42, 
                    use_enhanced_features: bool = False):
@@ -240,13 +282,103 @@ class TicketClassifierTrainer:
         logger.info(f"  - Val:   {len(self.X_val)} samples")
         logger.info(f"  - Test:  {len(self.X_test)} samples")
     
+    def reduce_dimensions(self, dim: int, method: str = EMBEDDING_REDUCTION):
+        """
+        Fit an embedding projection on the training split and apply it to all splits.
+        
+        Must run after split_data. The cached embeddings stay full-dimensional.
+        
+        Args:
+            dim: Output dimension (e.g. 128-384)
+            method: "pca", "pca_whiten" or "truncate"
+        """
+        source_dim = self.embeddings.shape[1]
+        self.projection = EmbeddingProjection.fit(self.X_train[:, :source_dim], dim, method=method)
+        self.X_train = self.projection.transform(self.X_train)
+        self.X_val = self.projection.transform(self.X_val)
+        self.X_test = self.projection.transform(self.X_test)
+        logger.info(f"✓ Features reduced to {self.X_train.shape[1]} columns")
+    
+    def evaluate_dimensions(
+        self,
+        dims,
+        method: str = EMBEDDING_REDUCTION,
+        k: int = 10,
+        n_queries: int = 500
+    ) -> list:
+        """
+        Compare reduced embedding sizes before choosing one.
+        
+        For each dimension (and the full embedding) a projection is fitted on
+        the training split and scored by:
+            - department accuracy and criticality recall of logistic regression
+            - retrieval recall@k: overlap of the top-k training neighbours of
+              test tickets with the full-dimension neighbours
+            - FAISS memory for the whole dataset (float32 vectors)
+        
+        Must run after split_data.
+        
+        Args:
+            dims: Output dimensions to evaluate
+            method: "pca", "pca_whiten" or "truncate"
+            k: Neighbours for retrieval recall
+            n_queries: Test tickets used as retrieval queries
+            
+        Returns:
+            List of dictionaries, one per dimension (full embedding last)
+        """
+        from sklearn.metrics import recall_score
+        
+        source_dim = self.embeddings.shape[1]
+        X_train = np.asarray(self.X_train[:, :source_dim], dtype=np.float32)
+        X_test = np.asarray(self.X_test[:, :source_dim], dtype=np.float32)
+        queries = X_test[:n_queries]
+        
+        def neighbours(corpus, q):
+            scores = q @ corpus.T
+            top = np.argpartition(-scores, k, axis=1)[:, :k]
+            return [set(row) for row in top]
+        
+        exact = neighbours(X_train, queries)
+        
+        results = []
+        for dim in sorted(d for d in dims if 0 < d < source_dim) + [source_dim]:
+            logger.info(f"Evaluating embedding dimension {dim}...")
+            start = time.perf_counter()
+            if dim < source_dim:
+                projection = EmbeddingProjection.fit(X_train, dim, method=method)
+                train, test = projection.transform(X_train), projection.transform(X_test)
+                retained = projection.retained_variance
+            else:
+                train, test, retained = X_train, X_test, 1.0
+            
+            dept = LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced')
+            dept.fit(train, self.y_dept_train)
+            crit = LogisticRegression(max_iter=1000, random_state=42, class_weight='balanced')
+            crit.fit(train, self.y_crit_train)
+            
+            found = neighbours(train, test[:n_queries])
+            results.append({
+                "dim": dim,
+                "retained_variance": retained,
+                "dept_acc": accuracy_score(self.y_dept_test, dept.predict(test)),
+                "critical_recall": recall_score(self.y_crit_test, crit.predict(test), pos_label=1),
+                "retrieval_recall": float(np.mean([len(a & b) / k for a, b in zip(exact, found)])),
+                "index_mb": len(self.embeddings) * dim * 4 / 1e6,
+                "seconds": time.perf_counter() - start
+            })
+            logger.info(f"  - dim={dim}: acc={results[-1]['dept_acc']:.3f}, "
+                        f"recall@{k}={results[-1]['retrieval_recall']:.3f}, index={results[-1]['index_mb']:.0f} MB")
+        
+        return results
+    
     def train_department_classifier(self, model_type: str = "ensemble", 
                                    use_smote: bool = False, use_ensemble: bool = True):
         """
         Train department classifier with advanced techniques.
         
         Args:
-            model_type: "logistic", "svm", "xgboost", "xgboost_tuned", or "ensemble"
+            model_type: "logistic", "svm", "xgboost", "xgboost_tuned", "lightgbm_tuned", or "ensemble"
             use_smote: Use SMOTE to balance classes
             use_ensemble: Use ensemble of XGBoost + LightGBM
         """
@@ -295,41 +427,19 @@ class TicketClassifierTrainer:
                 n_jobs=-1,
                 verbosity=0
             )
-        elif model_type == "xgboost_tuned":
-            logger.info("Running hyperparameter tuning (this may take 3-5 minutes)...")
-            
-            # Smaller grid to reduce memory usage
-            param_grid = {
-                'n_estimators': [100, 150],
-                'max_depth': [6, 8],
-                'learning_rate': [0.1, 0.2],
-                'subsample': [0.9, 1.0]
-            }
+        elif model_type in ("xgboost_tuned", "lightgbm_tuned"):
+            logger.info("Running successive-halving hyperparameter search...")
             
-            base_model = xgb.XGBClassifier(
-                objective='multi:softmax',
-                num_class=len(np.unique(self.y_dept_train)),
-                eval_metric='mlogloss',
-                random_state=42,
-                tree_method='hist',
-                n_jobs=2,  # Limit parallel jobs to reduce memory
-                verbosity=0
-            )
-            
-            grid_search = GridSearchCV(
-                base_model,
-                param_grid,
-                cv=2,  # Reduced from 3 to save memory
-                scoring='f1_macro',
-                n_jobs=2,  # Limit parallel jobs
-                verbose=1
+            # Embeddings are shared with the search workers via memmap,
+            # so the full grid can run on every core without copying X_train
+            tuner = HyperparameterTuner(
+                X_train_balanced, y_train_balanced,
+                self.X_val, self.y_dept_val,
+                work_dir=self.MODEL_DIR / "tuning",
+                n_jobs=-1
             )
-            
-            grid_search.fit(X_train_balanced, y_train_balanced)
-            self.dept_classifier = grid_search.best_estimator_
-            
-            logger.info(f"✓ Best hyperparameters: {grid_search.best_params_}")
-            logger.info(f"✓ Best CV F1 score: {grid_search.best_score_:.3f}")
+            tuning = tuner.tune("xgboost" if model_type == "xgboost_tuned" else "lightgbm")
+            self.dept_classifier = tuning["best_estimator"]
         
         elif use_ensemble or model_type == "ensemble":
             logger.info("Training ensemble (XGBoost + LightGBM)...")
@@ -367,7 +477,7 @@ class TicketClassifierTrainer:
             raise ValueError(f"Unknown model type: {model_type}")
         
         # Train the model
-        if model_type != "xgboost_tuned":  # GridSearch already fitted
+        if model_type not in ("xgboost_tuned", "lightgbm_tuned"):  # Search already refitted best model
             self.dept_classifier.fit(X_train_balanced, y_train_balanced)
         
         # Evaluate
@@ -459,33 +569,147 @@ class TicketClassifierTrainer:
             "critical_recall": critical_recall
         }
     
-    def save_models(self):
-        """Save trained models to disk"""
-        dept_path = self.MODEL_DIR / "department_classifier.joblib"
-        crit_path = self.MODEL_DIR / "criticality_classifier.joblib"
-        encoder_path = self.MODEL_DIR / "label_encoder.joblib"
+    def distill_department_classifier(self, n_timing: int = 200) -> Dict[str, Any]:
+        """
+        Distill the trained department classifier into a softmax linear head.
+        
+        The head is fitted on the teacher's soft probabilities over the
+        training embeddings (a softmax of the margins for the SVM) and
+        replaces the ensemble at save time.
+        
+        Args:
+            n_timing: Single-row predictions used to measure latency
+            
+        Returns:
+            Dictionary with teacher/student accuracy, F1, latency and speedup
+        """
+        logger.info("Distilling department classifier into linear head...")
+        
+        teacher = self.dept_classifier
+        teacher_probs = teacher_proba(teacher, self.X_train)
+        
+        self.dept_head = LinearHead().fit_distill(
+            self.X_train, teacher_probs, y=self.y_dept_train
+        )
+        
+        teacher_preds = teacher.predict(self.X_test)
+        student_preds = self.dept_head.predict(self.X_test)
+        teacher_acc = accuracy_score(self.y_dept_test, teacher_preds)
+        student_acc = accuracy_score(self.y_dept_test, student_preds)
+        teacher_f1 = f1_score(self.y_dept_test, teacher_preds, average='macro')
+        student_f1 = f1_score(self.y_dept_test, student_preds, average='macro')
+        agreement = float(np.mean(teacher_preds == student_preds))
+        
+        # Per-ticket latency (one row, as in TicketPredictor.predict_ticket)
+        row = np.asarray(self.X_test[:1], dtype=np.float32)
+        start = time.perf_counter()
+        for _ in range(n_timing):
+            teacher_proba(teacher, row)
+        teacher_ms = (time.perf_counter() - start) / n_timing * 1000
+        start = time.perf_counter()
+        for _ in range(n_timing):
+            self.dept_head.predict_proba(row)
+        student_ms = (time.perf_counter() - start) / n_timing * 1000
+        
+        logger.info(f"✓ Linear head distilled:")
+        logger.info(f"  - Teacher: Acc={teacher_acc:.3f}, F1={teacher_f1:.3f}, {teacher_ms:.3f} ms/ticket")
+        logger.info(f"  - Student: Acc={student_acc:.3f}, F1={student_f1:.3f}, {student_ms:.3f} ms/ticket")
+        logger.info(f"  - Accuracy loss: {teacher_acc - student_acc:+.3f}, agreement: {agreement:.3f}")
+        logger.info(f"  - Speedup: {teacher_ms / max(student_ms, 1e-9):.1f}x")
+        
+        return {
+            "teacher_acc": teacher_acc,
+            "student_acc": student_acc,
+            "teacher_f1": teacher_f1,
+            "student_f1": student_f1,
+            "accuracy_loss": teacher_acc - student_acc,
+            "agreement": agreement,
+            "teacher_ms": teacher_ms,
+            "student_ms": student_ms,
+            "speedup": teacher_ms / max(student_ms, 1e-9)
+        }
+    
+    def save_models(self, model_dir: Optional[Path] = None):
+        """
+        Save trained models to disk.
+        
+        If a distilled linear head exists it is saved instead of the
+        department classifier, so the predictor loads the compact artifact.
+        
+        Args:
+            model_dir: Output directory (default: ./models). Use a separate
+                directory such as ./models/candidate for shadow/canary evaluation.
+        """
+        model_dir = Path(model_dir) if model_dir else self.MODEL_DIR
+        model_dir.mkdir(parents=True, exist_ok=True)
+        dept_path = model_dir / "department_classifier.joblib"
+        crit_path = model_dir / "criticality_classifier.joblib"
+        encoder_path = model_dir / "label_encoder.joblib"
+        
+        # Only one department artifact type per directory
+        if self.dept_head is not None:
+            self.dept_head.save(model_dir)
+            dept_path.unlink(missing_ok=True)
+            dept_path = model_dir / LinearHead.WEIGHTS_FILE
+        else:
+            joblib.dump(self.dept_classifier, dept_path)
+            (model_dir / LinearHead.WEIGHTS_FILE).unlink(missing_ok=True)
+            (model_dir / LinearHead.BIAS_FILE).unlink(missing_ok=True)
         
-        joblib.dump(self.dept_classifier, dept_path)
         joblib.dump(self.critical_classifier, crit_path)
         joblib.dump(self.label_encoder, encoder_path)
         
+        # Classifiers trained on reduced embeddings need their projection
+        if self.projection is not None:
+            self.projection.save(model_dir)
+        else:
+            EmbeddingProjection.remove(model_dir)
+        
         logger.info(f"✓ Saved models:")
         logger.info(f"  - {dept_path}")
         logger.info(f"  - {crit_path}")
         logger.info(f"  - {encoder_path}")
+        if self.projection is not None:
+            logger.info(f"  - {model_dir / EmbeddingProjection.FILE}")
     
-    def train_all(self):
-        """Run full training pipeline"""
+    def train_all(self, model_dir: Optional[Path] = None, num_workers: int = 1,
+                  model_type: str = "ensemble", distill: bool = False,
+                  embedding_dim: int = 0, reduction: str = EMBEDDING_REDUCTION,
+                  dim_report: Optional[list] = None):
+        """
+        Run full training pipeline.
+        
+        Args:
+            model_dir: Output directory for the trained models (default: ./models)
+            num_workers: Worker processes for embedding generation
+            model_type: Department classifier type (see train_department_classifier)
+            distill: Replace the department classifier with a distilled linear head
+            embedding_dim: Train on embeddings reduced to this dimension (0 = full)
+            reduction: Reduction method (see EmbeddingProjection)
+            dim_report: Dimensions to compare before training (see evaluate_dimensions)
+        """
         self.load_and_prepare_data()
-        self.generate_embeddings()
+        self.generate_embeddings(num_workers=num_workers)
         self.split_data()
         
-        dept_metrics = self.train_department_classifier()
-        crit_metrics = self.train_criticality_classifier()
+        dim_metrics = self.evaluate_dimensions(dim_report, method=reduction) if dim_report else None
+        if embedding_dim:
+            self.reduce_dimensions(embedding_dim, method=reduction)
         
-        self.save_models()
+        dept_metrics = self.train_department_classifier(model_type=model_type)
+        crit_metrics = self.train_criticality_classifier()
         
-        return {
+        metrics = {
             "department": dept_metrics,
             "criticality": crit_metrics
         }
+        if distill:
+            metrics["distillation"] = self.distill_department_classifier()
+        if dim_metrics is not None:
+            metrics["dimensions"] = dim_metrics
+        if self.projection is not None:
+            metrics["projection"] = self.projection.describe()
+        
+        self.save_models(model_dir)
+        
+        return metrics
@@ -0,0 +1,207 @@
+"""
+Hyperparameter search for the department classifier.
+Embedding matrices are written once per search to .npy files in a temporary
+directory and shared read-only with every worker through memory mapping, so
+adding workers does not copy X_train; the files are deleted afterwards.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV
+import xgboost as xgb
+import lightgbm as lgb
+from pathlib import Path
+from typing import Dict, Any, Optional
+import os
+import shutil
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class HyperparameterTuner:
+    """
+    Successive-halving grid search over XGBoost / LightGBM with early stopping.
+
+    Every candidate starts on a small sample of the training set; only the
+    best 1/factor of candidates move on to the next, larger round. Each
+    boosting run stops early on the validation set, so large n_estimators
+    values cost only as many rounds as they actually need.
+    """
+
+    PARAM_GRIDS = {
+        "xgboost": {
+            'max_depth': [4, 6, 8],
+            'learning_rate': [0.05, 0.1, 0.2],
+            'subsample': [0.8, 1.0],
+            'colsample_bytree': [0.5, 0.8, 1.0],
+            'min_child_weight': [1, 5]
+        },
+        "lightgbm": {
+            'num_leaves': [15, 31, 63],
+            'learning_rate': [0.05, 0.1, 0.2],
+            'subsample': [0.8, 1.0],
+            'colsample_bytree': [0.5, 0.8, 1.0],
+            'min_child_samples': [10, 20, 40]
+        }
+    }
+
+    def __init__(
+        self,
+        X_train: np.ndarray,
+        y_train: np.ndarray,
+        X_val: np.ndarray,
+        y_val: np.ndarray,
+        work_dir: Path,
+        n_jobs: int = -1,
+        max_estimators: int = 500,
+        early_stopping_rounds: int = 20
+    ):
+        """
+        Initialize tuner.
+
+        Args:
+            X_train: Training features
+            y_train: Encoded training labels
+            X_val: Validation features (early stopping)
+            y_val: Encoded validation labels
+            work_dir: Directory for the results table
+            n_jobs: Parallel search workers (-1 = all cores)
+            max_estimators: Upper bound on boosting rounds
+            early_stopping_rounds: Stop after this many rounds without improvement
+        """
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.n_jobs = n_jobs
+        self.max_estimators = max_estimators
+        self.early_stopping_rounds = early_stopping_rounds
+        self.num_class = len(np.unique(y_train))
+
+        self.X_train = X_train
+        self.X_val = X_val
+        self.y_train = np.asarray(y_train)
+        self.y_val = np.asarray(y_val)
+
+    @staticmethod
+    def _share(array: np.ndarray, share_dir: str, name: str) -> np.ndarray:
+        """Write array to .npy once and reopen it memory-mapped (read-only)"""
+        path = Path(share_dir) / f"{name}.npy"
+        np.save(path, np.ascontiguousarray(array, dtype=np.float32))
+        return np.load(path, mmap_mode="r")
+
+    def _base_estimator(self, model: str, X_val: np.ndarray):
+        """Estimator and fit params with early stopping (one thread per search worker)"""
+        if model == "xgboost":
+            estimator = xgb.XGBClassifier(
+                n_estimators=self.max_estimators,
+                objective='multi:softprob',
+                num_class=self.num_class,
+                eval_metric='mlogloss',
+                early_stopping_rounds=self.early_stopping_rounds,
+                random_state=42,
+                tree_method='hist',
+                n_jobs=1,
+                verbosity=0
+            )
+            fit_params = {"eval_set": [(X_val, self.y_val)], "verbose": False}
+        elif model == "lightgbm":
+            estimator = lgb.LGBMClassifier(
+                n_estimators=self.max_estimators,
+                subsample_freq=1,
+                random_state=42,
+                n_jobs=1,
+                verbose=-1
+            )
+            fit_params = {
+                "eval_set": [(X_val, self.y_val)],
+                "callbacks": [lgb.early_stopping(self.early_stopping_rounds, verbose=False)]
+            }
+        else:
+            raise ValueError(f"Unknown model for tuning: {model}")
+
+        return estimator, fit_params
+
+    def tune(
+        self,
+        model: str = "xgboost",
+        param_grid: Optional[Dict[str, list]] = None,
+        factor: int = 3,
+        cv: int = 3
+    ) -> Dict[str, Any]:
+        """
+        Run successive-halving search and write a results table.
+
+        Args:
+            model: "xgboost" or "lightgbm"
+            param_grid: Grid to search (default: PARAM_GRIDS[model])
+            factor: Keep 1/factor of candidates per round
+            cv: Cross-validation folds
+
+        Returns:
+            Dictionary with best_estimator, best_params, best_score, results_path
+        """
+        param_grid = param_grid or self.PARAM_GRIDS[model]
+
+        # Share read-only across workers; joblib passes memmaps by filename.
+        # The copies are removed once the search is done, even if it fails.
+        share_dir = tempfile.mkdtemp(prefix="tuning-")
+        try:
+            X_train = self._share(self.X_train, share_dir, "X_train")
+            X_val = self._share(self.X_val, share_dir, "X_val")
+            estimator, fit_params = self._base_estimator(model, X_val)
+
+            # Start each candidate with enough rows that every class appears in every fold
+            search = HalvingGridSearchCV(
+                estimator,
+                param_grid,
+                factor=factor,
+                min_resources=min(len(X_train), self.num_class * cv * 20),
+                cv=cv,
+                scoring='f1_macro',
+                n_jobs=self.n_jobs,
+                random_state=42,
+                verbose=1
+            )
+
+            n_workers = self.n_jobs if self.n_jobs > 0 else os.cpu_count()
+            logger.info(f"Tuning {model} over {len(X_train)} samples with {n_workers} workers...")
+            search.fit(X_train, self.y_train, **fit_params)
+        finally:
+            # Open memmaps would keep the files locked on Windows
+            X_train = X_val = estimator = fit_params = None
+            shutil.rmtree(share_dir, ignore_errors=True)
+
+        results_path = self.write_results(search, model)
+
+        best = search.best_estimator_
+        best_iteration = getattr(best, "best_iteration", None) or getattr(best, "best_iteration_", None)
+        logger.info(f"✓ Best hyperparameters: {search.best_params_}")
+        logger.info(f"✓ Best CV F1 score: {search.best_score_:.3f} (early-stopped at {best_iteration} rounds)")
+
+        return {
+            "best_estimator": best,
+            "best_params": search.best_params_,
+            "best_score": search.best_score_,
+            "results_path": results_path
+        }
+
+    def write_results(self, search: HalvingGridSearchCV, model: str) -> Path:
+        """
+        Save the per-candidate results table (one row per candidate per round).
+
+        Returns:
+            Path to CSV results table
+        """
+        results = pd.DataFrame(search.cv_results_)
+        columns = ['iter', 'n_resources', 'params', 'mean_test_score', 'std_test_score',
+                   'mean_fit_time', 'rank_test_score']
+        results = results[columns].sort_values(['iter', 'rank_test_score'], ascending=[False, True])
+
+        results_path = self.work_dir / f"{model}_tuning_results.csv"
+        results.to_csv(results_path, index=False)
+
+        print(f"\nTop candidates ({model}):")
+        print(results.head(10).to_string(index=False))
+        logger.info(f"✓ Saved tuning results to {results_path}")
+        return results_path
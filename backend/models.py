@@ -1,7 +1,7 @@
 """
 Database models for IT Ticket Triage System.
 """
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey, Enum, Index, LargeBinary, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -56,10 +56,33 @@ class Ticket(Base):
     triaged_at = Column(DateTime, nullable=True)
     sent_at = Column(DateTime, nullable=True)
     
+    # Lease of the worker currently running this ticket's pipeline stage
+    claimed_until = Column(DateTime, nullable=True)
+    
+    # Near-duplicate of an earlier ticket (inherits its triage, draft and approval)
+    parent_id = Column(Integer, ForeignKey("tickets.id"), nullable=True, index=True)
+    
     # Relationships
+    parent = relationship("Ticket", remote_side=[id], back_populates="duplicates")
+    duplicates = relationship("Ticket", back_populates="parent")
     responses = relationship("Response", back_populates="ticket", cascade="all, delete-orphan")
     approvals = relationship("Approval", back_populates="ticket", cascade="all, delete-orphan")
     audit_logs = relationship("AuditLog", back_populates="ticket", cascade="all, delete-orphan")
+    embedding = relationship("TicketEmbedding", back_populates="ticket", uselist=False, cascade="all, delete-orphan")
+    
+    # Composite indexes for list_tickets: filter column + created_at sort in one index
+    # (keep in sync with alembic/versions)
+    __table_args__ = (
+        Index("ix_tickets_status_created_at", "status", "created_at"),
+        Index("ix_tickets_submitter_email_created_at", "submitter_email", "created_at"),
+        Index("ix_tickets_predicted_queue_created_at", "predicted_queue", "created_at"),
+        Index("ix_tickets_is_critical_created_at", "is_critical", "created_at"),
+        Index(
+            "ix_tickets_pending_approval_created_at", "created_at",
+            sqlite_where=text("status = 'PENDING_APPROVAL'"),
+            postgresql_where=text("status = 'PENDING_APPROVAL'")
+        ),
+    )
 
 
 class Response(Base):
@@ -131,3 +154,55 @@ class AuditLog(Base):
     
     # Relationships
     ticket = relationship("Ticket", back_populates="audit_logs")
+
+
+class ChangeCounter(Base):
+    """Monotonic change counters (bumped on every write to the tracked tables)"""
+    __tablename__ = "change_counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+
+class TicketEvent(Base):
+    """Ticket lifecycle event (outbox relayed to WebSocket/SSE subscribers)"""
+    __tablename__ = "ticket_events"
+
+    id = Column(Integer, primary_key=True)
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), nullable=False, index=True)
+    
+    # Event details (denormalized so subscribers can filter without a join)
+    event_type = Column(String(50), nullable=False)
+    status = Column(String(50), nullable=False)
+    predicted_queue = Column(String(100), nullable=True)
+    submitter_email = Column(String(200), nullable=True)
+    is_critical = Column(Boolean, default=False)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    
+    # Relationships (lets events be recorded before the ticket has an id)
+    ticket = relationship("Ticket")
+
+
+class TicketEmbedding(Base):
+    """Embedding computed at triage, stored as float16 bytes for reuse without re-encoding"""
+    __tablename__ = "ticket_embeddings"
+
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), primary_key=True)
+    
+    # Embedding model that produced the vector (vectors of other models are not comparable)
+    model_version = Column(String(200), nullable=False)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)
+    
+    # Metadata
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    ticket = relationship("Ticket", back_populates="embedding")
+    
+    # Bulk reads select one model version in ticket id order
+    __table_args__ = (
+        Index("ix_ticket_embeddings_model_version_ticket_id", "model_version", "ticket_id"),
+    )
@@ -0,0 +1,107 @@
+"""
+Shared query builders for ticket endpoints.
+Kept separate from the API so query plans can be checked without loading ML models.
+"""
+from sqlalchemy import select, desc, func, tuple_
+from sqlalchemy.sql import Select
+from typing import Optional, Tuple, List
+from datetime import datetime
+import base64
+import json
+
+from backend.models import Ticket, TicketStatus
+
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    """
+    Encode the position of the last ticket on a page as an opaque cursor.
+
+    Args:
+        created_at: created_at of the last ticket returned
+        ticket_id: id of the last ticket returned (tiebreaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"c": created_at.isoformat(), "i": ticket_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), int(payload["i"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def ticket_summary_columns(body_chars: int) -> List:
+    """
+    Columns for the compact list view. The body is truncated in SQL so
+    the full text never leaves the database.
+
+    Args:
+        body_chars: Maximum characters of body_preview
+    """
+    return [
+        Ticket.id,
+        Ticket.subject,
+        func.substr(Ticket.body, 1, body_chars).label("body_preview"),
+        Ticket.submitter_email,
+        Ticket.predicted_queue,
+        Ticket.critical_prob,
+        Ticket.is_critical,
+        Ticket.status,
+        Ticket.created_at
+    ]
+
+
+def ticket_list_query(
+    status: Optional[TicketStatus] = None,
+    queue: Optional[str] = None,
+    is_critical: Optional[bool] = None,
+    submitter_email: Optional[str] = None,
+    cursor: Optional[str] = None,
+    columns: Optional[List] = None
+) -> Select:
+    """
+    Build the filtered, newest-first ticket listing query.
+
+    Each filter matches a composite (column, created_at) index, so the
+    database can filter and sort with a single index scan. Pages are
+    keyset-paginated on (created_at, id): a cursor seeks directly to the
+    next row instead of skipping over an offset.
+
+    Pass columns to select only part of each row (rows instead of
+    Ticket objects); include Ticket.id and Ticket.created_at to build
+    the next cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = select(*columns) if columns else select(Ticket)
+    
+    # Apply filters
+    if status:
+        query = query.where(Ticket.status == status)
+    if queue:
+        query = query.where(Ticket.predicted_queue == queue)
+    if is_critical is not None:
+        query = query.where(Ticket.is_critical == is_critical)
+    if submitter_email:
+        query = query.where(Ticket.submitter_email == submitter_email)
+    
+    # Resume after the last row of the previous page
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) < tuple_(created_at, ticket_id))
+    
+    # Order by created_at desc, id desc (stable for equal timestamps)
+    return query.order_by(desc(Ticket.created_at), desc(Ticket.id))
@@ -35,11 +35,52 @@ class TicketResponse(BaseModel):
     updated_at: datetime
     triaged_at: Optional[datetime]
     sent_at: Optional[datetime]
+    parent_id: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class TicketSummary(BaseModel):
+    """Compact ticket list row (body truncated server-side)"""
+    id: int
+    subject: str
+    body_preview: str
+    submitter_email: str
+    predicted_queue: Optional[str]
+    critical_prob: Optional[float]
+    is_critical: bool
+    status: TicketStatus
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TicketPage(BaseModel):
+    """One page of tickets with a cursor to the next page"""
+    items: List[TicketResponse]
+    next_cursor: Optional[str] = None
+
+
+class TicketSummaryPage(BaseModel):
+    """One page of compact tickets with a cursor to the next page"""
+    items: List[TicketSummary]
+    next_cursor: Optional[str] = None
+
+
+class TicketSearchHit(BaseModel):
+    """Full-text search result (best match first)"""
+    id: int
+    subject: str
+    status: TicketStatus
+    predicted_queue: Optional[str]
+    is_critical: bool
+    created_at: datetime
+    score: float
+    snippet: str
+
+
 class TicketDetail(TicketResponse):
     """Ticket with responses and approvals"""
     responses: List["ResponseDetail"] = []
@@ -125,6 +166,27 @@ class PendingApprovalItem(BaseModel):
     created_at: datetime
     draft_subject: Optional[str]
     draft_body: Optional[str]
+    duplicate_count: int = 0
+
+
+class IncidentTicket(BaseModel):
+    """Representative ticket of an incident"""
+    ticket_id: int
+    subject: str
+    similarity: float
+
+
+class ActiveIncident(BaseModel):
+    """Cluster of similar tickets within the sliding window"""
+    incident_id: int
+    size: int
+    growth_per_hour: float
+    growth_ratio: Optional[float]
+    dominant_queue: str
+    dominant_queue_share: float
+    first_seen: datetime
+    last_seen: datetime
+    representative_tickets: List[IncidentTicket]
 
 
 # Triage Schemas
@@ -143,4 +205,6 @@ class TriageResponse(BaseModel):
     is_critical: bool
     predicted_language: Optional[str] = None
     draft_generated: bool
+    draft_scheduled: bool = False
     needs_approval: bool
+    parent_id: Optional[int] = None
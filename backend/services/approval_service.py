@@ -1,15 +1,31 @@
 """
 Approval workflow service for human-in-the-loop.
 """
+from concurrent.futures import ThreadPoolExecutor
 from sqlalchemy.orm import Session
 from backend.models import Ticket, Response, Approval, ApprovalDecision, TicketStatus, AuditLog
 from backend.services.notification_service import get_notification_service
+from backend.events import record_event
+from backend.ml.dedup import same_submitter
+from backend.db import SessionLocal
 from datetime import datetime
+from typing import List
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Sends the emails of approved duplicates off the request path
+_email_executor = None
+
+
+def get_email_executor() -> ThreadPoolExecutor:
+    """Single background thread for duplicate fan-out emails (created on first use)"""
+    global _email_executor
+    if _email_executor is None:
+        _email_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="notify")
+    return _email_executor
+
 
 class ApprovalService:
     """
@@ -77,6 +93,7 @@ class ApprovalService:
         
         # Update ticket status
         ticket.status = TicketStatus.APPROVED
+        record_event(db, ticket, "ticket.approved")
         
         # Log action
         self._log_action(db, ticket_id, "APPROVED", approver_email, {
@@ -84,6 +101,14 @@ class ApprovalService:
             "edited": bool(edited_subject or edited_body)
         })
         
+        # One approval covers the near-duplicates filed by the same submitter
+        duplicate_ids = self._approve_duplicates(
+            ticket, final_subject, final_body, approver_name, approver_email, decision, db
+        )
+        
+        # Approvals are committed before any customer is emailed
+        db.commit()
+        
         # Send email
         send_result = self.notification_service.send_response_email(
             to_email=ticket.submitter_email,
@@ -92,26 +117,117 @@ class ApprovalService:
             body=final_body,
             ticket_id=ticket_id
         )
+        self._record_send(db, ticket, send_result)
+        db.commit()
+        db.refresh(ticket)
+        
+        if duplicate_ids:
+            get_email_executor().submit(self._send_duplicate_emails, duplicate_ids, final_subject, final_body)
         
+        return {
+            "success": True,
+            "ticket_id": ticket_id,
+            "status": ticket.status,
+            "email_sent": send_result["success"],
+            "duplicates_approved": len(duplicate_ids)
+        }
+    
+    def _record_send(self, db: Session, ticket: Ticket, send_result: dict):
+        """Mark an approved ticket SENT, or log the failed send (it stays APPROVED)"""
         if send_result["success"]:
             ticket.status = TicketStatus.SENT
             ticket.sent_at = datetime.utcnow()
-            self._log_action(db, ticket_id, "EMAIL_SENT", "system", {
+            record_event(db, ticket, "ticket.sent")
+            self._log_action(db, ticket.id, "EMAIL_SENT", "system", {
                 "to": ticket.submitter_email
             })
             logger.info(f"  ✓ Email sent to {ticket.submitter_email}")
         else:
-            logger.warning(f"  ! Email sending failed: {send_result.get('error')}")
+            self._log_action(db, ticket.id, "EMAIL_FAILED", "system", {
+                "to": ticket.submitter_email,
+                "error": send_result.get("error")
+            })
+            logger.warning(f"  ! Email sending failed for ticket {ticket.id}: {send_result.get('error')}")
+    
+    def _send_duplicate_emails(self, duplicate_ids: List[int], final_subject: str, final_body: str):
+        """
+        Email the submitters of approved duplicates (runs on the notification
+        thread); each ticket's SENT or EMAIL_FAILED outcome is committed on its own.
+        """
+        db = SessionLocal()
+        try:
+            for duplicate_id in duplicate_ids:
+                duplicate = db.query(Ticket).filter(Ticket.id == duplicate_id).first()
+                if duplicate is None or duplicate.status != TicketStatus.APPROVED:
+                    continue
+                try:
+                    send_result = self.notification_service.send_response_email(
+                        to_email=duplicate.submitter_email,
+                        to_name=duplicate.submitter_name,
+                        subject=final_subject,
+                        body=final_body,
+                        ticket_id=duplicate.id
+                    )
+                    self._record_send(db, duplicate, send_result)
+                    db.commit()
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"  ✗ Duplicate email failed for ticket {duplicate_id}: {e}")
+        finally:
+            db.close()
+    
+    def _approve_duplicates(
+        self,
+        parent: Ticket,
+        final_subject: str,
+        final_body: str,
+        approver_name: str,
+        approver_email: str,
+        decision: ApprovalDecision,
+        db: Session
+    ) -> List[int]:
+        """
+        Approve the parent's final response for its open duplicates from the
+        same submitter; their emails are sent after the commit
+        (_send_duplicate_emails). Duplicates from other customers keep their
+        own draft and are approved one by one.
         
-        db.commit()
-        db.refresh(ticket)
+        Returns:
+            IDs of the duplicates approved
+        """
+        duplicates = db.query(Ticket).filter(
+            Ticket.parent_id == parent.id,
+            Ticket.status.in_([TicketStatus.TRIAGED, TicketStatus.DRAFTED, TicketStatus.PENDING_APPROVAL])
+        ).all()
+        duplicates = [duplicate for duplicate in duplicates if same_submitter(duplicate, parent)]
         
-        return {
-            "success": True,
-            "ticket_id": ticket_id,
-            "status": ticket.status,
-            "email_sent": send_result["success"]
-        }
+        for duplicate in duplicates:
+            response = duplicate.responses[0] if duplicate.responses else None
+            if response is None:
+                # Triaged before the parent had a draft
+                response = Response(ticket_id=duplicate.id)
+                db.add(response)
+            response.final_subject = final_subject
+            response.final_body = final_body
+            response.approved_at = datetime.utcnow()
+            
+            db.add(Approval(
+                ticket_id=duplicate.id,
+                approver_name=approver_name,
+                approver_email=approver_email,
+                decision=decision,
+                decision_notes=f"Covered by approval of ticket #{parent.id}"
+            ))
+            duplicate.status = TicketStatus.APPROVED
+            record_event(db, duplicate, "ticket.approved")
+            self._log_action(db, duplicate.id, "APPROVED", approver_email, {
+                "decision": decision.value,
+                "parent_id": parent.id
+            })
+        
+        if duplicates:
+            logger.info(f"  ✓ Approval applied to {len(duplicates)} duplicate(s), emails queued")
+        return [duplicate.id for duplicate in duplicates]
     
     def reject_ticket(
         self,
@@ -152,6 +268,7 @@ class ApprovalService:
         
         # Update ticket status
         ticket.status = TicketStatus.REJECTED
+        record_event(db, ticket, "ticket.rejected")
         
         # Log action
         self._log_action(db, ticket_id, "REJECTED", approver_email, {
@@ -0,0 +1,316 @@
+"""
+Priority scheduling of Gemini drafting.
+
+Triage runs local classification immediately; the expensive drafting step is
+queued here and served by a small pool of worker threads (the Gemini
+concurrency). Dispatch order:
+
+1. Priority class by critical_prob: critical, elevated, routine
+2. Starvation protection: a job is promoted one class for every
+   DRAFT_AGING_S it waits, so routine tickets are eventually served
+3. Per-queue fairness: within a class, departments take turns (the one
+   served least recently goes first), then highest critical_prob, then oldest
+"""
+from typing import Any, Callable, Dict, List, Optional
+import heapq
+import itertools
+import os
+import threading
+import time
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Scheduler settings
+DRAFT_WORKERS = int(os.getenv("DRAFT_WORKERS", "2"))
+DRAFT_CRITICAL_PROB = float(os.getenv("DRAFT_CRITICAL_PROB", "0.5"))
+DRAFT_ELEVATED_PROB = float(os.getenv("DRAFT_ELEVATED_PROB", "0.25"))
+DRAFT_AGING_S = float(os.getenv("DRAFT_AGING_S", "120"))
+DRAFT_MAX_QUEUED = int(os.getenv("DRAFT_MAX_QUEUED", "10000"))
+
+PRIORITY_CLASSES = ["critical", "elevated", "routine"]
+
+# Completed waits kept per class for percentiles
+WAIT_SAMPLES = 1000
+
+
+class DraftJob:
+    """A ticket waiting for its draft"""
+
+    def __init__(self, ticket_id: int, critical_prob: float, queue: Optional[str], payload: Any = None):
+        self.ticket_id = ticket_id
+        self.critical_prob = critical_prob or 0.0
+        self.queue = queue or "unknown"
+        self.payload = payload
+        self.priority_class = priority_class(self.critical_prob)
+        self.enqueued_at = time.monotonic()
+        # Set by the scheduler: current (aged) class rank and queue order
+        self.rank = PRIORITY_CLASSES.index(self.priority_class)
+        self.seq = 0
+
+    def effective_rank(self, now: float, aging_s: float) -> int:
+        """Class rank (0 = critical) after promotion for time spent waiting"""
+        rank = PRIORITY_CLASSES.index(self.priority_class)
+        if aging_s > 0:
+            rank -= int((now - self.enqueued_at) // aging_s)
+        return max(0, rank)
+
+
+def priority_class(critical_prob: float) -> str:
+    """Priority class of a ticket by its predicted critical probability"""
+    if critical_prob >= DRAFT_CRITICAL_PROB:
+        return "critical"
+    if critical_prob >= DRAFT_ELEVATED_PROB:
+        return "elevated"
+    return "routine"
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class DraftScheduler:
+    """
+    Priority queue of draft jobs with a worker pool.
+
+    Queued jobs sit in one heap per (aged class rank, department), ordered
+    by (-critical_prob, enqueued_at). Promotions are applied lazily from a
+    heap of due times; the superseded heap entries are skipped when they
+    surface. A dispatch costs O(log n) plus a pass over the departments.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[DraftJob], None],
+        workers: int = DRAFT_WORKERS,
+        aging_s: float = DRAFT_AGING_S,
+        max_queued: int = DRAFT_MAX_QUEUED
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            handler: Called with each dispatched job on a worker thread
+            workers: Concurrent drafting calls
+            aging_s: Wait after which a job is promoted one priority class
+            max_queued: Reject new jobs beyond this queue depth
+        """
+        self.handler = handler
+        self.workers = workers
+        self.aging_s = aging_s
+        self.max_queued = max_queued
+
+        self._jobs: Dict[int, DraftJob] = {}
+        self._ranked: List[Dict[str, list]] = [{} for _ in PRIORITY_CLASSES]
+        self._promotions: list = []  # (due time, seq, job)
+        self._seq = itertools.count()
+        self._superseded = 0
+        self._last_served: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        self._active = 0
+
+        self._waits: Dict[str, List[float]] = {c: [] for c in PRIORITY_CLASSES}
+        self._stats = {c: {"submitted": 0, "dispatched": 0, "promoted": 0} for c in PRIORITY_CLASSES}
+        self._stats_total = {"completed": 0, "failed": 0, "rejected": 0}
+
+    def start(self):
+        """Start the worker threads (workers=0 keeps drafting inline)"""
+        if self.workers <= 0:
+            return
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"draft-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"✓ Draft scheduler started ({self.workers} workers)")
+
+    def stop(self, timeout: float = 5.0):
+        """Stop dispatching; running drafts finish, queued jobs stay queued"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def full(self) -> bool:
+        return len(self._jobs) >= self.max_queued
+
+    def submit(self, job: DraftJob) -> bool:
+        """
+        Queue a draft job (a ticket already queued keeps its place).
+
+        Returns:
+            False if the queue is full
+        """
+        with self._cond:
+            if job.ticket_id in self._jobs:
+                return True
+            if len(self._jobs) >= self.max_queued:
+                self._stats_total["rejected"] += 1
+                return False
+            self._jobs[job.ticket_id] = job
+            job.seq = next(self._seq)
+            job.rank = job.effective_rank(time.monotonic(), self.aging_s)
+            self._push(job)
+            self._stats[job.priority_class]["submitted"] += 1
+            self._cond.notify()
+        return True
+
+    def _push(self, job: DraftJob):
+        """File a job under its current rank and schedule its next promotion"""
+        heap = self._ranked[job.rank].setdefault(job.queue, [])
+        heapq.heappush(heap, (-job.critical_prob, job.enqueued_at, job.seq, job))
+        if job.rank > 0 and self.aging_s > 0:
+            base = PRIORITY_CLASSES.index(job.priority_class)
+            due = job.enqueued_at + (base - job.rank + 1) * self.aging_s
+            heapq.heappush(self._promotions, (due, job.seq, job))
+
+    def _is_queued(self, job: DraftJob, rank: int) -> bool:
+        return self._jobs.get(job.ticket_id) is job and job.rank == rank
+
+    def _promote(self, now: float):
+        """Move every job whose wait crossed an aging step up one class"""
+        while self._promotions and self._promotions[0][0] <= now:
+            _, _, job = heapq.heappop(self._promotions)
+            if self._jobs.get(job.ticket_id) is not job:
+                continue
+            job.rank -= 1
+            self._push(job)
+            self._superseded += 1
+        # Lower classes may not surface for a long time under load
+        if self._superseded > len(self._jobs) + 1000:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Refile queued jobs, dropping the entries left behind by promotions"""
+        self._ranked = [{} for _ in PRIORITY_CLASSES]
+        for job in self._jobs.values():
+            self._ranked[job.rank].setdefault(job.queue, []).append(
+                (-job.critical_prob, job.enqueued_at, job.seq, job)
+            )
+        for by_queue in self._ranked:
+            for heap in by_queue.values():
+                heapq.heapify(heap)
+        self._superseded = 0
+
+    def _next_job(self) -> Optional[DraftJob]:
+        """Remove and return the job to dispatch next (caller holds the lock)"""
+        if not self._jobs:
+            return None
+        now = time.monotonic()
+        self._promote(now)
+
+        for top_rank, by_queue in enumerate(self._ranked):
+            for queue, heap in list(by_queue.items()):
+                while heap and not self._is_queued(heap[0][-1], top_rank):
+                    heapq.heappop(heap)
+                if not heap:
+                    del by_queue[queue]
+            if by_queue:
+                break
+        else:
+            return None
+
+        # Departments take turns within the class
+        queue = min(by_queue, key=lambda q: self._last_served.get(q, 0.0))
+        job = heapq.heappop(by_queue[queue])[-1]
+        if not by_queue[queue]:
+            del by_queue[queue]
+
+        del self._jobs[job.ticket_id]
+        self._last_served[queue] = now
+        if top_rank < PRIORITY_CLASSES.index(job.priority_class):
+            self._stats[job.priority_class]["promoted"] += 1
+        self._stats[job.priority_class]["dispatched"] += 1
+        waits = self._waits[job.priority_class]
+        waits.append(now - job.enqueued_at)
+        if len(waits) > WAIT_SAMPLES:
+            del waits[0]
+        return job
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while self._running and not self._jobs:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                job = self._next_job()
+                self._active += 1
+
+            outcome = "failed"
+            try:
+                self.handler(job)
+                outcome = "completed"
+            except Exception as e:
+                logger.error(f"  ✗ Draft failed for ticket {job.ticket_id}: {e}")
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    self._stats_total[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and wait times per priority class"""
+        now = time.monotonic()
+        with self._cond:
+            classes = {}
+            for name in PRIORITY_CLASSES:
+                queued = [j for j in self._jobs.values() if j.priority_class == name]
+                waits = self._waits[name]
+                classes[name] = {
+                    **self._stats[name],
+                    "queued": len(queued),
+                    "oldest_wait_s": round(max((now - j.enqueued_at for j in queued), default=0.0), 3),
+                    "wait_p50_s": round(_percentile(waits, 0.50), 3),
+                    "wait_p95_s": round(_percentile(waits, 0.95), 3),
+                    "wait_max_s": round(max(waits, default=0.0), 3)
+                }
+            by_queue: Dict[str, int] = {}
+            for job in self._jobs.values():
+                by_queue[job.queue] = by_queue.get(job.queue, 0) + 1
+
+            return {
+                "running": self._running,
+                "workers": self.workers,
+                "active": self._active,
+                "queued": len(self._jobs),
+                **self._stats_total,
+                "classes": classes,
+                "queued_by_queue": by_queue
+            }
+
+
+# Global scheduler instance
+_scheduler = None
+
+
+def get_draft_scheduler() -> DraftScheduler:
+    """
+    Get global draft scheduler instance (singleton pattern).
+
+    Returns:
+        DraftScheduler instance
+    """
+    global _scheduler
+    if _scheduler is None:
+        from backend.services.triage_service import get_triage_service
+        # Resolve the service on first job: starting the workers must not load models
+        _scheduler = DraftScheduler(handler=lambda job: get_triage_service().run_draft_job(job))
+    return _scheduler
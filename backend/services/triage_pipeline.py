@@ -0,0 +1,277 @@
+"""
+Staged triage pipeline with separately sized worker pools.
+
+    NEW --classify--> TRIAGED --draft--> DRAFTED / PENDING_APPROVAL
+
+Stage 1 (classification + retrieval) is local, CPU-bound inference on a
+thread pool of CLASSIFY_WORKERS; it commits the routing result as soon as
+it is known. Stage 2 (Gemini drafting) is I/O-bound and runs on the
+priority draft scheduler with DRAFT_WORKERS. Each stage commits its own
+status transition, so a slow LLM never hides routing results.
+
+Every worker process runs its own pipeline and resumes unfinished tickets
+at startup, so a stage first claims its ticket: a conditional UPDATE sets a
+lease (claimed_until) only if the ticket is still in the expected status
+and not leased by another worker. A ticket whose worker died is resumed
+once its lease expires.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from sqlalchemy import select, exists, or_
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+import os
+import threading
+import time
+import logging
+from dotenv import load_dotenv
+
+from backend.db import SessionLocal
+from backend.models import Ticket, Response, AuditLog, TicketStatus
+from backend.services.draft_scheduler import DraftJob, get_draft_scheduler
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Stage settings
+CLASSIFY_WORKERS = int(os.getenv("CLASSIFY_WORKERS", "2"))
+TRIAGE_ON_CREATE = os.getenv("TRIAGE_ON_CREATE", "false").lower() == "true"
+CLAIM_LEASE_S = float(os.getenv("CLAIM_LEASE_S", "300"))  # longest expected classification or draft
+
+# Completed classifications kept for latency percentiles
+LATENCY_SAMPLES = 1000
+
+
+def claim_ticket(db: Session, ticket_id: int, status: TicketStatus, lease_s: float = CLAIM_LEASE_S) -> bool:
+    """
+    Lease a ticket for one pipeline stage (committed immediately).
+
+    Args:
+        db: Database session (must not hold other pending changes)
+        ticket_id: Ticket ID
+        status: Status the stage starts from
+        lease_s: Seconds before another worker may take the ticket over
+
+    Returns:
+        True if this worker now owns the ticket
+    """
+    now = datetime.utcnow()
+    claimed = db.query(Ticket).filter(
+        Ticket.id == ticket_id,
+        Ticket.status == status,
+        or_(Ticket.claimed_until.is_(None), Ticket.claimed_until < now)
+    ).update(
+        {"claimed_until": now + timedelta(seconds=lease_s), "updated_at": Ticket.updated_at},
+        synchronize_session=False
+    )
+    db.commit()
+    return claimed == 1
+
+
+def release_ticket(db: Session, ticket_id: int):
+    """Drop a ticket's lease after its stage failed (successful stages clear it with their commit)"""
+    db.rollback()
+    db.query(Ticket).filter(Ticket.id == ticket_id, Ticket.claimed_until.isnot(None)).update(
+        {"claimed_until": None, "updated_at": Ticket.updated_at},
+        synchronize_session=False
+    )
+    db.commit()
+
+
+class TriagePipeline:
+    """
+    Runs the classification stage on its own pool and hands drafting to
+    the draft scheduler.
+    """
+
+    def __init__(self, classify_workers: int = CLASSIFY_WORKERS, triage_on_create: bool = TRIAGE_ON_CREATE):
+        """
+        Initialize the pipeline.
+
+        Args:
+            classify_workers: Concurrent classifications (CPU-bound)
+            triage_on_create: Classify new tickets without waiting for POST /triage
+        """
+        self.classify_workers = max(1, classify_workers)
+        self.triage_on_create = triage_on_create
+        self.scheduler = get_draft_scheduler()
+
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._latencies: List[float] = []
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "skipped": 0, "recovered": 0}
+        self._recovery_timer: Optional[threading.Timer] = None
+
+    def start(self):
+        """Start both stages and resume work interrupted by a restart"""
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.classify_workers,
+            thread_name_prefix="classify"
+        )
+        self.scheduler.start()
+        logger.info(f"✓ Triage pipeline started ({self.classify_workers} classify workers)")
+        self.recover()
+
+    def stop(self):
+        if self._executor is None:
+            return
+        if self._recovery_timer is not None:
+            self._recovery_timer.cancel()
+            self._recovery_timer = None
+        self.scheduler.stop()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def submit(self, ticket_id: int, run_draft: bool = True, claim: bool = False) -> Future:
+        """
+        Queue a ticket for classification (and drafting, if run_draft).
+
+        Args:
+            ticket_id: Ticket ID
+            run_draft: Queue drafting after classification
+            claim: Classify only if this worker can claim the ticket while NEW
+                   (automatic triage, which other workers may also attempt)
+
+        Returns:
+            Future resolving to the TriageService.triage_ticket result
+            (None if the ticket was claimed elsewhere)
+        """
+        if self._executor is None:
+            raise RuntimeError("Triage pipeline is not running")
+        with self._lock:
+            self._queued += 1
+            self._stats["submitted"] += 1
+        return self._executor.submit(self._classify, ticket_id, run_draft, claim)
+
+    def _classify(self, ticket_id: int, run_draft: bool, claim: bool) -> Optional[Dict[str, Any]]:
+        from backend.services.triage_service import get_triage_service
+
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        start = time.perf_counter()
+        db = SessionLocal()
+        claimed = False
+        try:
+            if claim:
+                claimed = claim_ticket(db, ticket_id, TicketStatus.NEW)
+                if not claimed:
+                    outcome = "skipped"
+                    return None
+            # triage_ticket clears the lease with its commit
+            result = get_triage_service().triage_ticket(ticket_id, db, run_draft=run_draft)
+            outcome = "completed"
+            return result
+        except Exception:
+            outcome = "failed"
+            if claimed:
+                release_ticket(db, ticket_id)
+            raise
+        finally:
+            db.close()
+            with self._lock:
+                self._active -= 1
+                self._stats[outcome] += 1
+                self._latencies.append(time.perf_counter() - start)
+                if len(self._latencies) > LATENCY_SAMPLES:
+                    del self._latencies[0]
+
+    def recover(self, ticket_ids: Optional[List[int]] = None):
+        """
+        Re-queue tickets whose stage did not finish before the last shutdown:
+        TRIAGED tickets with a queued draft and no response, and (with
+        triage_on_create) NEW tickets. Each job claims its ticket before
+        running, so workers recovering at the same time do not both run it.
+        Tickets leased by another worker are checked again when the lease expires.
+
+        Args:
+            ticket_ids: Only consider these tickets (lease re-checks)
+        """
+        self._recovery_timer = None
+        if self._executor is None:
+            return
+        now = datetime.utcnow()
+        draft_queued = exists().where(
+            AuditLog.ticket_id == Ticket.id,
+            AuditLog.action == "DRAFT_QUEUED"
+        )
+        has_response = exists().where(Response.ticket_id == Ticket.id)
+        pending = (Ticket.status == TicketStatus.TRIAGED) & draft_queued & ~has_response
+        if self.triage_on_create:
+            pending = pending | (Ticket.status == TicketStatus.NEW)
+        if ticket_ids is not None:
+            pending = pending & Ticket.id.in_(ticket_ids)
+
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(Ticket.id, Ticket.status, Ticket.critical_prob, Ticket.predicted_queue, Ticket.claimed_until)
+                .where(pending)
+                .order_by(Ticket.id)
+            ).all()
+        finally:
+            db.close()
+
+        leased = [row for row in rows if row.claimed_until is not None and row.claimed_until >= now]
+        unleased = [row for row in rows if row.claimed_until is None or row.claimed_until < now]
+        pending_drafts = [row for row in unleased if row.status == TicketStatus.TRIAGED]
+        new_ids = [row.id for row in unleased if row.status == TicketStatus.NEW]
+
+        # Retrieval is redone by the draft stage (payload=None)
+        for row in pending_drafts:
+            self.scheduler.submit(DraftJob(row.id, row.critical_prob, row.predicted_queue))
+        for ticket_id in new_ids:
+            self.submit(ticket_id, claim=True)
+
+        if leased:
+            delay = (max(row.claimed_until for row in leased) - now).total_seconds() + 1
+            self._recovery_timer = threading.Timer(delay, self.recover, args=([row.id for row in leased],))
+            self._recovery_timer.daemon = True
+            self._recovery_timer.start()
+
+        recovered = len(pending_drafts) + len(new_ids)
+        with self._lock:
+            self._stats["recovered"] += recovered
+        if recovered:
+            logger.info(f"  ✓ Resumed {len(new_ids)} classifications and {len(pending_drafts)} drafts")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-stage queue depth, concurrency and latency"""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            classify = {
+                **self._stats,
+                "workers": self.classify_workers,
+                "queued": self._queued,
+                "active": self._active,
+                "latency_p50_ms": round(latencies[len(latencies) // 2] * 1000, 1) if latencies else 0.0,
+                "latency_p95_ms": round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else 0.0
+            }
+        return {
+            "running": self._executor is not None,
+            "triage_on_create": self.triage_on_create,
+            "classify": classify,
+            "draft": self.scheduler.get_stats()
+        }
+
+
+# Global pipeline instance
+_pipeline = None
+
+
+def get_triage_pipeline() -> TriagePipeline:
+    """
+    Get global triage pipeline instance (singleton pattern).
+
+    Returns:
+        TriagePipeline instance
+    """
+    global _pipeline
+    if _pipeline is None:
+        _pipeline = TriagePipeline()
+    return _pipeline
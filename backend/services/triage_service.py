@@ -6,10 +6,17 @@ from backend.models import Ticket, Response, TicketStatus, AuditLog
 from backend.ml.predictors import get_predictor
 from backend.ml.retrieval import get_retriever
 from backend.gemini.generate_reply import get_generator
+from backend.events import record_event, status_event_type
+from backend.db import SessionLocal
+from backend.ml.incidents import get_incident_tracker
+from backend.ml.dedup import same_submitter
+from backend.embedding_store import get_ticket_embedding, save_ticket_embedding
+from backend.services.draft_scheduler import DraftJob, get_draft_scheduler, priority_class
+from backend.services.triage_pipeline import claim_ticket, release_ticket
 from datetime import datetime
 import json
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +26,7 @@ class TriageService:
     Orchestrates the full triage workflow:
     1. ML prediction (department + criticality)
     2. Retrieval (find similar tickets)
-    3. Gemini drafting (generate response)
+    3. Gemini drafting (generate response, scheduled by priority)
     4. Apply business rules
     """
     
@@ -37,6 +44,10 @@ class TriageService:
         """
         Run full triage on a ticket.
         
+        Local classification and retrieval run immediately. When the draft
+        scheduler is running, the ticket is committed as TRIAGED and drafting
+        is queued by priority; otherwise the draft is generated inline.
+        
         Args:
             ticket_id: Ticket ID
             db: Database session
@@ -51,10 +62,228 @@ class TriageService:
             raise ValueError(f"Ticket {ticket_id} not found")
         
         logger.info(f"Starting triage for ticket {ticket_id}")
+        ticket.claimed_until = None  # classification lease ends with this triage's commit
+        
+        # Near-duplicates reuse their parent's results instead of running the models
+        parent = ticket.parent
+        if parent is not None and parent.predicted_queue is not None and parent.status != TicketStatus.REJECTED:
+            return self._triage_duplicate(ticket, parent, db)
+        
+        # Steps 1-2: ML prediction and retrieval
+        similar_tickets = self._classify(ticket, db)
+        
+        # Step 3: Generate draft reply (if requested)
+        draft_generated = False
+        draft_scheduled = False
+        needs_approval = ticket.is_critical  # Default: critical needs approval
+        
+        scheduler = get_draft_scheduler()
+        if run_draft and scheduler.running and not scheduler.full:
+            draft_scheduled = True
+            # Persisted so a restart can resume the draft stage
+            self._log_action(db, ticket_id, "DRAFT_QUEUED", "system", {
+                "priority_class": priority_class(ticket.critical_prob or 0.0)
+            })
+        elif run_draft:
+            draft_generated, needs_approval = self._draft(ticket, db, similar_tickets)
+        
+        # Publish lifecycle events with the commit
+        record_event(db, ticket, "ticket.triaged")
+        if ticket.status != TicketStatus.TRIAGED:
+            record_event(db, ticket, status_event_type(ticket.status))
+        
+        # Commit changes
+        db.commit()
+        db.refresh(ticket)
+        
+        if draft_generated:
+            self._propagate_draft(ticket, db)
         
-        # Step 1: ML Prediction
+        # Queue drafting only once the TRIAGED state is visible to the workers
+        if draft_scheduled:
+            job = DraftJob(ticket_id, ticket.critical_prob, ticket.predicted_queue, payload=similar_tickets)
+            if not scheduler.submit(job):
+                logger.warning(f"  ! Draft queue full, drafting ticket {ticket_id} inline")
+                self.run_draft_job(job)
+                db.refresh(ticket)
+                draft_scheduled = False
+                draft_generated = bool(ticket.responses)
+                needs_approval = ticket.status == TicketStatus.PENDING_APPROVAL
+        
+        if draft_scheduled:
+            logger.info(f"✓ Triage complete for ticket {ticket_id} (draft queued)")
+        else:
+            logger.info(f"✓ Triage complete for ticket {ticket_id}")
+        
+        return {
+            "success": True,
+            "message": f"Ticket triaged successfully. Status: {ticket.status.value}",
+            "ticket_id": ticket_id,
+            "predicted_queue": ticket.predicted_queue,
+            "queue_confidence": ticket.queue_confidence,
+            "critical_prob": ticket.critical_prob,
+            "is_critical": ticket.is_critical,
+            "predicted_language": ticket.predicted_language,
+            "draft_generated": draft_generated,
+            "draft_scheduled": draft_scheduled,
+            "needs_approval": needs_approval,
+            "status": ticket.status,
+            "parent_id": None
+        }
+    
+    def _triage_duplicate(self, ticket: Ticket, parent: Ticket, db: Session) -> Dict[str, Any]:
+        """
+        Triage a near-duplicate by copying its parent's prediction and draft.
+        Without a parent draft yet, the ticket stays TRIAGED and receives the
+        draft when the parent's is generated. A draft copied across submitters
+        always needs its own approval.
+        """
+        ticket.predicted_queue = parent.predicted_queue
+        ticket.queue_confidence = parent.queue_confidence
+        ticket.critical_prob = parent.critical_prob
+        ticket.is_critical = parent.is_critical
+        ticket.predicted_language = parent.predicted_language
+        ticket.status = TicketStatus.TRIAGED
+        ticket.triaged_at = datetime.utcnow()
+        
+        self._log_action(db, ticket.id, "DUPLICATE_TRIAGE", "system", {"parent_id": parent.id})
+        record_event(db, ticket, "ticket.triaged")
+        db.commit()
+        get_incident_tracker().add_duplicate(parent.id, ticket.id, ticket.predicted_queue, ticket.subject)
+        
+        # Checked after the commit: a parent draft committed meanwhile is either
+        # seen here or finds this ticket TRIAGED in _propagate_draft
+        source = db.query(Response).filter(Response.ticket_id == parent.id).order_by(Response.id).first()
+        draft_generated = source is not None and self._copy_draft(source, parent, ticket, db)
+        if draft_generated:
+            db.commit()
+        db.refresh(ticket)
+        
+        logger.info(f"✓ Triage complete for ticket {ticket.id} (duplicate of #{parent.id})")
+        
+        return {
+            "success": True,
+            "message": f"Ticket triaged as duplicate of #{parent.id}. Status: {ticket.status.value}",
+            "ticket_id": ticket.id,
+            "predicted_queue": ticket.predicted_queue,
+            "queue_confidence": ticket.queue_confidence,
+            "critical_prob": ticket.critical_prob,
+            "is_critical": ticket.is_critical,
+            "predicted_language": ticket.predicted_language,
+            "draft_generated": draft_generated,
+            "draft_scheduled": False,
+            "needs_approval": ticket.status == TicketStatus.PENDING_APPROVAL if draft_generated else ticket.is_critical,
+            "status": ticket.status,
+            "parent_id": parent.id
+        }
+    
+    def _copy_draft(self, source: Response, parent: Ticket, ticket: Ticket, db: Session) -> bool:
+        """
+        Give a TRIAGED duplicate its own copy of the parent's draft.
+        
+        The parent's draft may quote its customer, so a duplicate from another
+        submitter goes to PENDING_APPROVAL for a per-ticket review.
+        
+        The status change is a conditional UPDATE, so when the duplicate's
+        triage and the parent's propagation race, only one of them copies.
+        
+        Returns:
+            True if this call copied the draft
+        """
+        needs_approval = source.needs_human_approval or not same_submitter(ticket, parent)
+        status = TicketStatus.PENDING_APPROVAL if needs_approval else TicketStatus.DRAFTED
+        claimed = db.query(Ticket).filter(
+            Ticket.id == ticket.id,
+            Ticket.status == TicketStatus.TRIAGED
+        ).update({"status": status}, synchronize_session=False)
+        if not claimed:
+            return False
+        
+        db.add(Response(
+            ticket_id=ticket.id,
+            draft_language=source.draft_language,
+            draft_subject=source.draft_subject,
+            draft_body=source.draft_body,
+            draft_confidence=source.draft_confidence,
+            needs_human_approval=needs_approval,
+            suggested_tags=source.suggested_tags,
+            retrieval_context=source.retrieval_context
+        ))
+        ticket.predicted_language = source.draft_language
+        ticket.status = status
+        record_event(db, ticket, status_event_type(status))
+        return True
+    
+    def _propagate_draft(self, parent: Ticket, db: Session):
+        """Copy a committed parent draft to its duplicates waiting in TRIAGED"""
+        source = db.query(Response).filter(Response.ticket_id == parent.id).order_by(Response.id).first()
+        if source is None:
+            return
+        waiting = db.query(Ticket).filter(
+            Ticket.parent_id == parent.id,
+            Ticket.status == TicketStatus.TRIAGED
+        ).all()
+        copied = sum(self._copy_draft(source, parent, duplicate, db) for duplicate in waiting)
+        db.commit()
+        if copied:
+            logger.info(f"  ✓ Draft shared with {copied} duplicate(s)")
+    
+    def run_draft_job(self, job: DraftJob):
+        """
+        Generate the draft for a ticket queued by triage_ticket
+        (runs on a draft scheduler worker thread).
+        
+        Args:
+            job: Draft job (payload holds the retrieved similar tickets)
+        """
+        db = SessionLocal()
+        claimed = False
+        try:
+            # Claimed before calling Gemini: another worker may have resumed the same ticket
+            claimed = claim_ticket(db, job.ticket_id, TicketStatus.TRIAGED)
+            if not claimed:
+                # Deleted, drafted elsewhere, re-triaged or handled by a manager meanwhile
+                return
+            ticket = db.query(Ticket).filter(Ticket.id == job.ticket_id).first()
+            
+            similar_tickets = job.payload
+            if similar_tickets is None:
+                # Resumed after a restart: the classification stage's retrieval is gone
+                similar_tickets = self._retrieve(ticket)
+            
+            self._draft(ticket, db, similar_tickets)
+            if ticket.status != TicketStatus.TRIAGED:
+                record_event(db, ticket, status_event_type(ticket.status))
+            ticket.claimed_until = None
+            db.commit()
+            claimed = False
+            logger.info(f"✓ Draft complete for ticket {job.ticket_id} ({job.priority_class})")
+            
+            self._propagate_draft(ticket, db)
+        except Exception:
+            if claimed:
+                release_ticket(db, job.ticket_id)
+            raise
+        finally:
+            db.close()
+    
+    def _classify(self, ticket: Ticket, db: Session) -> List[Dict[str, Any]]:
+        """
+        ML prediction and retrieval; sets the ticket's routing fields.
+        
+        Returns:
+            Similar resolved tickets (empty if retrieval failed)
+        """
+        ticket_id = ticket.id
+        prediction = None
+        
+        # Step 1: ML Prediction (re-triage reuses the embedding stored the first time)
         try:
-            prediction = self.predictor.predict_ticket(ticket.subject, ticket.body)
+            model_version = self.predictor.embedder.model_name
+            stored = get_ticket_embedding(db, ticket_id, model_version)
+            prediction = self.predictor.predict_ticket(ticket.subject, ticket.body, embedding=stored)
+            if stored is None:
+                save_ticket_embedding(db, ticket_id, prediction["full_embedding"], model_version)
             
             # Update ticket with predictions
             ticket.predicted_queue = prediction["predicted_queue"]
@@ -68,7 +297,8 @@ class TriageService:
             self._log_action(db, ticket_id, "ML_PREDICTION", "system", {
                 "queue": prediction["predicted_queue"],
                 "confidence": prediction["queue_confidence"],
-                "critical_prob": prediction["critical_prob"]
+                "critical_prob": prediction["critical_prob"],
+                "served_by": prediction.get("served_by", "active")
             })
             
             logger.info(f"  ✓ Predicted: {prediction['predicted_queue']} (conf={prediction['queue_confidence']:.2f}, crit={prediction['critical_prob']:.2f})")
@@ -82,96 +312,107 @@ class TriageService:
             ticket.is_critical = True  # Err on the side of caution
             ticket.status = TicketStatus.TRIAGED
         
+        # Live incident clustering reuses the prediction's embedding
+        if prediction is not None:
+            get_incident_tracker().add(ticket_id, prediction["embedding"], ticket.predicted_queue, ticket.subject)
+        
         # Step 2: Retrieval (find similar tickets)
         similar_tickets = []
         try:
             similar_tickets = self.retriever.search_by_embedding(
                 prediction["embedding"],
-                k=5
+                k=5,
+                query_text=f"{ticket.subject}\n\n{ticket.body}",
+                queue=ticket.predicted_queue,
+                language=ticket.predicted_language
             )
             logger.info(f"  ✓ Found {len(similar_tickets)} similar tickets")
         except Exception as e:
             logger.warning(f"  ! Retrieval failed: {e} (continuing without context)")
         
-        # Step 3: Generate draft reply (if requested)
+        return similar_tickets
+    
+    def _retrieve(self, ticket: Ticket) -> List[Dict[str, Any]]:
+        """Retrieval from the ticket text (when no embedding is at hand)"""
+        try:
+            return self.retriever.search(
+                f"{ticket.subject}\n\n{ticket.body}",
+                k=5,
+                queue=ticket.predicted_queue,
+                language=ticket.predicted_language
+            )
+        except Exception as e:
+            logger.warning(f"  ! Retrieval failed: {e} (continuing without context)")
+            return []
+    
+    def _draft(self, ticket: Ticket, db: Session, similar_tickets: List[Dict[str, Any]]) -> Tuple[bool, bool]:
+        """
+        Gemini drafting; adds the Response and moves the ticket to
+        DRAFTED or PENDING_APPROVAL.
+        
+        Returns:
+            (draft_generated, needs_approval)
+        """
+        ticket_id = ticket.id
         draft_generated = False
-        needs_approval = ticket.is_critical  # Default: critical needs approval
+        needs_approval = ticket.is_critical
         
-        if run_draft:
-            try:
-                draft_result = self.generator.generate_reply(
-                    subject=ticket.subject,
-                    body=ticket.body,
-                    predicted_queue=ticket.predicted_queue,
-                    is_critical=ticket.is_critical,
-                    similar_tickets=similar_tickets
+        try:
+            draft_result = self.generator.generate_reply(
+                subject=ticket.subject,
+                body=ticket.body,
+                predicted_queue=ticket.predicted_queue,
+                is_critical=ticket.is_critical,
+                similar_tickets=similar_tickets
+            )
+            
+            if draft_result.get("success", False):
+                # Create response record
+                response = Response(
+                    ticket_id=ticket_id,
+                    draft_language=draft_result.get("language"),
+                    draft_subject=draft_result.get("subject"),
+                    draft_body=draft_result.get("body"),
+                    draft_confidence=draft_result.get("confidence"),
+                    needs_human_approval=draft_result.get("needs_human_approval", True),
+                    suggested_tags=json.dumps(draft_result.get("suggested_tags", [])),
+                    retrieval_context=json.dumps([
+                        {"subject": t["subject"], "answer": t["answer"][:200]}
+                        for t in similar_tickets[:3]
+                    ]) if similar_tickets else None
                 )
+                db.add(response)
                 
-                if draft_result.get("success", False):
-                    # Create response record
-                    response = Response(
-                        ticket_id=ticket_id,
-                        draft_language=draft_result.get("language"),
-                        draft_subject=draft_result.get("subject"),
-                        draft_body=draft_result.get("body"),
-                        draft_confidence=draft_result.get("confidence"),
-                        needs_human_approval=draft_result.get("needs_human_approval", True),
-                        suggested_tags=json.dumps(draft_result.get("suggested_tags", [])),
-                        retrieval_context=json.dumps([
-                            {"subject": t["subject"], "answer": t["answer"][:200]}
-                            for t in similar_tickets[:3]
-                        ]) if similar_tickets else None
-                    )
-                    db.add(response)
-                    
-                    # Copy detected language to ticket for ML analysis display
-                    ticket.predicted_language = draft_result.get("language")
-                    
-                    needs_approval = draft_result.get("needs_human_approval", True)
-                    draft_generated = True
-                    
-                    # Update ticket status
-                    if needs_approval:
-                        ticket.status = TicketStatus.PENDING_APPROVAL
-                    else:
-                        ticket.status = TicketStatus.DRAFTED
-                    
-                    self._log_action(db, ticket_id, "DRAFT_GENERATED", "system", {
-                        "confidence": draft_result.get("confidence"),
-                        "needs_approval": needs_approval
-                    })
-                    
-                    logger.info(f"  ✓ Draft generated (conf={draft_result.get('confidence', 0):.2f}, approval={needs_approval})")
-                else:
-                    logger.warning(f"  ! Draft generation failed: {draft_result.get('error')}")
-                    # Route to human on failure
+                # Copy detected language to ticket for ML analysis display
+                ticket.predicted_language = draft_result.get("language")
+                
+                needs_approval = draft_result.get("needs_human_approval", True)
+                draft_generated = True
+                
+                # Update ticket status
+                if needs_approval:
                     ticket.status = TicketStatus.PENDING_APPROVAL
-                    needs_approval = True
-                    
-            except Exception as e:
-                logger.error(f"  ✗ Draft generation error: {e}")
+                else:
+                    ticket.status = TicketStatus.DRAFTED
+                
+                self._log_action(db, ticket_id, "DRAFT_GENERATED", "system", {
+                    "confidence": draft_result.get("confidence"),
+                    "needs_approval": needs_approval
+                })
+                
+                logger.info(f"  ✓ Draft generated (conf={draft_result.get('confidence', 0):.2f}, approval={needs_approval})")
+            else:
+                logger.warning(f"  ! Draft generation failed: {draft_result.get('error')}")
+                # Route to human on failure
                 ticket.status = TicketStatus.PENDING_APPROVAL
                 needs_approval = True
+                
+        except Exception as e:
+            logger.error(f"  ✗ Draft generation error: {e}")
+            ticket.status = TicketStatus.PENDING_APPROVAL
+            needs_approval = True
         
-        # Commit changes
-        db.commit()
-        db.refresh(ticket)
-        
-        logger.info(f"✓ Triage complete for ticket {ticket_id}")
-        
-        return {
-            "success": True,
-            "message": f"Ticket triaged successfully. Status: {ticket.status.value}",
-            "ticket_id": ticket_id,
-            "predicted_queue": ticket.predicted_queue,
-            "queue_confidence": ticket.queue_confidence,
-            "critical_prob": ticket.critical_prob,
-            "is_critical": ticket.is_critical,
-            "predicted_language": ticket.predicted_language,
-            "draft_generated": draft_generated,
-            "needs_approval": needs_approval,
-            "status": ticket.status
-        }
+        return draft_generated, needs_approval
     
     def _log_action(self, db: Session, ticket_id: int, action: str, actor: str, details: Dict):
         """Log an action to audit log"""
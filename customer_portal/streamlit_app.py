@@ -4,14 +4,16 @@ Clean, tutorial-style UI for submitting support tickets.
 """
 import streamlit as st
 import requests
-import os
+import sys
 from datetime import datetime
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Configuration
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+from streamlit_shared.backend_client import (
+    fetch_json_many, post, iter_tickets, wait_for_event
+)
 
 # Page config
 st.set_page_config(
@@ -478,15 +480,15 @@ The more details you provide, the faster we can help!""",
                         "submitter_email": submitter_email
                     }
                     
-                    response = requests.post(f"{BACKEND_URL}/tickets", data=data)
+                    response = post("/tickets", data=data)
                     
                     if response.status_code == 201:
                         ticket = response.json()
                         ticket_id = ticket["id"]
                         
                         # Auto-triage
-                        triage_response = requests.post(
-                            f"{BACKEND_URL}/tickets/{ticket_id}/triage",
+                        triage_response = post(
+                            f"/tickets/{ticket_id}/triage",
                             json={"run_draft": True}
                         )
                         
@@ -597,104 +599,103 @@ def my_tickets_page():
         
         with st.spinner("🔄 Loading your tickets..."):
             try:
-                response = requests.get(
-                    f"{BACKEND_URL}/tickets",
-                    params={"submitter_email": email}
-                )
+                tickets = list(iter_tickets({"submitter_email": email, "view": "summary"}))
                 
-                if response.status_code == 200:
-                    tickets = response.json()
-                    
-                    if not tickets:
-                        st.markdown('''
-                            <div class="info-box">
-                                <div class="info-box-title">📭 No tickets found</div>
-                                <div class="info-box-text">
-                                    We couldn't find any tickets for this email address. 
-                                    Submit your first ticket using the "Submit New Ticket" tab above!
-                                </div>
+                if not tickets:
+                    st.markdown('''
+                        <div class="info-box">
+                            <div class="info-box-title">📭 No tickets found</div>
+                            <div class="info-box-text">
+                                We couldn't find any tickets for this email address. 
+                                Submit your first ticket using the "Submit New Ticket" tab above!
                             </div>
-                        ''', unsafe_allow_html=True)
-                        return
-                    
-                    st.success(f"📊 Found **{len(tickets)}** ticket(s) for your account")
-                    
-                    st.markdown("<br>", unsafe_allow_html=True)
+                        </div>
+                    ''', unsafe_allow_html=True)
+                    return
+                
+                st.success(f"📊 Found **{len(tickets)}** ticket(s) for your account")
+                
+                st.markdown("<br>", unsafe_allow_html=True)
+                
+                # Display tickets (message and responses loaded concurrently up front)
+                tickets = sorted(tickets, key=lambda x: x['id'], reverse=True)
+                details = fetch_json_many([
+                    (f"/tickets/{ticket['id']}", {"include": "responses"}) for ticket in tickets
+                ])
+                
+                for ticket, detail in zip(tickets, details):
+                    priority_icon = "🔴" if ticket.get('is_critical') else "🟢"
+                    priority_text = "HIGH PRIORITY" if ticket.get('is_critical') else "NORMAL"
                     
-                    # Display tickets
-                    for ticket in sorted(tickets, key=lambda x: x['id'], reverse=True):
-                        priority_icon = "🔴" if ticket.get('is_critical') else "🟢"
-                        priority_text = "HIGH PRIORITY" if ticket.get('is_critical') else "NORMAL"
+                    with st.expander(
+                        f"{priority_icon} Ticket #{ticket['id']}: {ticket['subject']}",
+                        expanded=False
+                    ):
+                        # Header row
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.markdown(f"### Ticket #{ticket['id']}")
+                        with col2:
+                            st.markdown(format_status_badge(ticket['status']), unsafe_allow_html=True)
                         
-                        with st.expander(
-                            f"{priority_icon} Ticket #{ticket['id']}: {ticket['subject']}",
-                            expanded=False
-                        ):
-                            # Header row
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.markdown(f"### Ticket #{ticket['id']}")
-                            with col2:
-                                st.markdown(format_status_badge(ticket['status']), unsafe_allow_html=True)
-                            
-                            st.markdown("<br>", unsafe_allow_html=True)
-                            
-                            # Info grid
-                            col1, col2, col3 = st.columns(3)
-                            
-                            with col1:
-                                st.markdown("**📅 Submitted**")
-                                created = datetime.fromisoformat(ticket['created_at'].replace('Z', '+00:00'))
-                                st.write(created.strftime("%b %d, %Y at %I:%M %p"))
-                            
-                            with col2:
-                                st.markdown("**🏢 Department**")
-                                st.write(ticket.get('predicted_queue', 'Not assigned yet'))
-                            
-                            with col3:
-                                st.markdown("**⚡ Priority**")
-                                st.write(f"{priority_icon} {priority_text}")
-                            
-                            st.markdown("---")
-                            
-                            # Message
+                        st.markdown("<br>", unsafe_allow_html=True)
+                        
+                        # Info grid
+                        col1, col2, col3 = st.columns(3)
+                        
+                        with col1:
+                            st.markdown("**📅 Submitted**")
+                            created = datetime.fromisoformat(ticket['created_at'].replace('Z', '+00:00'))
+                            st.write(created.strftime("%b %d, %Y at %I:%M %p"))
+                        
+                        with col2:
+                            st.markdown("**🏢 Department**")
+                            st.write(ticket.get('predicted_queue', 'Not assigned yet'))
+                        
+                        with col3:
+                            st.markdown("**⚡ Priority**")
+                            st.write(f"{priority_icon} {priority_text}")
+                        
+                        st.markdown("---")
+                        
+                        # Message and responses (approvals are not shown here)
+                        if not isinstance(detail, Exception):
                             st.markdown("**📝 Your Message**")
-                            st.info(ticket['body'])
+                            st.info(detail['body'])
                             
-                            # Response
-                            detail_response = requests.get(f"{BACKEND_URL}/tickets/{ticket['id']}")
-                            if detail_response.status_code == 200:
-                                detail = detail_response.json()
+                            if detail.get('responses'):
+                                st.markdown("---")
+                                st.markdown("**📧 Response from Support Team**")
                                 
-                                if detail.get('responses'):
-                                    st.markdown("---")
-                                    st.markdown("**📧 Response from Support Team**")
-                                    
-                                    for response in detail['responses']:
-                                        if response.get('final_body'):
-                                            st.success(response['final_body'])
-                                            if response.get('approved_at'):
-                                                approved_time = datetime.fromisoformat(response['approved_at'].replace('Z', '+00:00'))
-                                                st.caption(f"✅ Sent on {approved_time.strftime('%b %d, %Y at %I:%M %p')}")
-                                        elif response.get('draft_body'):
-                                            if response.get('needs_human_approval'):
-                                                st.warning("⏳ **Your response is pending manager approval**")
-                                                st.write(response['draft_body'])
-                                                st.caption("We'll send the final response within 2 hours")
-                                            else:
-                                                st.info("📝 **Response drafted and will be sent shortly**")
-                                                st.write(response['draft_body'])
-                                else:
-                                    st.warning("⏳ **Response is being prepared...**")
-                                    st.caption("Our AI is working on your ticket. Check back soon!")
-                
-                else:
-                    st.error("❌ Failed to load tickets. Please try again.")
+                                for response in detail['responses']:
+                                    if response.get('final_body'):
+                                        st.success(response['final_body'])
+                                        if response.get('approved_at'):
+                                            approved_time = datetime.fromisoformat(response['approved_at'].replace('Z', '+00:00'))
+                                            st.caption(f"✅ Sent on {approved_time.strftime('%b %d, %Y at %I:%M %p')}")
+                                    elif response.get('draft_body'):
+                                        if response.get('needs_human_approval'):
+                                            st.warning("⏳ **Your response is pending manager approval**")
+                                            st.write(response['draft_body'])
+                                            st.caption("We'll send the final response within 2 hours")
+                                        else:
+                                            st.info("📝 **Response drafted and will be sent shortly**")
+                                            st.write(response['draft_body'])
+                            else:
+                                st.warning("⏳ **Response is being prepared...**")
+                                st.caption("Our AI is working on your ticket. Check back soon!")
             
+            except requests.exceptions.HTTPError:
+                st.error("❌ Failed to load tickets. Please try again.")
             except requests.exceptions.ConnectionError:
                 st.error("❌ Cannot connect to the server. Please ensure the backend is running.")
             except Exception as e:
                 st.error(f"❌ Error: {str(e)}")
+        
+        # Live status: rerun when one of this submitter's tickets changes
+        if st.checkbox("🔴 Live status updates", help="Refresh automatically when your tickets are updated"):
+            wait_for_event(submitter_email=email)
+            st.rerun()
 
 
 if __name__ == "__main__":
@@ -1,16 +1,40 @@
 'use client';
 
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Search, Mail, Clock, Building2, AlertCircle, CheckCircle2 } from 'lucide-react';
-import { listTickets, getTicket } from '@/lib/api';
-import type { Ticket, TicketDetail } from '@/lib/types';
+import { listAllTicketSummaries, getTicket, subscribeToEvents } from '@/lib/api';
+import type { TicketSummary, TicketDetail } from '@/lib/types';
 import toast from 'react-hot-toast';
 
 export default function TrackPage() {
   const [email, setEmail] = useState('');
   const [loading, setLoading] = useState(false);
-  const [tickets, setTickets] = useState<Ticket[]>([]);
+  const [tickets, setTickets] = useState<TicketSummary[]>([]);
   const [selectedTicket, setSelectedTicket] = useState<TicketDetail | null>(null);
+  const [trackedEmail, setTrackedEmail] = useState<string | null>(null);
+
+  // Live status updates for the tracked email
+  useEffect(() => {
+    if (!trackedEmail) return;
+    return subscribeToEvents({ submitter_email: trackedEmail }, (event) => {
+      if (event.type === 'ticket.created') {
+        listAllTicketSummaries({ submitter_email: trackedEmail }).then(setTickets);
+        return;
+      }
+      setTickets((current) =>
+        current.map((ticket) =>
+          ticket.id === event.ticket_id
+            ? {
+                ...ticket,
+                status: event.status,
+                predicted_queue: event.queue ?? ticket.predicted_queue,
+                is_critical: event.is_critical,
+              }
+            : ticket
+        )
+      );
+    });
+  }, [trackedEmail]);
 
   const handleSearch = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -22,8 +46,9 @@ export default function TrackPage() {
 
     setLoading(true);
     try {
-      const result = await listTickets({ submitter_email: email });
+      const result = await listAllTicketSummaries({ submitter_email: email });
       setTickets(result);
+      setTrackedEmail(email);
       
       if (result.length === 0) {
         toast.error('No tickets found for this email');
@@ -39,7 +64,7 @@ export default function TrackPage() {
 
   const handleViewDetails = async (ticketId: number) => {
     try {
-      const detail = await getTicket(ticketId);
+      const detail = await getTicket(ticketId, 'responses');
       setSelectedTicket(detail);
     } catch (error: any) {
       toast.error('Failed to load ticket details');
@@ -140,7 +165,7 @@ export default function TrackPage() {
                         <h3 className="text-xl font-bold text-gray-900 mb-1">
                           Ticket #{ticket.id}: {ticket.subject}
                         </h3>
-                        <p className="text-gray-600 line-clamp-2">{ticket.body}</p>
+                        <p className="text-gray-600 line-clamp-2">{ticket.body_preview}</p>
                       </div>
                     </div>
 
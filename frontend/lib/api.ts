@@ -3,6 +3,11 @@ import axios from 'axios';
 import type {
   Ticket,
   TicketDetail,
+  TicketPage,
+  TicketSummary,
+  TicketSearchHit,
+  TicketEvent,
+  TicketEventType,
   TriageRequest,
   TriageResponse,
   DashboardSummary,
@@ -34,20 +39,79 @@ export const createTicket = async (data: FormData): Promise<Ticket> => {
   return response.data;
 };
 
-export const getTicket = async (ticketId: number): Promise<TicketDetail> => {
-  const response = await api.get<TicketDetail>(`/tickets/${ticketId}`);
+export const getTicket = async (
+  ticketId: number,
+  include: string = 'responses,approvals'
+): Promise<TicketDetail> => {
+  const response = await api.get<TicketDetail>(`/tickets/${ticketId}`, {
+    params: { include },
+  });
   return response.data;
 };
 
-export const listTickets = async (params?: {
+export interface ListTicketsParams {
   status?: TicketStatus;
   queue?: string;
   is_critical?: boolean;
   submitter_email?: string;
-  skip?: number;
+  cursor?: string;
+  limit?: number;
+  fields?: string;
+}
+
+export const listTickets = async (params?: ListTicketsParams): Promise<TicketPage> => {
+  const response = await api.get<TicketPage>('/tickets', { params });
+  return response.data;
+};
+
+export const listTicketSummaries = async (
+  params?: ListTicketsParams
+): Promise<TicketPage<TicketSummary>> => {
+  const response = await api.get<TicketPage<TicketSummary>>('/tickets', {
+    params: { ...params, view: 'summary' },
+  });
+  return response.data;
+};
+
+// Follow next_cursor through every page of a (possibly large) result set
+async function* iterPages<T>(
+  fetchPage: (params: ListTicketsParams) => Promise<TicketPage<T>>,
+  params: Omit<ListTicketsParams, 'cursor'>
+): AsyncGenerator<T> {
+  let cursor: string | undefined;
+  do {
+    const page = await fetchPage({ ...params, cursor });
+    yield* page.items;
+    cursor = page.next_cursor ?? undefined;
+  } while (cursor);
+}
+
+const collect = async <T>(items: AsyncGenerator<T>): Promise<T[]> => {
+  const result: T[] = [];
+  for await (const item of items) {
+    result.push(item);
+  }
+  return result;
+};
+
+export const iterTickets = (params: Omit<ListTicketsParams, 'cursor'> = {}) =>
+  iterPages(listTickets, params);
+
+export const listAllTickets = (params: Omit<ListTicketsParams, 'cursor'> = {}) =>
+  collect(iterTickets(params));
+
+export const listAllTicketSummaries = (params: Omit<ListTicketsParams, 'cursor'> = {}) =>
+  collect(iterPages(listTicketSummaries, params));
+
+export interface SearchTicketsParams {
+  q: string;
+  status?: TicketStatus;
+  queue?: string;
   limit?: number;
-}): Promise<Ticket[]> => {
-  const response = await api.get<Ticket[]>('/tickets', { params });
+}
+
+export const searchTickets = async (params: SearchTicketsParams): Promise<TicketSearchHit[]> => {
+  const response = await api.get<TicketSearchHit[]>('/tickets/search', { params });
   return response.data;
 };
 
@@ -105,6 +169,48 @@ export const getTicketTimeseries = async (
   return response.data;
 };
 
+// ============================================================================
+// EVENT STREAM
+// ============================================================================
+
+// Subscribe to ticket lifecycle events; reconnects and resumes after the last
+// received event. Returns an unsubscribe function.
+export const subscribeToEvents = (
+  filters: { queue?: string; submitter_email?: string; types?: TicketEventType[] },
+  onEvent: (event: TicketEvent) => void
+): (() => void) => {
+  let socket: WebSocket | null = null;
+  let lastId: number | undefined;
+  let closed = false;
+  let retry: ReturnType<typeof setTimeout> | undefined;
+
+  const connect = () => {
+    const params = new URLSearchParams();
+    if (filters.queue) params.set('queue', filters.queue);
+    if (filters.submitter_email) params.set('submitter_email', filters.submitter_email);
+    if (filters.types?.length) params.set('types', filters.types.join(','));
+    if (lastId !== undefined) params.set('since', String(lastId));
+
+    socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/ws/events?${params}`);
+    socket.onmessage = (message) => {
+      const event = JSON.parse(message.data);
+      if (event.type === 'heartbeat') return;
+      lastId = event.id;
+      onEvent(event as TicketEvent);
+    };
+    socket.onclose = () => {
+      if (!closed) retry = setTimeout(connect, 3000);
+    };
+  };
+
+  connect();
+  return () => {
+    closed = true;
+    clearTimeout(retry);
+    socket?.close();
+  };
+};
+
 // ============================================================================
 // HEALTH CHECK
 // ============================================================================
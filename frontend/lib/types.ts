@@ -16,6 +16,36 @@ export interface Ticket {
   created_at: string;
   updated_at: string;
   sent_at?: string;
+  parent_id?: number | null;
+}
+
+// Compact list row (GET /tickets?view=summary), body truncated server-side
+export interface TicketSummary {
+  id: number;
+  subject: string;
+  body_preview: string;
+  submitter_email: string;
+  predicted_queue?: string;
+  critical_prob?: number;
+  is_critical: boolean;
+  status: TicketStatus;
+  created_at: string;
+}
+
+export interface TicketPage<T = Ticket> {
+  items: T[];
+  next_cursor: string | null;
+}
+
+export interface TicketSearchHit {
+  id: number;
+  subject: string;
+  status: TicketStatus;
+  predicted_queue?: string;
+  is_critical: boolean;
+  created_at: string;
+  score: number;
+  snippet: string; // matches wrapped in <mark>
 }
 
 export enum TicketStatus {
@@ -73,8 +103,10 @@ export interface TriageResponse {
   is_critical: boolean;
   predicted_language?: string;
   draft_generated: boolean;
+  draft_scheduled: boolean;
   needs_approval: boolean;
   status: TicketStatus;
+  parent_id?: number | null;
 }
 
 export interface DashboardSummary {
@@ -103,6 +135,25 @@ export interface PendingApprovalItem {
   created_at: string;
   draft_subject?: string;
   draft_body?: string;
+  duplicate_count: number;
+}
+
+export interface IncidentTicket {
+  ticket_id: number;
+  subject: string;
+  similarity: number;
+}
+
+export interface ActiveIncident {
+  incident_id: number;
+  size: number;
+  growth_per_hour: number;
+  growth_ratio: number | null;
+  dominant_queue: string;
+  dominant_queue_share: number;
+  first_seen: string;
+  last_seen: string;
+  representative_tickets: IncidentTicket[];
 }
 
 export interface ApprovalPayload {
@@ -113,3 +164,24 @@ export interface ApprovalPayload {
   edited_subject?: string;
   edited_body?: string;
 }
+
+// Ticket lifecycle events pushed over /ws/events
+export type TicketEventType =
+  | "ticket.created"
+  | "ticket.triaged"
+  | "ticket.drafted"
+  | "ticket.pending_approval"
+  | "ticket.approved"
+  | "ticket.sent"
+  | "ticket.rejected";
+
+export interface TicketEvent {
+  id: number;
+  type: TicketEventType;
+  ticket_id: number;
+  status: TicketStatus;
+  queue?: string | null;
+  submitter_email?: string | null;
+  is_critical: boolean;
+  created_at: string;
+}
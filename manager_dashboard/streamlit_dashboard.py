@@ -5,16 +5,24 @@ Professional dashboard inspired by Pandora design - clean, symmetrical, data-foc
 import streamlit as st
 import requests
 import os
+import sys
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from streamlit_shared.backend_client import (
+    fetch_json, fetch_json_many, post, iter_tickets, wait_for_event
+)
+
 load_dotenv()
 
 # Configuration
-BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
 MANAGER_PASSWORD = os.getenv("MANAGER_PASSWORD", "admin123")
 
 # Page config
@@ -323,11 +331,13 @@ def main():
     """Main dashboard"""
     check_authentication()
     
-    # Header with logout
-    col1, col2 = st.columns([6, 1])
+    # Header with live toggle and logout
+    col1, col2, col3 = st.columns([5, 1, 1])
     with col1:
         st.markdown('<h1 class="dashboard-header">Dashboard</h1>', unsafe_allow_html=True)
     with col2:
+        live = st.toggle("🔴 Live", help="Refresh when tickets change (pushed by the backend)")
+    with col3:
         if st.button("🚪 Logout"):
             st.session_state.authenticated = False
             st.rerun()
@@ -351,14 +361,24 @@ def main():
     
     with tab4:
         analytics_page()
+    
+    # Live mode: rerun as soon as the backend pushes a ticket event
+    if live:
+        wait_for_event()
+        st.rerun()
 
 
 def overview_page():
     """Professional overview with Pandora-style layout"""
     try:
-        response = requests.get(f"{BACKEND_URL}/dashboard/summary")
-        if response.status_code == 200:
-            summary = response.json()
+        # Independent reads run concurrently
+        summary, timeseries = fetch_json_many([
+            ("/dashboard/summary", {}),
+            ("/dashboard/timeseries", {"days": 30}),
+        ])
+        if isinstance(summary, requests.exceptions.ConnectionError):
+            raise summary
+        if not isinstance(summary, Exception):
             
             # Top metrics row - 5 cards
             col1, col2, col3, col4, col5 = st.columns(5)
@@ -494,9 +514,7 @@ def overview_page():
             st.markdown('<div class="chart-container">', unsafe_allow_html=True)
             st.markdown('<div class="chart-title">Ticket Trends - Last 30 Days</div>', unsafe_allow_html=True)
             
-            timeseries_response = requests.get(f"{BACKEND_URL}/dashboard/timeseries?days=30")
-            if timeseries_response.status_code == 200:
-                timeseries = timeseries_response.json()
+            if not isinstance(timeseries, Exception):
                 if timeseries:
                     df_ts = pd.DataFrame(timeseries)
                     
@@ -550,123 +568,123 @@ def approvals_page():
     st.markdown("### ⏳ Pending Critical Approvals")
     
     try:
-        response = requests.get(f"{BACKEND_URL}/approvals/pending")
-        if response.status_code == 200:
-            pending = response.json()
+        pending = fetch_json("/approvals/pending")
+        
+        if not pending:
+            st.success("✅ All clear! No pending approvals.")
+            return
+        
+        st.warning(f"⚠️ {len(pending)} ticket(s) require approval")
+        st.markdown("<br>", unsafe_allow_html=True)
+        
+        # Load all ticket details concurrently instead of one request per card
+        details = fetch_json_many([
+            (f"/tickets/{item['ticket_id']}", {"include": "responses"}) for item in pending
+        ])
+        
+        for item, ticket in zip(pending, details):
+            ticket_id = item["ticket_id"]
             
-            if not pending:
-                st.success("✅ All clear! No pending approvals.")
-                return
+            st.markdown(f"""
+                <div class="approval-card">
+                    <div class="approval-card-header">🎫 Ticket #{ticket_id}: {item['subject']}</div>
+                </div>
+            """, unsafe_allow_html=True)
             
-            st.warning(f"⚠️ {len(pending)} ticket(s) require approval")
-            st.markdown("<br>", unsafe_allow_html=True)
+            if item.get("duplicate_count"):
+                st.info(f"🔗 Approving also answers {item['duplicate_count']} near-duplicate ticket(s)")
             
-            for item in pending:
-                ticket_id = item["ticket_id"]
+            if not isinstance(ticket, Exception):
+                # Metrics
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Department", item["predicted_queue"])
+                with col2:
+                    st.metric("Critical Score", f"{item['critical_prob']:.0%}")
+                with col3:
+                    st.metric("From", item["submitter_email"].split('@')[0])
+                with col4:
+                    created = datetime.fromisoformat(item["created_at"].replace('Z', '+00:00'))
+                    hours = (datetime.now(created.tzinfo) - created).total_seconds() / 3600
+                    st.metric("Age", f"{hours:.1f}h ago")
                 
-                st.markdown(f"""
-                    <div class="approval-card">
-                        <div class="approval-card-header">🎫 Ticket #{ticket_id}: {item['subject']}</div>
-                    </div>
-                """, unsafe_allow_html=True)
+                # Original ticket
+                with st.expander("📧 Original Message", expanded=True):
+                    st.write(f"**From:** {ticket['submitter_name']} ({ticket['submitter_email']})")
+                    st.write(f"**Subject:** {ticket['subject']}")
+                    st.info(ticket['body'])
                 
-                detail_response = requests.get(f"{BACKEND_URL}/tickets/{ticket_id}")
-                if detail_response.status_code == 200:
-                    ticket = detail_response.json()
-                    
-                    # Metrics
-                    col1, col2, col3, col4 = st.columns(4)
-                    with col1:
-                        st.metric("Department", item["predicted_queue"])
-                    with col2:
-                        st.metric("Critical Score", f"{item['critical_prob']:.0%}")
-                    with col3:
-                        st.metric("From", item["submitter_email"].split('@')[0])
-                    with col4:
-                        created = datetime.fromisoformat(item["created_at"].replace('Z', '+00:00'))
-                        hours = (datetime.now(created.tzinfo) - created).total_seconds() / 3600
-                        st.metric("Age", f"{hours:.1f}h ago")
-                    
-                    # Original ticket
-                    with st.expander("📧 Original Message", expanded=True):
-                        st.write(f"**From:** {ticket['submitter_name']} ({ticket['submitter_email']})")
-                        st.write(f"**Subject:** {ticket['subject']}")
-                        st.info(ticket['body'])
+                # Draft response
+                if ticket.get('responses') and len(ticket['responses']) > 0:
+                    response_data = ticket['responses'][0]
                     
-                    # Draft response
-                    if ticket.get('responses') and len(ticket['responses']) > 0:
-                        response_data = ticket['responses'][0]
+                    with st.expander("🤖 AI Draft Response", expanded=True):
+                        col1, col2 = st.columns([3, 1])
+                        with col1:
+                            st.write(f"**Subject:** {response_data.get('draft_subject')}")
+                        with col2:
+                            st.write(f"**Confidence:** {response_data.get('draft_confidence', 0):.0%}")
+                        st.success(response_data.get('draft_body'))
+                
+                # Actions
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    with st.form(f"approve_{ticket_id}"):
+                        st.subheader("✅ Approve")
+                        approver_name = st.text_input("Your Name", "Manager", key=f"a_name_{ticket_id}")
+                        approver_email = st.text_input("Your Email", "manager@company.com", key=f"a_email_{ticket_id}")
+                        notes = st.text_input("Notes (optional)", key=f"a_notes_{ticket_id}")
                         
-                        with st.expander("🤖 AI Draft Response", expanded=True):
-                            col1, col2 = st.columns([3, 1])
-                            with col1:
-                                st.write(f"**Subject:** {response_data.get('draft_subject')}")
-                            with col2:
-                                st.write(f"**Confidence:** {response_data.get('draft_confidence', 0):.0%}")
-                            st.success(response_data.get('draft_body'))
-                    
-                    # Actions
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        with st.form(f"approve_{ticket_id}"):
-                            st.subheader("✅ Approve")
-                            approver_name = st.text_input("Your Name", "Manager", key=f"a_name_{ticket_id}")
-                            approver_email = st.text_input("Your Email", "manager@company.com", key=f"a_email_{ticket_id}")
-                            notes = st.text_input("Notes (optional)", key=f"a_notes_{ticket_id}")
+                        if st.form_submit_button("Approve & Send", use_container_width=True):
+                            approval_data = {
+                                "approver_name": approver_name,
+                                "approver_email": approver_email,
+                                "decision": "APPROVED",
+                                "decision_notes": notes
+                            }
+                            
+                            approve_response = post(
+                                f"/tickets/{ticket_id}/approve",
+                                json=approval_data
+                            )
                             
-                            if st.form_submit_button("Approve & Send", use_container_width=True):
-                                approval_data = {
+                            if approve_response.status_code == 200:
+                                st.success("✅ Approved!")
+                                st.rerun()
+                            else:
+                                st.error(f"Failed: {approve_response.text}")
+                
+                with col2:
+                    with st.form(f"reject_{ticket_id}"):
+                        st.subheader("❌ Reject")
+                        approver_name = st.text_input("Your Name", "Manager", key=f"r_name_{ticket_id}")
+                        approver_email = st.text_input("Your Email", "manager@company.com", key=f"r_email_{ticket_id}")
+                        reject_reason = st.text_area("Reason (required)", key=f"r_reason_{ticket_id}")
+                        
+                        if st.form_submit_button("Reject", use_container_width=True):
+                            if not reject_reason:
+                                st.error("Reason required")
+                            else:
+                                reject_data = {
                                     "approver_name": approver_name,
                                     "approver_email": approver_email,
-                                    "decision": "APPROVED",
-                                    "decision_notes": notes
+                                    "decision": "REJECTED",
+                                    "decision_notes": reject_reason
                                 }
                                 
-                                approve_response = requests.post(
-                                    f"{BACKEND_URL}/tickets/{ticket_id}/approve",
-                                    json=approval_data
+                                reject_response = post(
+                                    f"/tickets/{ticket_id}/reject",
+                                    json=reject_data
                                 )
                                 
-                                if approve_response.status_code == 200:
-                                    st.success("✅ Approved!")
+                                if reject_response.status_code == 200:
+                                    st.success("✅ Rejected")
                                     st.rerun()
                                 else:
-                                    st.error(f"Failed: {approve_response.text}")
-                    
-                    with col2:
-                        with st.form(f"reject_{ticket_id}"):
-                            st.subheader("❌ Reject")
-                            approver_name = st.text_input("Your Name", "Manager", key=f"r_name_{ticket_id}")
-                            approver_email = st.text_input("Your Email", "manager@company.com", key=f"r_email_{ticket_id}")
-                            reject_reason = st.text_area("Reason (required)", key=f"r_reason_{ticket_id}")
-                            
-                            if st.form_submit_button("Reject", use_container_width=True):
-                                if not reject_reason:
-                                    st.error("Reason required")
-                                else:
-                                    reject_data = {
-                                        "approver_name": approver_name,
-                                        "approver_email": approver_email,
-                                        "decision": "REJECTED",
-                                        "decision_notes": reject_reason
-                                    }
-                                    
-                                    reject_response = requests.post(
-                                        f"{BACKEND_URL}/tickets/{ticket_id}/reject",
-                                        json=reject_data
-                                    )
-                                    
-                                    if reject_response.status_code == 200:
-                                        st.success("✅ Rejected")
-                                        st.rerun()
-                                    else:
-                                        st.error(f"Failed: {reject_response.text}")
-                    
-                    st.markdown("---")
-        
-        else:
-            st.error("Failed to load approvals")
+                                    st.error(f"Failed: {reject_response.text}")
+                
+                st.markdown("---")
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
@@ -706,40 +724,65 @@ def all_tickets_page():
     elif critical_filter == "Non-Critical Only":
         params["is_critical"] = False
     
+    # Reset the loaded pages when the filters change
+    filter_key = tuple(sorted(params.items()))
+    if st.session_state.get("tickets_filter") != filter_key:
+        st.session_state.tickets_filter = filter_key
+        st.session_state.tickets_loaded = []
+        st.session_state.tickets_cursor = None
+        st.session_state.tickets_more = True
+    
     try:
-        response = requests.get(f"{BACKEND_URL}/tickets", params=params)
-        if response.status_code == 200:
-            tickets = response.json()
-            
-            st.write(f"**{len(tickets)} ticket(s) found**")
+        # Load the first page, then one more page per "Load more" click
+        if not st.session_state.tickets_loaded and st.session_state.tickets_more:
+            load_tickets_page(params)
+        
+        tickets = st.session_state.tickets_loaded
+        more_label = "+" if st.session_state.tickets_more else ""
+        st.write(f"**{len(tickets)}{more_label} ticket(s) found**")
+        
+        # Expander bodies always render, so load every detail concurrently up front
+        details = fetch_json_many([
+            (f"/tickets/{ticket['id']}", {"include": "responses"}) for ticket in tickets
+        ])
+        
+        for ticket, detail in zip(tickets, details):
+            priority_icon = "🔴" if ticket.get("is_critical") else "🟢"
             
-            if tickets:
-                for ticket in tickets:
-                    priority_icon = "🔴" if ticket.get("is_critical") else "🟢"
-                    
-                    with st.expander(
-                        f"{priority_icon} #{ticket['id']}: {ticket['subject']} | {ticket['status']}",
-                        expanded=False
-                    ):
-                        show_ticket_details(ticket["id"])
+            with st.expander(
+                f"{priority_icon} #{ticket['id']}: {ticket['subject']} | {ticket['status']}",
+                expanded=False
+            ):
+                show_ticket_details(detail)
         
-        else:
-            st.error("Failed to load tickets")
+        if st.session_state.tickets_more and st.button("⬇️ Load more"):
+            load_tickets_page(params)
+            st.rerun()
     
     except Exception as e:
         st.error(f"Error: {str(e)}")
 
 
-def show_ticket_details(ticket_id):
-    """Show ticket details"""
+def load_tickets_page(params: dict, page_size: int = 50):
+    """Append the next page of tickets to the session state"""
+    page_params = dict(params, limit=page_size, view="summary")
+    if st.session_state.tickets_cursor:
+        page_params["cursor"] = st.session_state.tickets_cursor
+    
+    page = fetch_json("/tickets", **page_params)
+    
+    st.session_state.tickets_loaded.extend(page["items"])
+    st.session_state.tickets_cursor = page["next_cursor"]
+    st.session_state.tickets_more = page["next_cursor"] is not None
+
+
+def show_ticket_details(ticket):
+    """Show ticket details (ticket detail JSON, or the exception raised loading it)"""
     try:
-        response = requests.get(f"{BACKEND_URL}/tickets/{ticket_id}")
-        if response.status_code != 200:
+        if isinstance(ticket, Exception):
             st.error("Failed to load ticket")
             return
         
-        ticket = response.json()
-        
         col1, col2 = st.columns(2)
         
         with col1:
@@ -770,14 +813,12 @@ def show_ticket_details(ticket_id):
 def auto_send_drafted():
     """Auto-send drafted tickets"""
     try:
-        response = requests.get(f"{BACKEND_URL}/tickets", params={"status": "DRAFTED"})
-        
-        if response.status_code != 200:
+        try:
+            tickets = list(iter_tickets({"status": "DRAFTED", "fields": "id"}))
+        except requests.exceptions.HTTPError:
             st.error("Failed to get drafted tickets")
             return
         
-        tickets = response.json()
-        
         if not tickets:
             st.info("No drafted tickets")
             return
@@ -791,8 +832,8 @@ def auto_send_drafted():
                 "decision_notes": "Auto-approved"
             }
             
-            approve_response = requests.post(
-                f"{BACKEND_URL}/tickets/{ticket['id']}/approve",
+            approve_response = post(
+                f"/tickets/{ticket['id']}/approve",
                 json=approval_data
             )
             
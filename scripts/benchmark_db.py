@@ -0,0 +1,149 @@
+"""
+Benchmark concurrent ticket creation and triage writes against SQLite.
+Compares the production profile (WAL, tuned pragmas, serialized writes)
+with the legacy settings (rollback journal, check_same_thread=False only).
+"""
+import sys
+import argparse
+import tempfile
+import threading
+import time
+import json
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import desc
+from sqlalchemy.exc import OperationalError
+
+from backend.db import create_db_engine, create_session_factory
+from backend.models import Base, Ticket, Response, AuditLog, TicketStatus
+
+
+def ticket_lifecycle(session_factory, worker_id: int, n: int, stats: dict, lock: threading.Lock):
+    """Create and triage n tickets (same writes as the API + TriageService)"""
+    for i in range(n):
+        db = session_factory()
+        try:
+            ticket = Ticket(
+                subject=f"Benchmark ticket {worker_id}-{i}",
+                body="VPN disconnects every few minutes since this morning.",
+                submitter_name="Bench User",
+                submitter_email=f"user{worker_id}@example.com",
+                status=TicketStatus.NEW
+            )
+            db.add(ticket)
+            db.commit()
+            db.refresh(ticket)
+
+            ticket.predicted_queue = "Technical Support"
+            ticket.queue_confidence = 0.9
+            ticket.critical_prob = 0.2
+            ticket.is_critical = False
+            ticket.status = TicketStatus.PENDING_APPROVAL
+            ticket.triaged_at = datetime.utcnow()
+            db.add(AuditLog(ticket_id=ticket.id, action="ML_PREDICTION", actor="system",
+                            details=json.dumps({"queue": ticket.predicted_queue})))
+            db.add(Response(ticket_id=ticket.id, draft_subject="RE: VPN", draft_body="Please try ...",
+                            draft_confidence=0.8, needs_human_approval=True))
+            db.commit()
+            with lock:
+                stats["ok"] += 1
+        except OperationalError as e:
+            db.rollback()
+            with lock:
+                stats["errors"] += 1
+                stats["last_error"] = str(e.orig)
+        finally:
+            db.close()
+
+
+def reader(session_factory, stop: threading.Event, stats: dict, lock: threading.Lock):
+    """List tickets the way the dashboards do, until stopped"""
+    while not stop.is_set():
+        db = session_factory()
+        try:
+            db.query(Ticket).filter(Ticket.status == TicketStatus.PENDING_APPROVAL) \
+                .order_by(desc(Ticket.created_at)).limit(50).all()
+            with lock:
+                stats["reads"] += 1
+        except OperationalError:
+            with lock:
+                stats["read_errors"] += 1
+        finally:
+            db.close()
+
+
+def run_profile(profile: str, writers: int, readers: int, tickets_per_writer: int) -> dict:
+    """Run one benchmark against a fresh database file"""
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_db_engine(url, sqlite_profile=profile)
+        session_factory = create_session_factory(engine, sqlite_profile=profile)
+        Base.metadata.create_all(bind=engine)
+
+        stats = {"ok": 0, "errors": 0, "reads": 0, "read_errors": 0, "last_error": None}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        read_threads = [
+            threading.Thread(target=reader, args=(session_factory, stop, stats, lock))
+            for _ in range(readers)
+        ]
+        write_threads = [
+            threading.Thread(target=ticket_lifecycle, args=(session_factory, w, tickets_per_writer, stats, lock))
+            for w in range(writers)
+        ]
+
+        start = time.perf_counter()
+        for t in read_threads + write_threads:
+            t.start()
+        for t in write_threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for t in read_threads:
+            t.join()
+        engine.dispose()
+
+    stats["elapsed_s"] = elapsed
+    stats["tickets_per_s"] = stats["ok"] / elapsed
+    stats["reads_per_s"] = stats["reads"] / elapsed
+    return stats
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark SQLite profiles")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent ticket writers")
+    parser.add_argument("--readers", type=int, default=4, help="Concurrent dashboard readers")
+    parser.add_argument("--tickets", type=int, default=100, help="Tickets per writer")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("IT TICKET TRIAGE SYSTEM - SQLITE BENCHMARK")
+    print("="*80 + "\n")
+    print(f"{args.writers} writers x {args.tickets} tickets, {args.readers} readers\n")
+
+    results = {}
+    for profile in ("legacy", "production"):
+        print(f"Running {profile} profile...")
+        results[profile] = run_profile(profile, args.writers, args.readers, args.tickets)
+
+    print(f"\n{'Profile':<12} {'Tickets/s':>10} {'Reads/s':>10} {'Write errs':>11} {'Read errs':>10}")
+    for profile, r in results.items():
+        print(f"{profile:<12} {r['tickets_per_s']:>10.1f} {r['reads_per_s']:>10.1f} "
+              f"{r['errors']:>11d} {r['read_errors']:>10d}")
+        if r["last_error"]:
+            print(f"  last error: {r['last_error']}")
+
+    speedup = results["production"]["tickets_per_s"] / max(results["legacy"]["tickets_per_s"], 1e-9)
+    print(f"\nTriage throughput: {speedup:.1f}x vs legacy settings")
+    print("="*80 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark embedding throughput on the dataset's real length distribution.
+Compares fixed-size batches (SentenceTransformer.encode, batch_size rows)
+with length-bucketed batches under a padded-token budget.
+"""
+import sys
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.ml.embeddings import get_embedder, plan_batches, EMBEDDING_TOKEN_BUDGET
+from backend.ml.data_stream import iter_ticket_chunks, prepare_chunk, TICKET_COLUMNS
+
+
+def load_sample(dataset_path: str, n: int, seed: int = 42) -> list:
+    """Random sample of ticket texts (subject + body, as in training)"""
+    texts = []
+    for chunk in iter_ticket_chunks(dataset_path, chunksize=10000, columns=TICKET_COLUMNS):
+        texts.extend(prepare_chunk(chunk)['text'].tolist())
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(texts), min(n, len(texts)), replace=False)
+    return [texts[i] for i in rows]
+
+
+def padding_efficiency(lengths: np.ndarray, batches: list) -> float:
+    """Real tokens / padded tokens over all batches"""
+    padded = sum(len(batch) * lengths[batch].max() for batch in batches)
+    return float(lengths.sum() / padded)
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark embedding batching")
+    parser.add_argument(
+        "dataset_path", nargs="?",
+        default=r"C:\Users\sthfa\Downloads\aa_dataset-tickets-multi-lang-5-2-50-version.csv",
+        help="Path to CSV or Parquet dataset"
+    )
+    parser.add_argument("--sample", type=int, default=2000, help="Texts to encode")
+    parser.add_argument("--batch-size", type=int, default=32, help="Rows per fixed-size batch")
+    parser.add_argument("--token-budget", type=int, default=EMBEDDING_TOKEN_BUDGET or 16384,
+                        help="Padded tokens per bucketed batch")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("IT TICKET TRIAGE SYSTEM - EMBEDDING BATCHING BENCHMARK")
+    print("="*80 + "\n")
+
+    embedder = get_embedder()
+    texts = load_sample(args.dataset_path, args.sample)
+    _, lengths = embedder.prepare_texts(texts)
+
+    print(f"{len(texts)} texts, model {embedder.model_name}, max_seq_length {embedder.max_seq_length}")
+    print(f"Token lengths: p50={np.percentile(lengths, 50):.0f} p90={np.percentile(lengths, 90):.0f} "
+          f"p99={np.percentile(lengths, 99):.0f} max={lengths.max()} "
+          f"truncated={int((lengths >= embedder.max_seq_length).sum())}\n")
+
+    # SentenceTransformer sorts by character length, then cuts fixed-size batches
+    by_chars = np.argsort([-len(t) for t in texts], kind="stable")
+    fixed_batches = [by_chars[i:i + args.batch_size] for i in range(0, len(texts), args.batch_size)]
+    bucketed_batches = plan_batches(lengths, args.token_budget)
+
+    # Warm up (model load, first-call allocations)
+    embedder.embed_texts(texts[:8])
+
+    results = {}
+    for name, kwargs, batches in (
+        ("fixed", {"batch_size": args.batch_size, "token_budget": 0}, fixed_batches),
+        ("bucketed", {"token_budget": args.token_budget}, bucketed_batches),
+    ):
+        print(f"Running {name} batching...")
+        start = time.perf_counter()
+        embeddings = embedder.embed_texts(texts, **kwargs)
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "embeddings": embeddings,
+            "texts_per_s": len(texts) / elapsed,
+            "batches": len(batches),
+            "largest_batch_tokens": max(len(b) * lengths[b].max() for b in batches),
+            "efficiency": padding_efficiency(lengths, batches)
+        }
+
+    print(f"\n{'Batching':<10} {'Texts/s':>9} {'Batches':>8} {'Padding eff.':>13} {'Peak batch tokens':>18}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['texts_per_s']:>9.1f} {r['batches']:>8d} {r['efficiency']:>13.1%} "
+              f"{r['largest_batch_tokens']:>18d}")
+
+    speedup = results["bucketed"]["texts_per_s"] / results["fixed"]["texts_per_s"]
+    diff = np.abs(results["bucketed"]["embeddings"] - results["fixed"]["embeddings"]).max()
+    print(f"\nSpeedup: {speedup:.2f}x, max embedding difference: {diff:.2e} (order restored)")
+    print("="*80 + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
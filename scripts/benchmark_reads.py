@@ -0,0 +1,148 @@
+"""
+Benchmark read-heavy concurrency: sync Session inside async endpoints
+(blocks the event loop) vs. the AsyncSession data layer.
+"""
+import sys
+import argparse
+import asyncio
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, desc
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from backend.db import create_db_engine, create_session_factory
+from backend.db_async import create_async_db_engine
+from backend.models import Base, Ticket, TicketStatus
+
+
+def seed(session_factory, n: int):
+    """Insert n tickets spread over 30 days"""
+    db = session_factory()
+    now = datetime.utcnow()
+    statuses = list(TicketStatus)
+    for i in range(n):
+        db.add(Ticket(
+            subject=f"Ticket {i}",
+            body="Printer on floor 3 shows paper jam although the tray is empty.",
+            submitter_name="Bench User",
+            submitter_email=f"user{i % 50}@example.com",
+            predicted_queue=["Technical Support", "Billing", "IT Support"][i % 3],
+            is_critical=i % 7 == 0,
+            status=statuses[i % len(statuses)],
+            created_at=now - timedelta(minutes=i)
+        ))
+    db.commit()
+    db.close()
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    """Measure event-loop lag (how long other requests would wait)"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+
+async def run_sync(session_factory, requests: int, concurrency: int) -> float:
+    """Old endpoint style: sync Session query inside a coroutine"""
+    async def one():
+        db = session_factory()
+        try:
+            db.query(Ticket).filter(Ticket.submitter_email == "user7@example.com") \
+                .order_by(desc(Ticket.created_at)).limit(100).all()
+        finally:
+            db.close()
+
+    return await _drive(one, requests, concurrency)
+
+
+async def run_async(async_session_factory, requests: int, concurrency: int) -> float:
+    """New endpoint style: AsyncSession query"""
+    async def one():
+        async with async_session_factory() as db:
+            result = await db.execute(
+                select(Ticket).where(Ticket.submitter_email == "user7@example.com")
+                .order_by(desc(Ticket.created_at)).limit(100)
+            )
+            result.scalars().all()
+
+    return await _drive(one, requests, concurrency)
+
+
+async def _drive(one, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def guarded():
+        async with semaphore:
+            await one()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(guarded() for _ in range(requests)))
+    return time.perf_counter() - start
+
+
+async def measure(name: str, runner, *args) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    elapsed = await runner(*args)
+    stop.set()
+    await beat
+    lags.sort()
+    return {
+        "name": name,
+        "elapsed": elapsed,
+        "max_lag_ms": (lags[-1] if lags else 0) * 1000,
+        "p95_lag_ms": (lags[int(len(lags) * 0.95)] if lags else 0) * 1000
+    }
+
+
+async def main_async(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{Path(tmp) / 'bench.db'}"
+        engine = create_db_engine(url)
+        session_factory = create_session_factory(engine)
+        Base.metadata.create_all(bind=engine)
+        seed(session_factory, args.tickets)
+
+        async_engine = create_async_db_engine(url)
+        async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        results = [
+            await measure("sync session", run_sync, session_factory, args.requests, args.concurrency),
+            await measure("async session", run_async, async_session_factory, args.requests, args.concurrency),
+        ]
+
+        await async_engine.dispose()
+        engine.dispose()
+
+    print(f"\n{'Data layer':<15} {'Req/s':>8} {'p95 loop lag':>13} {'max loop lag':>13}")
+    for r in results:
+        print(f"{r['name']:<15} {args.requests / r['elapsed']:>8.1f} "
+              f"{r['p95_lag_ms']:>10.1f} ms {r['max_lag_ms']:>10.1f} ms")
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark sync vs async read path")
+    parser.add_argument("--tickets", type=int, default=20000, help="Tickets to seed")
+    parser.add_argument("--requests", type=int, default=500, help="List requests to issue")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent requests")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("IT TICKET TRIAGE SYSTEM - READ CONCURRENCY BENCHMARK")
+    print("="*80)
+    asyncio.run(main_async(args))
+    print("="*80 + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
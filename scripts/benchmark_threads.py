@@ -0,0 +1,130 @@
+"""
+Benchmark inference throughput with and without the CPU thread budget.
+Simulates several API workers (processes), each running concurrent
+classification threads that use BLAS (encoder-sized matmuls), FAISS and
+gradient-boosted estimators trained with n_jobs=-1, as in production.
+"""
+import sys
+import os
+import argparse
+import multiprocessing as mp
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def api_worker(budget: bool, workers: int, concurrency: int, tasks: int, barrier, results):
+    """One simulated API worker process (libraries are imported after the thread environment is set)"""
+    os.environ["THREAD_BUDGET"] = "true" if budget else "false"
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    os.environ["CLASSIFY_WORKERS"] = str(concurrency)
+
+    from backend.ml.runtime import configure_threads, apply_thread_budget, limit_estimator_jobs
+    configure_threads()
+
+    import numpy as np
+    import faiss
+    import lightgbm as lgb
+    import xgboost as xgb
+
+    apply_thread_budget()
+
+    rng = np.random.default_rng(os.getpid())
+    dim = 1024
+    weights = [rng.standard_normal((dim, dim)).astype(np.float32) for _ in range(4)]
+    index = faiss.IndexFlatIP(dim)
+    index.add(rng.standard_normal((20000, dim)).astype(np.float32))
+    X = rng.standard_normal((500, dim)).astype(np.float32)
+    y = rng.integers(0, 5, 500)
+    models = [
+        lgb.LGBMClassifier(n_estimators=20, n_jobs=-1, verbose=-1).fit(X, y),
+        xgb.XGBClassifier(n_estimators=20, max_depth=4, n_jobs=-1, tree_method="hist").fit(X, y),
+    ]
+    if budget:
+        for model in models:
+            limit_estimator_jobs(model)
+
+    latencies = []
+    lock = threading.Lock()
+
+    def classify_thread():
+        tokens = rng.standard_normal((128, dim)).astype(np.float32)
+        for _ in range(tasks):
+            start = time.perf_counter()
+            hidden = tokens
+            for w in weights:  # stand-in for the encoder forward pass
+                hidden = np.tanh(hidden @ w)
+            embedding = hidden.mean(axis=0, keepdims=True)
+            embedding /= np.linalg.norm(embedding)
+            for model in models:
+                model.predict_proba(embedding)
+            index.search(embedding, 20)
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    barrier.wait()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=classify_thread) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results.put((time.perf_counter() - start, latencies))
+
+
+def run(budget: bool, workers: int, concurrency: int, tasks: int) -> dict:
+    """Run all simulated workers in one mode"""
+    ctx = mp.get_context("spawn")
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=api_worker, args=(budget, workers, concurrency, tasks, barrier, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    outcomes = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    elapsed = max(o[0] for o in outcomes)
+    latencies = sorted(l for o in outcomes for l in o[1])
+    return {
+        "tasks_per_s": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    }
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the CPU thread budget")
+    parser.add_argument("--workers", type=int, default=4, help="Simulated uvicorn workers (processes)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Classification threads per worker")
+    parser.add_argument("--tasks", type=int, default=25, help="Tickets per thread")
+    args = parser.parse_args()
+
+    print("\n" + "="*80)
+    print("IT TICKET TRIAGE SYSTEM - THREAD BUDGET BENCHMARK")
+    print("="*80 + "\n")
+    print(f"{os.cpu_count()} cores, {args.workers} workers x {args.concurrency} threads x {args.tasks} tickets\n")
+
+    results = {}
+    for name, budget in (("default", False), ("budget", True)):
+        print(f"Running {name} threading...")
+        results[name] = run(budget, args.workers, args.concurrency, args.tasks)
+
+    print(f"\n{'Threads':<10} {'Tickets/s':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['tasks_per_s']:>10.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f}")
+    print(f"\nSpeedup with budget: {results['budget']['tasks_per_s'] / results['default']['tasks_per_s']:.2f}x")
+    print("="*80 + "\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,13 +4,14 @@ Uses local embeddings (same as training) to create searchable vector index.
 """
 import sys
 import os
+import argparse
 import logging
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.ml.retrieval import TicketRetriever
+from backend.ml.retrieval import TicketRetriever, INDEX_CODECS, INDEX_CODEC
 from backend.ml.embeddings import get_embedder
 
 # Configure logging
@@ -28,11 +29,22 @@ def main():
     print("IT TICKET TRIAGE SYSTEM - BUILD FAISS INDEX")
     print("="*80 + "\n")
     
-    # Get dataset path from command line or use default
-    if len(sys.argv) > 1:
-        dataset_path = sys.argv[1]
-    else:
-        dataset_path = r"C:\Users\sthfa\Downloads\aa_dataset-tickets-multi-lang-5-2-50-version.csv"
+    parser = argparse.ArgumentParser(description="Build FAISS index for ticket retrieval")
+    parser.add_argument(
+        "dataset_path", nargs="?",
+        default=r"C:\Users\sthfa\Downloads\aa_dataset-tickets-multi-lang-5-2-50-version.csv",
+        help="Path to CSV dataset"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for embedding generation (one model per process)"
+    )
+    parser.add_argument(
+        "--codec", default=INDEX_CODEC, choices=INDEX_CODECS,
+        help="Vector storage: flat (float32), fp16 (2x smaller), int8 (4x) or binary (32x, re-scored with float16)"
+    )
+    args = parser.parse_args()
+    dataset_path = args.dataset_path
     
     if not os.path.exists(dataset_path):
         print(f"[ERROR] Dataset not found: {dataset_path}")
@@ -53,11 +65,11 @@ def main():
         if cached_embeddings is not None:
             print(f"[OK] Found cached embeddings: {cached_embeddings.shape}")
             print("Using cached embeddings to build index...\n")
-            retriever.build_index(dataset_path, embeddings=cached_embeddings)
+            retriever.build_index(dataset_path, embeddings=cached_embeddings, codec=args.codec)
         else:
             print("No cached embeddings found. Generating embeddings...")
-            print("(This may take a while for large datasets)\n")
-            retriever.build_index(dataset_path)
+            print("(This may take a while for large datasets; interrupted runs resume from finished shards)\n")
+            retriever.build_index(dataset_path, num_workers=args.workers, codec=args.codec)
         
         # Save index
         retriever.save_index()
@@ -66,6 +78,9 @@ def main():
         print("[SUCCESS] FAISS INDEX BUILT SUCCESSFULLY!")
         print("="*80)
         print(f"\nIndex contains {retriever.index.ntotal} vectors")
+        print(f"Vector codec: {retriever.codec} ({retriever.index_bytes / 1e6:.1f} MB)")
+        print(f"Vector dimension: {retriever.index.d}" + (" (reduced)" if embedder.projection is not None else ""))
+        print(f"BM25 index contains {len(retriever.sparse.vocab)} terms")
         print("[OK] Index saved to ./faiss_index/")
         print("\nThe retrieval system is now ready to:")
         print("  - Find similar historical tickets")
@@ -91,6 +91,61 @@ def test_database():
         return False
 
 
+def test_query_plans():
+    """Test that ticket listing queries use composite indexes (no full scans or sorts)"""
+    print("Testing ticket listing query plans...")
+    
+    try:
+        import tempfile
+        from sqlalchemy import create_engine
+        from backend.models import Base, TicketStatus
+        from backend.queries import ticket_list_query, encode_cursor
+        from datetime import datetime
+        
+        cases = {
+            "no filter": ({}, "ix_tickets_created_at"),
+            "status": ({"status": TicketStatus.PENDING_APPROVAL}, "ix_tickets_status_created_at"),
+            "queue": ({"queue": "Technical Support"}, "ix_tickets_predicted_queue_created_at"),
+            "is_critical": ({"is_critical": True}, "ix_tickets_is_critical_created_at"),
+            "submitter_email": ({"submitter_email": "a@example.com"}, "ix_tickets_submitter_email_created_at"),
+            "status + cursor": (
+                {"status": TicketStatus.SENT, "cursor": encode_cursor(datetime.utcnow(), 100)},
+                "ix_tickets_status_created_at"
+            ),
+        }
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{tmp}/plans.db")
+            Base.metadata.create_all(bind=engine)
+            
+            failures = []
+            with engine.connect() as conn:
+                for name, (filters, expected_index) in cases.items():
+                    compiled = ticket_list_query(**filters).limit(100).compile(engine)
+                    rows = conn.exec_driver_sql(
+                        f"EXPLAIN QUERY PLAN {compiled}", tuple(compiled.params.values())
+                    ).fetchall()
+                    plan = " | ".join(row[-1] for row in rows)
+                    
+                    if expected_index not in plan or "TEMP B-TREE" in plan:
+                        failures.append(f"{name}: {plan}")
+                    else:
+                        print(f"  [OK] {name}: {plan}")
+            engine.dispose()
+        
+        if failures:
+            for failure in failures:
+                print(f"  [ERROR] {failure}")
+            raise AssertionError("ticket listing fell back to a scan or sort")
+        
+        print("\n[SUCCESS] Query plan test passed!\n")
+        return True
+    
+    except Exception as e:
+        print(f"\n[ERROR] Query plan test failed: {e}\n")
+        return False
+
+
 def main():
     """Run all tests"""
     print("\n" + "="*80)
@@ -108,6 +163,9 @@ def main():
     # Test database
     results.append(test_database())
     
+    # Test query plans
+    results.append(test_query_plans())
+    
     # Summary
     print("="*80)
     if all(results):
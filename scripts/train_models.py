@@ -4,6 +4,7 @@ Trains department classifier and criticality classifier using local embeddings.
 """
 import sys
 import os
+import argparse
 import logging
 from pathlib import Path
 
@@ -11,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.ml.train import TicketClassifierTrainer
+from backend.ml.projection import EmbeddingProjection, EMBEDDING_DIM, EMBEDDING_REDUCTION
 
 # Configure logging
 logging.basicConfig(
@@ -27,11 +29,44 @@ def main():
     print("IT TICKET TRIAGE SYSTEM - MODEL TRAINING")
     print("="*80 + "\n")
     
-    # Get dataset path from command line or use default
-    if len(sys.argv) > 1:
-        dataset_path = sys.argv[1]
-    else:
-        dataset_path = r"C:\Users\sthfa\Downloads\aa_dataset-tickets-multi-lang-5-2-50-version.csv"
+    parser = argparse.ArgumentParser(description="Train ticket triage models")
+    parser.add_argument(
+        "dataset_path", nargs="?",
+        default=r"C:\Users\sthfa\Downloads\aa_dataset-tickets-multi-lang-5-2-50-version.csv",
+        help="Path to CSV dataset"
+    )
+    parser.add_argument(
+        "--candidate", action="store_true",
+        help="Save to ./models/candidate for shadow/canary evaluation instead of replacing active models"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Worker processes for embedding generation (one model per process)"
+    )
+    parser.add_argument(
+        "--model-type", default="ensemble",
+        choices=["logistic", "svm", "xgboost", "xgboost_tuned", "lightgbm_tuned", "ensemble"],
+        help="Department classifier; *_tuned runs a successive-halving search (results in ./models/tuning/)"
+    )
+    parser.add_argument(
+        "--distill", action="store_true",
+        help="Distill the department classifier into a compact linear head (float32 .npy)"
+    )
+    parser.add_argument(
+        "--embedding-dim", type=int, default=EMBEDDING_DIM,
+        help="Reduce embeddings to this many dimensions, e.g. 128-384 (0 = full); rebuild the index afterwards"
+    )
+    parser.add_argument(
+        "--reduction", default=EMBEDDING_REDUCTION, choices=EmbeddingProjection.METHODS,
+        help="Reduction method; truncate only suits Matryoshka-trained embedding models"
+    )
+    parser.add_argument(
+        "--dim-report", default="",
+        help="Comma-separated dimensions to compare (accuracy, recall, memory) before training, e.g. 128,256,384"
+    )
+    args = parser.parse_args()
+    dataset_path = args.dataset_path
+    model_dir = Path("./models/candidate") if args.candidate else None
     
     if not os.path.exists(dataset_path):
         print(f"[ERROR] Dataset not found: {dataset_path}")
@@ -59,7 +94,10 @@ def main():
     print("-" * 80 + "\n")
     
     try:
-        metrics = trainer.train_all()
+        metrics = trainer.train_all(model_dir=model_dir, num_workers=args.workers, model_type=args.model_type,
+                                    distill=args.distill, embedding_dim=args.embedding_dim,
+                                    reduction=args.reduction,
+                                    dim_report=[int(d) for d in args.dim_report.split(",") if d.strip()])
         
         print("\n" + "="*80)
         print("[SUCCESS] TRAINING COMPLETE!")
@@ -69,14 +107,32 @@ def main():
         print(f"  - Test Accuracy: {metrics['department']['test_acc']:.3f}")
         print(f"  - Test F1 (macro): {metrics['department']['test_f1']:.3f}")
         
+        if "distillation" in metrics:
+            d = metrics["distillation"]
+            print(f"\nDistilled Linear Head:")
+            print(f"  - Test Accuracy: {d['student_acc']:.3f} (loss {d['accuracy_loss']:+.3f} vs ensemble)")
+            print(f"  - Latency: {d['student_ms']:.3f} ms vs {d['teacher_ms']:.3f} ms ({d['speedup']:.1f}x faster)")
+        
         print(f"\nCriticality Classifier:")
         print(f"  - Test AUC: {metrics['criticality']['test_auc']:.3f}")
         print(f"  - Critical Recall: {metrics['criticality']['critical_recall']:.3f}")
         
-        print("\n[OK] Models saved to ./models/")
+        if "projection" in metrics:
+            p = metrics["projection"]
+            print(f"\nEmbedding Projection:")
+            print(f"  - {p['method']}: {p['source_dim']} -> {p['dim']} dims ({p['retained_variance']:.1%} variance)")
+        
+        if "dimensions" in metrics:
+            print(f"\nEmbedding Dimensions ({args.reduction}, logistic regression):")
+            print(f"  {'dim':>6} {'variance':>9} {'dept acc':>9} {'crit rec':>9} {'recall@10':>10} {'index MB':>9}")
+            for row in metrics["dimensions"]:
+                print(f"  {row['dim']:>6} {row['retained_variance']:>9.1%} {row['dept_acc']:>9.3f} "
+                      f"{row['critical_recall']:>9.3f} {row['retrieval_recall']:>10.3f} {row['index_mb']:>9.1f}")
+        
+        print(f"\n[OK] Models saved to {model_dir or './models'}/")
         print("[OK] Embeddings cached to ./embeddings_cache/")
         print("\nNext steps:")
-        print("  1. Run: python scripts/build_index.py")
+        print("  1. Run: python scripts/build_index.py (required after changing --embedding-dim)")
         print("  2. Start backend: python backend/app.py")
         print("="*80 + "\n")
     
@@ -0,0 +1 @@
+"""Shared code for the Streamlit apps (customer portal and manager dashboard)."""
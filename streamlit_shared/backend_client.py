@@ -0,0 +1,157 @@
+"""
+Shared backend client for the Streamlit apps.
+
+- One pooled keep-alive requests.Session per app process (st.cache_resource)
+- Short-TTL memoized reads (st.cache_data), revalidated with If-None-Match
+- A thread pool so independent reads run concurrently
+"""
+import streamlit as st
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import json
+import os
+import threading
+import time
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Configuration
+BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+BACKEND_POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "16"))
+BACKEND_READ_TTL_S = int(os.getenv("BACKEND_READ_TTL_S", "5"))
+BACKEND_TIMEOUT_S = float(os.getenv("BACKEND_TIMEOUT_S", "30"))
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """Keep-alive session shared by all users of this app process"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=BACKEND_POOL_SIZE,
+        max_retries=Retry(total=2, backoff_factor=0.2, allowed_methods={"GET"})
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def get_executor() -> ThreadPoolExecutor:
+    """Thread pool for concurrent reads (sized to the connection pool)"""
+    return ThreadPoolExecutor(max_workers=BACKEND_POOL_SIZE, thread_name_prefix="backend")
+
+
+@st.cache_resource
+def _etag_store() -> Dict[Tuple, Tuple[str, Any]]:
+    """Last ETag and body per (path, params), for conditional revalidation"""
+    return {}
+
+
+def get(path: str, **params) -> requests.Response:
+    return get_session().get(f"{BACKEND_URL}{path}", params=params, timeout=BACKEND_TIMEOUT_S)
+
+
+def post(path: str, **kwargs) -> requests.Response:
+    """POST through the pooled session; successful writes drop memoized reads"""
+    response = get_session().post(f"{BACKEND_URL}{path}", timeout=BACKEND_TIMEOUT_S, **kwargs)
+    if response.ok:
+        get_json.clear()
+    return response
+
+
+@st.cache_data(ttl=BACKEND_READ_TTL_S, show_spinner=False)
+def get_json(path: str, params: Tuple[Tuple[str, Any], ...] = ()) -> Any:
+    """
+    GET a JSON resource, memoized for BACKEND_READ_TTL_S.
+
+    Endpoints that return an ETag are revalidated with If-None-Match when the
+    memoized copy expires, so unchanged data comes back as an empty 304.
+
+    Raises:
+        requests.HTTPError: On a non-2xx response
+    """
+    key = (path, params)
+    store = _etag_store()
+    cached = store.get(key)
+
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    response = get_session().get(
+        f"{BACKEND_URL}{path}", params=dict(params), headers=headers, timeout=BACKEND_TIMEOUT_S
+    )
+    if response.status_code == 304 and cached:
+        return cached[1]
+    response.raise_for_status()
+
+    data = response.json()
+    if "ETag" in response.headers:
+        store[key] = (response.headers["ETag"], data)
+    return data
+
+
+def fetch_json(path: str, **params) -> Any:
+    """Memoized GET with keyword params (see get_json)"""
+    return get_json(path, tuple(sorted(params.items())))
+
+
+def fetch_json_many(calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+    """
+    Run independent GETs concurrently.
+
+    Args:
+        calls: (path, params) pairs
+
+    Returns:
+        Results in the same order; a failed request yields its exception
+    """
+    ctx = get_script_run_ctx()
+
+    def run(path: str, params: Dict[str, Any]) -> Any:
+        add_script_run_ctx(threading.current_thread(), ctx)
+        try:
+            return fetch_json(path, **params)
+        except Exception as e:
+            return e
+
+    executor = get_executor()
+    futures = [executor.submit(run, path, params) for path, params in calls]
+    return [future.result() for future in futures]
+
+
+def iter_tickets(params: dict, page_size: int = 100) -> Iterator[dict]:
+    """Yield tickets matching params, following next_cursor page by page"""
+    params = dict(params, limit=page_size)
+    while True:
+        page = fetch_json("/tickets", **params)
+        yield from page["items"]
+        if not page["next_cursor"]:
+            return
+        params["cursor"] = page["next_cursor"]
+
+
+def wait_for_event(timeout: float = 20, **filters) -> Optional[dict]:
+    """Block until the backend pushes a matching ticket event (SSE), or timeout"""
+    deadline = time.monotonic() + timeout
+    try:
+        with get_session().get(
+            f"{BACKEND_URL}/events/stream",
+            params=filters,
+            stream=True,
+            timeout=(3, timeout)
+        ) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if line and line.startswith("data: "):
+                    # Something changed: the next render must not reuse memoized reads
+                    get_json.clear()
+                    return json.loads(line[len("data: "):])
+                if time.monotonic() > deadline:
+                    break
+    except requests.exceptions.RequestException:
+        # Backend unreachable or idle stream timed out: back off before retrying
+        time.sleep(max(0.0, deadline - time.monotonic()))
+    return None